@@ -463,19 +463,32 @@
 import os
 import logging
 from pathlib import Path
-from flask import Flask, request, send_file, jsonify
+from flask import Flask, Request, request, send_file, jsonify
 from werkzeug.utils import secure_filename
 import io
-from PIL import Image
+import json
+import shutil
+import tempfile
+import time
+import uuid
+import queue
+import bisect
+import struct
+import hashlib
+import resource
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from collections import OrderedDict, deque
+from contextlib import contextmanager, nullcontext
+from importlib import metadata
+from PIL import Image, ImageDraw
+import numpy as np
+import cv2
 import fitz  # PyMuPDF
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from reportlab.pdfbase import pdfmetrics
 
-# Surya imports
-from surya.foundation import FoundationPredictor
-from surya.recognition import RecognitionPredictor
-from surya.detection import DetectionPredictor
+# Surya is imported when the models are loaded (see load_models), so importing
+# this module stays cheap
 
 # Setup logging
 logging.basicConfig(
@@ -486,212 +499,2102 @@ logger = logging.getLogger(__name__)
 
 # Flask app setup
 app = Flask(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+app.config['MAX_CONTENT_LENGTH'] = 512 * 1024 * 1024  # 512MB max file size (uploads are streamed to disk)
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'outputs'
-
-# Create necessary folders
-Path(app.config['UPLOAD_FOLDER']).mkdir(exist_ok=True)
-Path(app.config['OUTPUT_FOLDER']).mkdir(exist_ok=True)
-Path('temp_images').mkdir(exist_ok=True)
+app.config['OCR_BATCH_SIZE'] = None  # Pages per OCR call, None = auto-size from RAM
+app.config['RENDER_WORKERS'] = 2  # Page render threads feeding the OCR stage
+app.config['MEMORY_BUDGET_MB'] = None  # Per-conversion page memory budget, None = unbounded
+app.config['TILE_PAGE_PIXELS'] = 50 * 1000 * 1000  # Pages rendering to more pixels are OCRed in tiles
+app.config['OCR_PROCESSES'] = 0  # Forked OCR worker processes sharing the model weights, 0 = OCR in-process (set: models load at startup)
+app.config['OCR_THREADS_PER_PROCESS'] = None  # torch threads per OCR process, None = CPU cores / processes
+app.config['OCR_SHARED_BATCHING'] = True  # Batch pages of concurrent conversions into shared OCR calls
+app.config['OCR_MAX_BATCH_SIZE'] = 16  # Pages per shared OCR call
+app.config['OCR_MAX_WAIT_MS'] = 50  # Longest a page waits for others to join its batch
+app.config['CONVERSION_MODE'] = 'rasterize'  # Default PDF mode: 'rasterize' or 'overlay'
+app.config['PAGE_TRIAGE'] = False  # Skip OCR on PDF pages that already have a usable text layer (opt-in, per request: triage=1)
+app.config['SKIP_BLANK_PAGES'] = False  # Skip OCR on blank pages, e.g. separator sheets (opt-in, per request: skip_blank=1)
+app.config['DETECTION_DPI'] = None  # Detect text lines at this lower DPI (two-resolution OCR), None = off
+app.config['CASCADE_DPI'] = None  # OCR first at this lower DPI, re-read weak lines at full DPI, None = off
+app.config['CASCADE_CONFIDENCE'] = 0.8  # Lines below this recognition confidence are re-read
+app.config['OCR_CACHE_FOLDER'] = 'ocr_cache'  # On-disk OCR result cache, None disables it
+app.config['OCR_CACHE_MAX_BYTES'] = 1024 * 1024 * 1024  # 1GB cache budget (LRU eviction)
+app.config['JOB_WORKERS'] = 1  # Background conversions running at once (/api/jobs)
+app.config['JOB_QUEUE_SIZE'] = 100  # Jobs waiting for a worker before submissions get 503
+app.config['JOB_STORE'] = 'memory'  # Job records: 'memory' or 'file' (kept in JOB_FOLDER)
+app.config['JOB_FOLDER'] = 'jobs'
+app.config['JOB_RESULT_TTL'] = 3600  # Seconds finished jobs and their PDFs are kept
+app.config['MODEL_LOADING'] = 'background'  # 'background': load in a thread, 'eager': start_model_loading blocks until ready
+app.config['MODEL_WARMUP'] = True  # Run one OCR call on a synthetic page before reporting ready
+app.config['MODEL_READY_TIMEOUT'] = 300  # Seconds /api/convert waits for the models before answering 503
+app.config['OCR_ACCELERATION'] = None  # CPU profile from ACCELERATION_PROFILES (e.g. 'cpu-int8'), None = off
+app.config['TORCH_THREADS'] = None  # torch intra-op threads, None = torch default (OCR processes set their own)
+app.config['TORCH_INTEROP_THREADS'] = None  # torch inter-op threads, None = torch default
+app.config['VERIFY_SAMPLE_PAGES'] = None  # /api/verify reads at most this many evenly spread pages, None = all
 
 ALLOWED_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'tiff', 'tif', 'bmp'}
 
+# Raw (non-multipart) uploads: accepted content types and their extension
+RAW_UPLOAD_TYPES = {
+    'application/pdf': 'pdf',
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/tiff': 'tiff',
+    'image/bmp': 'bmp',
+}
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+UPLOAD_SPOOL_PREFIX = '.upload-'
 
-class SearchableDocumentConverter:
+
+class UploadRequest(Request):
     """
-    Universal converter for making documents searchable
-    Supports: PDF, PNG, JPG, JPEG, TIFF
+    Request that spools multipart file parts straight into UPLOAD_FOLDER
+    Werkzeug parses the body in chunks and writes each file part to the
+    stream returned here, so uploads never sit in memory and save_upload
+    can move them into place with os.replace instead of copying them.
     """
 
-    def __init__(self):
-        """Initialize Surya OCR models"""
-        logger.info("🔄 Loading Surya OCR models...")
-        self.foundation_predictor = FoundationPredictor()
-        self.recognition_predictor = RecognitionPredictor(self.foundation_predictor)
-        self.detection_predictor = DetectionPredictor()
-        logger.info("✅ Models loaded successfully")
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        spool = tempfile.NamedTemporaryFile('wb+', dir=app.config['UPLOAD_FOLDER'],
+                                            prefix=UPLOAD_SPOOL_PREFIX, suffix='.part', delete=False)
+        self.__dict__.setdefault('spooled_uploads', []).append(spool.name)
+        return spool
 
-        self.image_formats = {'.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp'}
-        self.pdf_format = {'.pdf'}
+    def close(self):
+        super().close()
 
-    def extract_text_with_coordinates(self, image_path: str) -> dict:
-        """Extract text and exact coordinates using Surya OCR"""
-        logger.info(f"🔍 Extracting text from: {Path(image_path).name}")
+        # Spooled parts that were never moved into place
+        for path in self.__dict__.get('spooled_uploads', ()):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
 
-        image = Image.open(image_path)
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
 
-        img_width, img_height = image.size
+app.request_class = UploadRequest
 
-        predictions = self.recognition_predictor([image], det_predictor=self.detection_predictor)
+# OCR batching: pages per predictor call when RAM cannot be measured, upper
+# bound for auto-sized batches, and the share of free RAM a batch may use
+DEFAULT_OCR_BATCH_SIZE = 4
+MAX_AUTO_BATCH_SIZE = 32
+AUTO_BATCH_MEMORY_FRACTION = 0.25
 
-        text_elements = []
+# Memory-bounded conversion: share of the budget finished (compressed) pages
+# may occupy before they are flushed to the output file
+OUTPUT_FLUSH_FRACTION = 0.25
 
-        if predictions and len(predictions) > 0:
-            page_pred = predictions[0]
 
-            if hasattr(page_pred, 'text_lines'):
-                for line in page_pred.text_lines:
-                    if hasattr(line, 'bbox') and line.bbox:
-                        text_elements.append({
-                            'text': line.text.strip(),
-                            'bbox': line.bbox,
-                            'confidence': getattr(line, 'confidence', 1.0)
-                        })
+def available_memory_bytes() -> int:
+    """Best-effort estimate of available physical memory (0 if unknown)"""
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
 
-        result = {
-            'image_size': (img_width, img_height),
-            'text_elements': text_elements,
-            'total_elements': len(text_elements)
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return 0
+
+
+# JPEG quality used for rasterized page backgrounds
+JPEG_QUALITY = 85
+
+
+def load_rgb_image(image) -> Image.Image:
+    """Open an image path (or take a PIL image) and make sure it is RGB"""
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return image
+
+
+def pixmap_to_image(pix) -> Image.Image:
+    """Hand a PyMuPDF pixmap's sample buffer to PIL without an intermediate bytes copy"""
+    mode = 'RGBA' if pix.alpha else 'RGB'
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples_mv, 'raw', mode, pix.stride, 1)
+
+
+def encode_jpeg(image: Image.Image, quality: int = JPEG_QUALITY) -> bytes:
+    """Encode a decoded page image to JPEG bytes in memory"""
+    jpeg_buffer = io.BytesIO()
+    with metrics.timed('encode'):
+        image.save(jpeg_buffer, format='JPEG', quality=quality, optimize=True)
+    return jpeg_buffer.getvalue()
+
+
+# PNG color types whose IDAT stream PDF can read as-is: grayscale, RGB, palette
+PNG_PASSTHROUGH_COLORS = {0: ('/DeviceGray', 1), 2: ('/DeviceRGB', 3), 3: (None, 1)}
+# TIFF tags and values used to pick CCITT Group 4 images
+TIFF_COMPRESSION_GROUP4 = 4
+TIFF_TAGS = {'compression': 259, 'photometric': 262, 'fill_order': 266,
+             'strip_offsets': 273, 'rows_per_strip': 278, 'strip_byte_counts': 279}
+
+
+def _png_passthrough(data: bytes) -> dict:
+    """Flate XObject parameters for a PNG's IDAT stream, or None if PDF can't read it directly
+
+    Only non-interlaced grayscale, RGB and palette PNGs of up to 8 bits per
+    sample qualify; transparency would be lost, so PNGs with alpha or a tRNS
+    chunk are decoded as usual.
+    """
+    position = 8
+    header = None
+    palette = b""
+    idat = []
+    while position + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[position:position + 8])
+        chunk = data[position + 8:position + 8 + length]
+        position += 12 + length
+        if chunk_type == b'IHDR':
+            header = struct.unpack('>IIBBBBB', chunk)
+        elif chunk_type == b'PLTE':
+            palette = chunk
+        elif chunk_type == b'IDAT':
+            idat.append(chunk)
+        elif chunk_type == b'tRNS':
+            return None
+        elif chunk_type == b'IEND':
+            break
+
+    if header is None or not idat:
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = header
+    if color_type not in PNG_PASSTHROUGH_COLORS or bit_depth > 8 or interlace:
+        return None
+
+    color_space, colors = PNG_PASSTHROUGH_COLORS[color_type]
+    if color_space is None:
+        color_space = f"[/Indexed /DeviceRGB {len(palette) // 3 - 1} <{palette.hex()}>]"
+    return {
+        'filter': '/FlateDecode',
+        'size': (width, height),
+        'color_space': color_space,
+        'bits': bit_depth,
+        'bands': [{
+            'top': 0,
+            'rows': height,
+            'decode_parms': f"<< /Predictor 15 /Colors {colors} /BitsPerComponent {bit_depth} /Columns {width} >>",
+            'data': b"".join(idat),
+        }],
+    }
+
+
+def _tiff_passthrough(image: Image.Image, data) -> dict:
+    """CCITT XObject parameters for the current frame of a TIFF if it is Group 4, or None
+
+    Every strip of a Group 4 image is coded on its own, so each strip becomes
+    a band (an image of its own) of the page. ``data`` is the file's bytes,
+    or the open file itself (multi-page TIFFs, whose frames are read one at
+    a time).
+    """
+    tags = {name: image.tag_v2.get(tag) for name, tag in TIFF_TAGS.items()}
+    if (image.mode != '1'
+            or tags['compression'] != TIFF_COMPRESSION_GROUP4 or tags['fill_order'] not in (None, 1)
+            or tags['photometric'] not in (0, 1)
+            or not tags['strip_offsets'] or len(tags['strip_offsets']) != len(tags['strip_byte_counts'] or ())):
+        return None
+
+    width, height = image.size
+    rows_per_strip = min(tags['rows_per_strip'] or height, height)
+    if len(tags['strip_offsets']) != -(-height // rows_per_strip):
+        return None
+    # Coded white runs are 0 bits, which photometric 1 (BlackIsZero) shows as black
+    black_is_1 = 'true' if tags['photometric'] == 1 else 'false'
+
+    bands = []
+    for index, (offset, length) in enumerate(zip(tags['strip_offsets'], tags['strip_byte_counts'])):
+        if isinstance(data, bytes):
+            strip = data[offset:offset + length]
+        else:
+            data.seek(offset)
+            strip = data.read(length)
+        if len(strip) != length:
+            return None
+        top = index * rows_per_strip
+        rows = min(rows_per_strip, height - top)
+        bands.append({
+            'top': top,
+            'rows': rows,
+            'decode_parms': f"<< /K -1 /Columns {width} /Rows {rows} /BlackIs1 {black_is_1} >>",
+            'data': strip,
+        })
+    return {
+        'filter': '/CCITTFaxDecode',
+        'size': (width, height),
+        'color_space': '/DeviceGray',
+        'bits': 1,
+        'bands': bands,
+    }
+
+
+def passthrough_image(image: Image.Image, data: bytes) -> dict:
+    """Describe how the original encoded bytes of an image file can be embedded without re-encoding
+
+    ``image`` is the opened (not necessarily decoded) file and ``data`` its
+    bytes. Returns None when the encoding has no PDF equivalent; otherwise
+    JPEG (DCT), PNG (Flate with PNG predictors) and bilevel Group 4 TIFF
+    (CCITT) streams are copied into the PDF as they are, which saves the
+    JPEG re-encode and its generation loss. See insert_passthrough_image.
+    """
+    if image.format == 'JPEG' and image.mode in ('L', 'RGB'):
+        return {'filter': '/DCTDecode', 'size': image.size,
+                'bands': [{'top': 0, 'rows': image.size[1], 'data': data}]}
+    if image.format == 'PNG':
+        return _png_passthrough(data)
+    if image.format == 'TIFF':
+        return _tiff_passthrough(image, data)
+    return None
+
+
+def tiff_frame_count(path: str) -> int:
+    """Number of pages in a TIFF file; reads the chain of image directories, decodes nothing"""
+    with Image.open(path) as image:
+        return getattr(image, 'n_frames', 1)
+
+
+def passthrough_size(passthrough: dict) -> int:
+    """Encoded bytes a passthrough_image() adds to the PDF"""
+    return sum(len(band['data']) for band in passthrough['bands'])
+
+
+def page_resources(page):
+    """(xref, key path prefix) under which a fitz page's resource dict can be edited
+
+    None when the page inherits its resources from the page tree.
+    """
+    resources_type, resources = page.parent.xref_get_key(page.xref, 'Resources')
+    if resources_type == 'xref':
+        return int(resources.split()[0]), ''
+    if resources_type == 'dict':
+        return page.xref, 'Resources/'
+    return None
+
+
+def insert_passthrough_image(page, rect, passthrough: dict):
+    """Show a passthrough_image() stream in ``rect`` of a fitz page. Callers must hold FITZ_LOCK"""
+    if passthrough['filter'] == '/DCTDecode':
+        # MuPDF keeps JPEG data compressed as it is
+        page.insert_image(rect, stream=passthrough['bands'][0]['data'])
+        return
+
+    # Bands are registered and drawn directly: page.insert_image rescans the
+    # page resources on every call, which adds up over the strips of a scan
+    document = page.parent
+    width, height = passthrough['size']
+    row_height = rect.height / height
+    to_pdf = ~page.transformation_matrix
+    resources_xref, resources_prefix = page_resources(page)
+    content = []
+    for index, band in enumerate(passthrough['bands']):
+        xref = document.get_new_xref()
+        document.update_object(xref, f"<< /Type /XObject /Subtype /Image /Width {width} /Height {band['rows']} "
+                                     f"/ColorSpace {passthrough['color_space']} "
+                                     f"/BitsPerComponent {passthrough['bits']} >>")
+        document.update_stream(xref, band['data'], compress=False)
+        # Set after the stream, update_stream drops the filter of uncompressed data
+        document.xref_set_key(xref, 'Filter', passthrough['filter'])
+        document.xref_set_key(xref, 'DecodeParms', band['decode_parms'])
+        name = f"PassthroughBand{index}"
+        document.xref_set_key(resources_xref, f"{resources_prefix}XObject/{name}", f"{xref} 0 R")
+
+        band_rect = fitz.Rect(rect.x0, rect.y0 + band['top'] * row_height,
+                              rect.x1, rect.y0 + (band['top'] + band['rows']) * row_height) * to_pdf
+        content.append(f"q {band_rect.width:.4f} 0 0 {band_rect.height:.4f} {band_rect.x0:.4f} {band_rect.y0:.4f} cm "
+                       f"/{name} Do Q")
+    append_page_content(page, "\n".join(content).encode('latin-1'), merge=True)
+
+
+# How convert_pdf_to_searchable_pdf builds its output: re-rasterize every page,
+# or overlay the text layer on the original page content
+CONVERSION_MODES = ('rasterize', 'overlay')
+
+# Page triage: a page needs at least this many extractable characters to count
+# as having a text layer, of which at most this share may be unmapped glyphs
+TRIAGE_MIN_TEXT_CHARS = 20
+TRIAGE_MAX_UNMAPPED_RATIO = 0.1
+# Image covering this share of the page makes it a scan (with or without text)
+TRIAGE_FULL_PAGE_IMAGE = 0.8
+# Image area not overlapped by text above this share makes a text page "mixed"
+TRIAGE_MIXED_IMAGE_COVERAGE = 0.15
+PAGE_KINDS = ('digital', 'scanned', 'mixed')
+# Text extraction flags for triage: blocks, plus image blocks for coverage
+TRIAGE_TEXT_FLAGS = fitz.TEXTFLAGS_BLOCKS | fitz.TEXT_PRESERVE_IMAGES
+
+# Base-14 font used for the invisible OCR text layer (WinAnsi encoded)
+TEXT_LAYER_FONT = 'helv'
+
+
+# Advance widths (at font size 1) of every WinAnsi byte, per text layer font
+_GLYPH_WIDTHS = {}
+
+
+def glyph_width_table(font_name: str = TEXT_LAYER_FONT) -> np.ndarray:
+    """Advance width of each cp1252 byte at font size 1, built once per font"""
+    table = _GLYPH_WIDTHS.get(font_name)
+    if table is None:
+        table = np.zeros(256)
+        with FITZ_LOCK:
+            font = fitz.Font(font_name)
+            for code in range(256):
+                try:
+                    table[code] = font.glyph_advance(ord(bytes([code]).decode('cp1252')))
+                except UnicodeDecodeError:
+                    continue  # Unassigned in cp1252, never produced by the encoder
+        _GLYPH_WIDTHS[font_name] = table
+    return table
+
+
+def build_text_layer(text_elements: list, font_name: str = TEXT_LAYER_FONT) -> tuple:
+    """Invisible text operators for OCR lines, in pixel space (top-left origin)
+
+    All boxes are validated and sized in one NumPy pass: font size is 75% of
+    the box height (6 to 72), and the horizontal scale (50% to 200%) makes
+    the text span the box, with text widths summed from the cached glyph
+    width table. Every line goes into a single BT/ET text object; font size
+    and scale are only re-emitted when they change. Each line's text matrix
+    flips Y back, since the layer is drawn through a Y-flipping page matrix.
+
+    Returns ``(operators, written, skipped)``; ``operators`` is None when no
+    line is usable.
+    """
+    texts = []
+    boxes = []
+    skipped = 0
+    for element in text_elements:
+        text = element['text']
+        bbox = element['bbox']
+        if not text or not text.strip() or len(bbox) != 4:
+            skipped += 1
+            continue
+        texts.append(text.encode('cp1252', errors='replace'))
+        boxes.append(bbox)
+
+    if not texts:
+        return None, 0, skipped
+
+    x1, y1, x2, y2 = np.asarray(boxes, dtype=float).T
+    box_widths = x2 - x1
+    box_heights = y2 - y1
+    # Also rejects inverted boxes; very small boxes are noise
+    valid = (box_widths >= 2) & (box_heights >= 2)
+
+    font_sizes = np.clip(box_heights * 0.75, 6, 72)
+    glyphs = np.frombuffer(b"".join(texts), dtype=np.uint8)
+    owners = np.repeat(np.arange(len(texts)), [len(text) for text in texts])
+    text_widths = np.bincount(owners, weights=glyph_width_table(font_name)[glyphs], minlength=len(texts)) * font_sizes
+    h_scales = np.full(len(texts), 100.0)
+    measured = text_widths > 0
+    h_scales[measured] = np.clip(box_widths[measured] / text_widths[measured] * 100, 50, 200)
+
+    operators = ["BT 3 Tr"]
+    current_font = current_scale = None
+    for index, font_size, h_scale, x, y in zip(np.flatnonzero(valid).tolist(), font_sizes[valid].tolist(),
+                                               h_scales[valid].tolist(), x1[valid].tolist(), y2[valid].tolist()):
+        font = f"/{font_name} {font_size:.2f} Tf"
+        if font != current_font:
+            operators.append(font)
+            current_font = font
+        scale = f"{h_scale:.2f} Tz"
+        if scale != current_scale:
+            operators.append(scale)
+            current_scale = scale
+        # Baseline at the bottom of the bbox
+        operators.append(f"1 0 0 -1 {x:.2f} {y:.2f} Tm <{texts[index].hex()}> Tj")
+    operators.append("ET")
+
+    written = int(valid.sum())
+    skipped += len(texts) - written
+    if not written:
+        return None, 0, skipped
+    return "\n".join(operators).encode('latin-1'), written, skipped
+
+
+def own_page_resources(page):
+    """Give a fitz page a Resources dict (and Font dict) of its own. Callers must hold FITZ_LOCK
+
+    Original pages often share one indirect Resources object or inherit it
+    from the page tree; it is copied onto the page, so keys set afterwards
+    only reach this page.
+    """
+    document = page.parent
+    node = page.xref
+    resources_type, resources = document.xref_get_key(node, 'Resources')
+    while resources_type == 'null':
+        parent_type, parent = document.xref_get_key(node, 'Parent')
+        if parent_type != 'xref':
+            break
+        node = int(parent.split()[0])
+        resources_type, resources = document.xref_get_key(node, 'Resources')
+
+    if resources_type == 'xref':
+        resources = document.xref_object(int(resources.split()[0]), compressed=True)
+    elif resources_type != 'dict':
+        resources = '<<>>'
+    if node != page.xref or resources_type != 'dict':
+        document.xref_set_key(page.xref, 'Resources', resources)
+
+    fonts_type, fonts = document.xref_get_key(page.xref, 'Resources/Font')
+    if fonts_type == 'xref':
+        document.xref_set_key(page.xref, 'Resources/Font', document.xref_object(int(fonts.split()[0]), compressed=True))
+
+
+def text_layer_fonts(document) -> dict:
+    """Font name -> xref of the text layer fonts in an open fitz document (kept on the document)"""
+    return vars(document).setdefault('_text_layer_fonts', {})
+
+
+def find_text_layer_fonts(document, font_name: str = TEXT_LAYER_FONT) -> dict:
+    """Look up the text layer font in a saved document, searching back from the last page"""
+    font = (font_name, 'Type1', fitz.Base14_fontdict[font_name], 'WinAnsiEncoding')
+    for page_num in range(len(document) - 1, -1, -1):
+        for xref, _ext, font_type, base_font, name, encoding in document.get_page_fonts(page_num):
+            if (name, font_type, base_font, encoding) == font:
+                return {font_name: xref}
+    return {}
+
+
+def insert_text_layer_font(page, font_name: str = TEXT_LAYER_FONT):
+    """Make ``font_name`` available to a fitz page, sharing one font object per document
+
+    The page gets its own resource dicts first (own_page_resources). MuPDF
+    only reuses a font object it inserted in the same session, so the xref
+    is kept in text_layer_fonts (carried over reopens by _flush_output_pdf)
+    and referenced directly. A page with its own font of that name keeps it.
+    Callers must hold FITZ_LOCK.
+    """
+    document = page.parent
+    own_page_resources(page)
+    fonts = text_layer_fonts(document)
+    if font_name in fonts and not any(font[4] == font_name for font in page.get_fonts()):
+        document.xref_set_key(page.xref, f"Resources/Font/{font_name}", f"{fonts[font_name]} 0 R")
+        return
+
+    xref = page.insert_font(fontname=font_name)
+    if (document.xref_get_key(xref, 'BaseFont') == ('name', f"/{fitz.Base14_fontdict[font_name]}")
+            and document.xref_get_key(xref, 'Encoding') == ('name', '/WinAnsiEncoding')):
+        fonts.setdefault(font_name, xref)
+
+
+def ink_coverage(pixels: np.ndarray, dpi: float) -> float:
+    """Share of a rendered page (margins excluded) covered by ink
+
+    ``pixels`` is an RGB (or grayscale) array. Ink is anything clearly darker
+    than the paper tone (the median gray), after removing specks smaller
+    than BLANK_SPECK_INCHES at the given ``dpi``.
+    """
+    gray = cv2.cvtColor(pixels, cv2.COLOR_RGB2GRAY) if pixels.ndim == 3 else pixels
+
+    height, width = gray.shape
+    margin_y, margin_x = int(height * BLANK_MARGIN_FRACTION), int(width * BLANK_MARGIN_FRACTION)
+    gray = gray[margin_y:height - margin_y, margin_x:width - margin_x]
+    if gray.size == 0:
+        return 0.0
+
+    histogram = cv2.calcHist([gray], [0], None, [256], [0, 256]).ravel()
+    paper = int(np.searchsorted(histogram.cumsum(), gray.size / 2))
+    if paper <= BLANK_INK_CONTRAST:
+        # Dark page (photo, negative scan): never treat it as blank
+        return 1.0
+
+    _, ink = cv2.threshold(gray, paper - BLANK_INK_CONTRAST - 1, 1, cv2.THRESH_BINARY_INV)
+
+    # Anti-aliasing spreads a speck over one pixel more than its size
+    speck = int(dpi * BLANK_SPECK_INCHES) + 1
+    if speck >= 2:
+        ink = cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((speck, speck), np.uint8))
+
+    return cv2.countNonZero(ink) / ink.size
+
+
+def pixmap_array(pix) -> np.ndarray:
+    """View a PyMuPDF pixmap's samples as an (h, w, n) array without copying"""
+    samples = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride)
+    return samples[:, :pix.width * pix.n].reshape(pix.height, pix.width, pix.n)
+
+
+def classify_pdf_page(page) -> dict:
+    """Triage a PDF page from its existing text layer and images
+
+    Returns the page ``kind`` with the measurements behind it:
+        - digital: usable text layer, nothing to OCR
+        - scanned: no usable text, the page needs OCR
+        - mixed: usable text plus sizeable image regions that may hold more text
+    ``text_rects`` are the existing text blocks in unrotated page coordinates
+    and ``text`` their text, ``image_text_coverage`` is the share of the
+    image area under them.
+    """
+    page_area = abs(page.rect) or 1.0
+
+    text_chars = 0
+    unmapped_chars = 0
+    text_rects = []
+    texts = []
+    image_rects = []
+    # One extraction pass yields both text blocks and image placements
+    for x0, y0, x1, y1, text, _block_no, block_type in page.get_text("blocks", flags=TRIAGE_TEXT_FLAGS):
+        if block_type == 1:
+            image_rects.append(fitz.Rect(x0, y0, x1, y1))
+            continue
+        if not text.strip():
+            continue
+        text_chars += len(text.strip())
+        # Glyphs without a unicode mapping extract as U+FFFD and are not searchable
+        unmapped_chars += text.count('\ufffd')
+        text_rects.append(fitz.Rect(x0, y0, x1, y1))
+        texts.append(text)
+
+    image_area = sum(abs(rect) for rect in image_rects)
+    covered_image_area = sum(abs(image & text) for image in image_rects for text in text_rects)
+
+    image_coverage = min(1.0, image_area / page_area)
+    uncovered_image_coverage = max(0.0, image_area - covered_image_area) / page_area
+    usable_text = (
+        text_chars >= TRIAGE_MIN_TEXT_CHARS
+        and unmapped_chars <= text_chars * TRIAGE_MAX_UNMAPPED_RATIO
+    )
+
+    if not usable_text:
+        kind = 'scanned'
+    elif image_coverage >= TRIAGE_FULL_PAGE_IMAGE:
+        # Text over a full-page image: an already OCRed scan
+        kind = 'digital'
+    elif uncovered_image_coverage >= TRIAGE_MIXED_IMAGE_COVERAGE:
+        kind = 'mixed'
+    else:
+        kind = 'digital'
+
+    return {
+        'kind': kind,
+        'text_chars': text_chars,
+        'text_coverage': min(1.0, sum(abs(rect) for rect in text_rects) / page_area),
+        'image_coverage': image_coverage,
+        'image_text_coverage': min(1.0, covered_image_area / image_area) if image_area else 0.0,
+        'text_rects': text_rects,
+        'text': "".join(texts),
+    }
+
+
+def drop_covered_elements(ocr_data: dict, text_rects: list) -> dict:
+    """Remove OCR lines whose center falls inside an existing text region"""
+    rects = [fitz.Rect(rect) for rect in text_rects]
+    kept = []
+    for element in ocr_data['text_elements']:
+        bbox = element['bbox']
+        if len(bbox) == 4:
+            center = fitz.Point((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+            if any(center in rect for rect in rects):
+                continue
+        kept.append(element)
+
+    return dict(ocr_data, text_elements=kept, total_elements=len(kept))
+
+
+def page_pixel_matrix(page, zoom: float):
+    """Matrix mapping pixels of a page rendered at ``zoom`` to the page's PDF space
+
+    Handles /Rotate and CropBox/MediaBox offsets. PyMuPDF's
+    transformation_matrix ignores the CropBox on rotated pages, so the
+    unrotated page transform is built from the boxes directly.
+    """
+    mediabox = page.mediabox
+    cropbox = page.cropbox
+    pdf_to_unrotated = fitz.Matrix(1, 0, 0, -1, -cropbox.x0, mediabox.y1 - cropbox.y0)
+    return fitz.Matrix(1 / zoom, 1 / zoom) * ~page.rotation_matrix * ~pdf_to_unrotated
+
+
+def append_page_content(page, content: bytes, merge: bool = False) -> int:
+    """Append a content stream to a fitz page, returning its xref
+
+    With ``merge`` and a page that has exactly one content stream, the bytes
+    are appended to that stream so the page keeps a single stream.
+    """
+    doc = page.parent
+    contents = page.get_contents()
+
+    if merge and len(contents) == 1:
+        xref = contents[0]
+        doc.update_stream(xref, doc.xref_stream(xref) + b"\n" + content)
+        return xref
+
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    doc.update_stream(xref, content)
+    references = " ".join(f"{x} 0 R" for x in contents + [xref])
+    doc.xref_set_key(page.xref, "Contents", f"[{references}]")
+    return xref
+
+
+# MuPDF is not thread-safe: every fitz call made from pipeline threads
+# (and from concurrent requests) is serialized through this lock
+FITZ_LOCK = threading.RLock()
+
+# End-of-stream marker passed between pipeline stages
+_PIPELINE_DONE = object()
+
+# How often blocked pipeline stages wake up to check for cancellation
+_QUEUE_POLL_SECONDS = 0.5
+
+
+def _queue_put(target: queue.Queue, item, stop: threading.Event) -> bool:
+    """Put onto a bounded queue, giving up if the pipeline was stopped"""
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=_QUEUE_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _queue_get(source: queue.Queue, stop: threading.Event):
+    """Get from a queue, returning None if the pipeline was stopped"""
+    while not stop.is_set():
+        try:
+            return source.get(timeout=_QUEUE_POLL_SECONDS)
+        except queue.Empty:
+            continue
+    return None
+
+
+# /metrics: stage timing histogram buckets (seconds), and the window over
+# which the pages/second rate is measured
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+METRIC_RATE_WINDOW = 60
+
+
+class StageMetrics:
+    """
+    Per-stage timing histograms and throughput counters, served by /metrics
+    Stages (upload_save, render, encode, detection, recognition, overlay,
+    merge, save) are timed with ``timed(stage)``. Inside ``collect()`` the
+    stages timed on the current thread are also summed into a dict, which
+    is how per-page and per-job timings are gathered; time spent on the
+    thread's behalf elsewhere (shared OCR batches) is added with ``credit``.
+    """
+
+    def __init__(self, buckets: tuple = METRIC_BUCKETS):
+        self.buckets = buckets
+        self.pages = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._histograms = {}  # stage -> [per-bucket counts (+Inf last), sum, count]
+        self._page_times = deque()
+        self._queues = []  # (name, queue) of running page pipelines
+
+        # OCR processes may be forked while another thread holds the lock
+        os.register_at_fork(after_in_child=self._reset_lock)
+
+    def _reset_lock(self):
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timed(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            histogram = self._histograms.setdefault(stage, [[0] * (len(self.buckets) + 1), 0.0, 0])
+            histogram[0][bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+        self.credit({stage: seconds})
+
+    def record(self, timings: dict):
+        """Observe stage timings measured elsewhere (e.g. in an OCR process)"""
+        for stage, seconds in timings.items():
+            self.observe(stage, seconds)
+
+    def credit(self, timings: dict):
+        """Add ``timings`` to the current thread's collectors without observing them"""
+        for collector in getattr(self._local, 'collectors', ()):
+            for stage, seconds in timings.items():
+                collector[stage] = collector.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def collect(self, timings: dict = None):
+        """Sum the stages timed on this thread into ``timings`` (a new dict by default)"""
+        if timings is None:
+            timings = {}
+        if not hasattr(self._local, 'collectors'):
+            self._local.collectors = []
+        self._local.collectors.append(timings)
+        try:
+            yield timings
+        finally:
+            self._local.collectors.pop()
+
+    def page_done(self):
+        now = time.monotonic()
+        with self._lock:
+            self.pages += 1
+            self._page_times.append(now)
+            while self._page_times[0] < now - METRIC_RATE_WINDOW:
+                self._page_times.popleft()
+
+    def pages_per_second(self) -> float:
+        cutoff = time.monotonic() - METRIC_RATE_WINDOW
+        with self._lock:
+            return sum(1 for moment in self._page_times if moment >= cutoff) / METRIC_RATE_WINDOW
+
+    def track_queues(self, queues: dict) -> list:
+        """Report the depth of a running pipeline's queues; returns a handle for untrack_queues"""
+        entries = list(queues.items())
+        with self._lock:
+            self._queues.extend(entries)
+        return entries
+
+    def untrack_queues(self, entries: list):
+        with self._lock:
+            for entry in entries:
+                self._queues.remove(entry)
+
+    def render(self, gauges: dict) -> str:
+        """Prometheus text exposition; ``gauges`` maps name -> (help, value or {labels: value})"""
+        lines = [
+            "# HELP searchable_pdf_stage_seconds Time spent per conversion stage",
+            "# TYPE searchable_pdf_stage_seconds histogram",
+        ]
+        with self._lock:
+            histograms = {stage: (list(counts), total, count)
+                          for stage, (counts, total, count) in self._histograms.items()}
+            queue_depths = {}
+            for name, pipeline_queue in self._queues:
+                queue_depths[name] = queue_depths.get(name, 0) + pipeline_queue.qsize()
+            pages = self.pages
+
+        for stage, (counts, total, count) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                lines.append(f'searchable_pdf_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'searchable_pdf_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'searchable_pdf_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        lines += [
+            "# HELP searchable_pdf_pages_total Pages converted",
+            "# TYPE searchable_pdf_pages_total counter",
+            f"searchable_pdf_pages_total {pages}",
+        ]
+
+        gauges = {
+            'pages_per_second': (f"Pages converted per second over the last {METRIC_RATE_WINDOW}s",
+                                 round(self.pages_per_second(), 4)),
+            'pipeline_queue_depth': ("Pages waiting in the page pipeline queues",
+                                     {f'queue="{name}"': depth for name, depth in
+                                      (queue_depths or {'render': 0, 'assemble': 0}).items()}),
+            'peak_rss_bytes': ("Peak resident memory of the server process",
+                               resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024),
+            **gauges,
         }
+        for name, (help_text, value) in gauges.items():
+            lines += [f"# HELP searchable_pdf_{name} {help_text}", f"# TYPE searchable_pdf_{name} gauge"]
+            if isinstance(value, dict):
+                lines += [f"searchable_pdf_{name}{{{labels}}} {sample}" for labels, sample in value.items()]
+            else:
+                lines.append(f"searchable_pdf_{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+class TimedPredictor:
+    """Wraps a Surya predictor so every call is timed as ``stage``; other attributes pass through"""
+
+    def __init__(self, predictor, stage: str):
+        self.predictor = predictor
+        self.stage = stage
+
+    def __call__(self, *args, **kwargs):
+        with metrics.timed(self.stage):
+            return self.predictor(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.predictor, name)
+
+
+metrics = StageMetrics()
+
+
+# Blank page detection: share of each edge ignored (scanner borders, punch
+# holes), how much darker than the paper a pixel must be to count as ink,
+# specks smaller than this (inches) are ignored as dust, and the largest
+# inked share of the page that still counts as blank
+BLANK_MARGIN_FRACTION = 0.05
+BLANK_INK_CONTRAST = 60
+BLANK_SPECK_INCHES = 1 / 150
+BLANK_MAX_INK_RATIO = 0.00005
+
+# Oversized pages: tile edge length and overlap in rendered pixels (the
+# overlap must exceed the tallest text line), and how close to a tile's
+# inner edge a line must end to count as cut by the seam
+TILE_SIZE = 4096
+TILE_OVERLAP = 384
+TILE_EDGE_TOLERANCE = 4
+
+# Two-resolution / cascade OCR: margin added around each line before it is
+# cropped at full resolution, as a fraction of the line height
+LINE_CROP_PADDING = 0.15
+# Shared OCR batches of line crops take this many crops per page they would take
+SHARED_BATCH_LINES_PER_PAGE = 32
+OCR_STRATEGIES = ('two_resolution', 'cascade')
+
+# Bump when the cached OCR result layout changes
+OCR_CACHE_FORMAT = 1
+
+# CPU acceleration profiles (OCR_ACCELERATION) and the steps they apply:
+# inference_mode drops autograd bookkeeping around predictor calls, int8
+# swaps the recognition model's linear layers for dynamically quantized ones
+# (detection stays float, its box edges are more sensitive), compile wraps
+# the models in torch.compile
+ACCELERATION_PROFILES = {
+    'cpu': ('inference_mode',),
+    'cpu-int8': ('inference_mode', 'int8'),
+    'cpu-compile': ('inference_mode', 'compile'),
+    'cpu-int8-compile': ('inference_mode', 'int8', 'compile'),
+}
+# Acceleration steps that change the model's numerics: OCR cache keys differ by them
+NUMERIC_ACCELERATION_STEPS = ('int8', 'compile')
+# Linear layers int8 leaves in float: the vocabulary heads pick every character
+INT8_SKIP_MODULES = ('lm_head',)
+
+# Warm-up: size of the synthetic page (A4 at 100 DPI) and the lines written on it
+WARMUP_PAGE_SIZE = (827, 1169)
+WARMUP_LINES = ("Searchable PDF converter warm-up page", "Invoice 2024-001 Total 1,234.56 EUR")
+
+
+def page_tiles(width: int, height: int, tile_size: int = TILE_SIZE, overlap: int = TILE_OVERLAP) -> list:
+    """Split a ``width`` x ``height`` pixel page into overlapping tiles
+
+    Returns ``(box, core)`` pairs of (x0, y0, x1, y1) pixel boxes. Tiles are
+    spread evenly and overlap by at least ``overlap`` pixels; the cores split
+    every overlap in half so they partition the page, each pixel belonging
+    to exactly one core.
+    """
+    def spans(length):
+        if length <= tile_size:
+            return [(0, length)]
+        count = -(-(length - overlap) // (tile_size - overlap))
+        return [(start, start + tile_size) for start in
+                (index * (length - tile_size) // (count - 1) for index in range(count))]
+
+    def cores(tile_spans, length):
+        cuts = [0] + [(previous[1] + current[0]) // 2 for previous, current in zip(tile_spans, tile_spans[1:])] + [length]
+        return list(zip(cuts, cuts[1:]))
+
+    x_spans, y_spans = spans(width), spans(height)
+    x_cores, y_cores = cores(x_spans, width), cores(y_spans, height)
+
+    return [
+        ((x0, y0, x1, y1), (cx0, cy0, cx1, cy1))
+        for (y0, y1), (cy0, cy1) in zip(y_spans, y_cores)
+        for (x0, x1), (cx0, cx1) in zip(x_spans, x_cores)
+    ]
+
+
+def _box_overlap_ratio(box: list, other: list) -> float:
+    """Share of ``box``'s area covered by ``other``"""
+    width = min(box[2], other[2]) - max(box[0], other[0])
+    height = min(box[3], other[3]) - max(box[1], other[1])
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    if width <= 0 or height <= 0 or area <= 0:
+        return 0.0
+    return width * height / area
+
+
+def _stitch_line_text(left: dict, right: dict) -> str:
+    """Join the texts of two pieces of one line that overlap at a tile seam"""
+    left_text, right_text = left['text'], right['text']
+
+    # Characters read twice in the overlap usually match exactly
+    for size in range(min(len(left_text), len(right_text)), 2, -1):
+        if left_text[-size:] == right_text[:size]:
+            return left_text + right_text[size:]
+
+    # Otherwise drop the share of the right piece lying under the left one
+    right_width = right['bbox'][2] - right['bbox'][0]
+    overlap = max(0.0, left['bbox'][2] - right['bbox'][0])
+    skip = round(len(right_text) * overlap / right_width) if right_width > 0 else 0
+    return f"{left_text} {right_text[skip:].lstrip()}".rstrip()
+
+
+def merge_tile_lines(tiles: list, page_size: tuple) -> list:
+    """Merge OCR lines of overlapping tiles into one de-duplicated page result
+
+    ``tiles`` holds ``{'box', 'core', 'elements'}`` dicts with element bboxes
+    already in page pixels. Lines seen whole are kept by the tile whose core
+    holds their center. Lines cut by a tile's inner edge are dropped when
+    another tile saw them whole; the remaining pieces of lines longer than
+    the overlap are stitched together left to right.
+    """
+    page_width, page_height = page_size
+    tolerance = TILE_EDGE_TOLERANCE
+
+    whole = []
+    pieces = []
+    for tile in tiles:
+        x0, y0, x1, y1 = tile['box']
+        cx0, cy0, cx1, cy1 = tile['core']
+
+        for element in tile['elements']:
+            bx0, by0, bx1, by1 = element['bbox']
+            cut = ((x0 > 0 and bx0 - x0 <= tolerance) or (x1 < page_width and x1 - bx1 <= tolerance)
+                   or (y0 > 0 and by0 - y0 <= tolerance) or (y1 < page_height and y1 - by1 <= tolerance))
+            if cut:
+                pieces.append(element)
+                continue
+
+            center_x, center_y = (bx0 + bx1) / 2, (by0 + by1) / 2
+            if cx0 <= center_x < cx1 and cy0 <= center_y < cy1:
+                whole.append(element)
+
+    pieces = [
+        piece for piece in pieces
+        if not any(_box_overlap_ratio(piece['bbox'], element['bbox']) >= 0.5 for element in whole)
+    ]
+
+    stitched = []
+    for piece in sorted(pieces, key=lambda element: element['bbox'][0]):
+        bx0, by0, bx1, by1 = piece['bbox']
+        for line in stitched:
+            lx0, ly0, lx1, ly1 = line['bbox']
+            shared_height = min(ly1, by1) - max(ly0, by0)
+            if shared_height >= 0.5 * min(ly1 - ly0, by1 - by0) and bx0 <= lx1 + tolerance:
+                if bx1 > lx1:
+                    line['text'] = _stitch_line_text(line, piece)
+                line['bbox'] = [min(lx0, bx0), min(ly0, by0), max(lx1, bx1), max(ly1, by1)]
+                line['confidence'] = min(line.get('confidence') or 1.0, piece.get('confidence') or 1.0)
+                break
+        else:
+            stitched.append(dict(piece))
+
+    return whole + stitched
+
+
+def ocr_model_version() -> str:
+    """Identify the installed OCR models so cached results expire on upgrades"""
+    try:
+        parts = [f"surya-ocr=={metadata.version('surya-ocr')}"]
+    except metadata.PackageNotFoundError:
+        parts = ['surya-ocr==unknown']
+
+    try:
+        from surya.settings import settings as surya_settings
+        parts += [surya_settings.FOUNDATION_MODEL_CHECKPOINT, surya_settings.DETECTOR_MODEL_CHECKPOINT]
+    except (ImportError, AttributeError):
+        pass
+
+    return ';'.join(parts)
+
 
-        logger.info(f"   ✅ Extracted {len(text_elements)} text elements")
+class OCRResultCache:
+    """
+    Persistent on-disk cache of OCR results
+    Keyed by a hash of the rendered page pixels, DPI and OCR model version
+    (including the numeric steps of the acceleration profile);
+    least recently used entries are evicted once the byte budget is exceeded
+    """
+
+    def __init__(self, directory: str, max_bytes: int, model_version: str = None):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._model_version = model_version
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> size in bytes, least recently used first
+        self._total_bytes = 0
+        # The folder is created and scanned on first use, so importing app
+        # (batch CLI, benchmark, tests) touches nothing on disk
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                self._load_index()
+                self._loaded = True
+
+    def _load_index(self):
+        """Rebuild the LRU order from the files on disk (mtime = last use)"""
+        files = []
+        for path in self.directory.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+
+        for _mtime, key, size in sorted(files):
+            self._entries[key] = size
+            self._total_bytes += size
+
+        with self._lock:
+            self._evict()
+
+        logger.info(f"🗄️  OCR cache: {len(self._entries)} entries, {self._total_bytes / (1024 * 1024):.1f} MB")
+
+    @property
+    def model_version(self) -> str:
+        # Resolved on first use so creating the cache does not import Surya
+        if self._model_version is None:
+            self._model_version = ocr_model_version()
+        return self._model_version
+
+    def make_key(self, pixels, width: int, height: int, dpi: int, acceleration: str = None) -> str:
+        """Hash raw page pixels (any buffer, hashed without copying) plus render and model settings
+
+        ``acceleration`` is the converter's profile: int8 or compiled models
+        read slightly differently, so their results are kept apart.
+        """
+        model = self.model_version
+        steps = [step for step in ACCELERATION_PROFILES.get(acceleration, ()) if step in NUMERIC_ACCELERATION_STEPS]
+        if steps:
+            model += '+' + '+'.join(steps)
+
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{OCR_CACHE_FORMAT}|{model}|{width}x{height}|{dpi}|".encode())
+        digest.update(pixels)
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        """Return the cached OCR result for ``key`` or None"""
+        self._ensure_loaded()
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as cache_file:
+                result = json.load(cache_file)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Touch the file so the LRU order survives restarts
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+        result['image_size'] = tuple(result['image_size'])
         return result
 
-    def create_searchable_pdf_page(self, image_path: str, ocr_data: dict, output_buffer: io.BytesIO) -> io.BytesIO:
-        """Create a single PDF page with invisible text overlay - OPTIMIZED FOR SIZE"""
-        image = Image.open(image_path)
-        
-        # Ensure RGB mode
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        img_width, img_height = image.size
-        
-        logger.info(f"   📐 Image size: {img_width}x{img_height}")
+    def put(self, key: str, result: dict):
+        """Store an OCR result, evicting old entries to stay within budget"""
+        self._ensure_loaded()
+        path = self._path(key)
+        payload = json.dumps(result, ensure_ascii=False, default=float).encode('utf-8')
+
+        try:
+            path.parent.mkdir(exist_ok=True)
+            temp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(temp_path, 'wb') as cache_file:
+                cache_file.write(payload)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"⚠️  Could not write OCR cache entry: {e}")
+            return
+
+        with self._lock:
+            self._total_bytes += len(payload) - self._entries.pop(key, 0)
+            self._entries[key] = len(payload)
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the budget is met (lock held)"""
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size"""
+        self._ensure_loaded()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Converter whose predictors forked OCR processes use (set before forking)
+_POOL_CONVERTER = None
+
+
+def _init_ocr_process(threads: int):
+    """Give each forked OCR process its own share of the CPU cores"""
+    import torch
+    torch.set_num_threads(threads)
+
+
+def _ocr_process_call(method: str, items: list) -> tuple:
+    # Stage timings travel back with the results, metrics live in the parent
+    with metrics.collect() as timings:
+        results = getattr(_POOL_CONVERTER, method)(items)
+    return results, timings
 
-        # Create canvas with exact image dimensions
-        pdf_canvas = canvas.Canvas(output_buffer, pagesize=(img_width, img_height))
-
-        # Compress image to JPEG in memory to reduce size
-        jpeg_buffer = io.BytesIO()
-        image.save(jpeg_buffer, format='JPEG', quality=85, optimize=True)
-        jpeg_buffer.seek(0)
-        
-        # Draw the compressed JPEG image (background layer)
-        pdf_canvas.drawImage(
-            ImageReader(jpeg_buffer),
-            0, 0,
-            width=img_width,
-            height=img_height,
-            preserveAspectRatio=True
+
+class OCRProcessPool:
+    """
+    Runs OCR in forked worker processes sharing the parent's model weights
+    Create it right after the models are loaded, before any inference and
+    before the process starts other threads (job workers, the web server):
+    children then map the loaded weight pages copy-on-write instead of each
+    holding its own copy, and inherit no lock some other thread held.
+    initialize_ocr arranges this when it runs inline at startup.
+    """
+
+    def __init__(self, converter, processes: int, threads_per_process: int = None):
+        global _POOL_CONVERTER
+
+        if threads_per_process is None:
+            threads_per_process = max(1, (os.cpu_count() or 1) // processes)
+        self.processes = processes
+        self.threads_per_process = threads_per_process
+
+        _POOL_CONVERTER = converter
+        self._executor = ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_ocr_process,
+            initargs=(threads_per_process,),
         )
 
-        text_count = 0
-        skipped_count = 0
-        
-        for element in ocr_data['text_elements']:
-            text = element['text']
+        # Fork every worker now (a fork context starts them all on the first
+        # submit); only the forking thread survives in the children
+        if threading.active_count() > 1:
+            logger.warning(f"⚠️  Forking OCR processes with {threading.active_count()} threads running; "
+                           f"load the models at startup (MODEL_LOADING='eager') before serving")
+        for future in [self._executor.submit(os.getpid) for _ in range(processes)]:
+            future.result()
+        logger.info(f"🧵 Started {processes} OCR processes ({threads_per_process} torch threads each)")
+
+    def map(self, method: str, items: list) -> list:
+        """Run converter ``method`` on ``items`` split into one contiguous chunk per process, results in input order"""
+        if not items:
+            return []
+        chunk_size = -(-len(items) // self.processes)
+        futures = [
+            self._executor.submit(_ocr_process_call, method, items[start:start + chunk_size])
+            for start in range(0, len(items), chunk_size)
+        ]
+
+        results = []
+        for future in futures:
+            chunk_results, timings = future.result()
+            metrics.record(timings)
+            results.extend(chunk_results)
+        return results
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+class BatchingOCRService:
+    """
+    Collects OCR work from all in-flight conversions into shared batches
+    Work is grouped by converter method (whole pages, line detection, line
+    crops) and ``run(method, items)`` does one batch. A batch is dispatched
+    once ``max_batch_size`` pages (SHARED_BATCH_LINES_PER_PAGE times as many
+    line crops) are waiting or its first item has waited ``max_wait``
+    seconds, so a lone request only pays the wait once per batch. Callers
+    get one future per item.
+    """
 
-            if not text or not text.strip():
-                skipped_count += 1
+    def __init__(self, run, max_batch_size: int = 16, max_wait: float = 0.05):
+        self._run = run
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = queue.Queue()
+        # Items of another method than the batch being collected, oldest first
+        self._deferred = deque()
+        self.batches = 0
+        self.pages = 0
+
+        threading.Thread(target=self._dispatch_loop, name='ocr-batcher', daemon=True).start()
+
+    def submit(self, item, method: str = 'recognize_images') -> Future:
+        future = Future()
+        self._pending.put((method, item, future))
+        return future
+
+    def recognize(self, items: list, method: str = 'recognize_images') -> list:
+        """Blocking helper: run ``method`` on ``items`` through the shared batches, in order"""
+        futures = [self.submit(item, method) for item in items]
+        results = []
+        for future in futures:
+            results.append(future.result())
+            # Each page is credited its share of its batch's stage timings
+            metrics.credit(future.timings)
+        return results
+
+    def _next_batch(self) -> tuple:
+        """The oldest waiting item's method and up to one batch of items for it"""
+        first = self._deferred.popleft() if self._deferred else self._pending.get()
+        method = first[0]
+        limit = self.max_batch_size
+        if method == 'recognize_lines':
+            limit *= SHARED_BATCH_LINES_PER_PAGE
+
+        batch = [first]
+        for entry in list(self._deferred):
+            if len(batch) == limit:
+                break
+            if entry[0] == method:
+                self._deferred.remove(entry)
+                batch.append(entry)
+
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < limit:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                entry = self._pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            (batch if entry[0] == method else self._deferred).append(entry)
+        return method, batch
+
+    def _dispatch_loop(self):
+        while True:
+            method, batch = self._next_batch()
+            if method == 'recognize_images':
+                self.batches += 1
+                self.pages += len(batch)
+            logger.info(f"   📦 Shared OCR batch: {len(batch)} x {method}")
+
+            try:
+                with metrics.collect() as timings:
+                    results = self._run(method, [item for _method, item, _future in batch])
+            except Exception as e:
+                for _method, _item, future in batch:
+                    future.set_exception(e)
                 continue
 
-            bbox = element['bbox']
+            share = {stage: seconds / len(batch) for stage, seconds in timings.items()}
+            for (_method, _item, future), result in zip(batch, results):
+                future.timings = share
+                future.set_result(result)
 
-            try:
-                # Ensure bbox has 4 coordinates
-                if len(bbox) != 4:
-                    logger.debug(f"Invalid bbox format: {bbox}")
-                    skipped_count += 1
-                    continue
-                
-                x1, y1, x2, y2 = bbox
-                
-                # Validate bbox coordinates
-                if x1 >= x2 or y1 >= y2:
-                    logger.debug(f"Invalid bbox dimensions: ({x1}, {y1}, {x2}, {y2})")
-                    skipped_count += 1
-                    continue
+    def stats(self) -> dict:
+        return {
+            'batches': self.batches,
+            'pages': self.pages,
+            'average_batch': self.pages / self.batches if self.batches else 0.0,
+            'waiting': self._pending.qsize() + len(self._deferred),
+        }
 
-                bbox_width = x2 - x1
-                bbox_height = y2 - y1
 
-                # Skip very small boxes
-                if bbox_width < 2 or bbox_height < 2:
-                    skipped_count += 1
-                    continue
+class SearchableDocumentConverter:
+    """
+    Universal converter for making documents searchable
+    Supports: PDF, PNG, JPG, JPEG, TIFF
+    """
 
-                # CRITICAL FIX: Convert coordinates from top-left to bottom-left origin
-                # OCR typically uses top-left (0,0), PDF uses bottom-left (0,0)
-                pdf_x = x1
-                pdf_y = img_height - y2  # Flip Y coordinate
+    def __init__(self, batch_size: int = None, render_workers: int = 2, ocr_cache: OCRResultCache = None,
+                 memory_budget: int = None, tile_page_pixels: int = None, acceleration: str = None,
+                 torch_threads: int = None, torch_interop_threads: int = None):
+        """Initialize Surya OCR models
+
+        ``batch_size`` is the default number of pages per OCR call for PDF
+        conversion; ``None`` sizes batches automatically from available RAM.
+        ``render_workers`` is the number of page render threads feeding OCR.
+        ``ocr_cache`` optionally serves repeated pages without running OCR.
+        ``memory_budget`` (bytes) is the default for bounded-memory conversion.
+        Pages rendering to more than ``tile_page_pixels`` are OCRed in tiles.
+        ``acceleration`` names a CPU profile from ACCELERATION_PROFILES and
+        ``torch_threads`` / ``torch_interop_threads`` size torch's thread pools;
+        both take effect when the models are loaded.
+
+        The models are not loaded here: call load_models (and warm_up), or
+        let the first OCR call load them.
+        """
+        if acceleration is not None and acceleration not in ACCELERATION_PROFILES:
+            raise ValueError(f"Unknown acceleration profile: {acceleration}")
+
+        self._recognition_predictor = None
+        self._detection_predictor = None
+        self._models_lock = threading.Lock()
+        self._inference_mode = None
+        self.acceleration = acceleration
+        self.torch_threads = torch_threads
+        self.torch_interop_threads = torch_interop_threads
+        self.model_status = {'state': 'not_loaded', 'load_seconds': None, 'warmup_seconds': None,
+                             'acceleration': [], 'error': None}
 
-                # IMPROVED: Better font size calculation
-                # Use 75% of bbox height as a starting point
-                font_size = max(6, min(72, bbox_height * 0.75))  # Min 6pt, Max 72pt
+        self.image_formats = {'.png', '.jpg', '.jpeg', '.tiff', '.tif', '.bmp'}
+        self.tiff_formats = {'.tiff', '.tif'}  # Multi-page ones go through the page pipeline
+        self.pdf_format = {'.pdf'}
+        self.batch_size = batch_size
+        self.render_workers = render_workers
+        self.ocr_cache = ocr_cache
+        self.memory_budget = memory_budget
+        self.tile_page_pixels = tile_page_pixels
+        self.ocr_pool = None
+        self.ocr_service = None
+
+    def load_models(self):
+        """Import Surya and load the predictors; later and concurrent calls wait for the first"""
+        with self._models_lock:
+            if self._recognition_predictor is not None:
+                return
+
+            logger.info("🔄 Loading Surya OCR models...")
+            self.model_status['state'] = 'loading'
+            start = time.perf_counter()
+            try:
+                from surya.foundation import FoundationPredictor
+                from surya.recognition import RecognitionPredictor
+                from surya.detection import DetectionPredictor
 
-                pdf_canvas.saveState()
+                # Thread pools must be sized before torch runs anything in parallel
+                self._configure_torch_threads()
 
-                # Create text object at the calculated position
-                text_obj = pdf_canvas.beginText(pdf_x, pdf_y)
-                
-                # Mode 3: Invisible text (neither fill nor stroke)
-                text_obj.setTextRenderMode(3)
-                
-                # Use Helvetica (always available)
-                text_obj.setFont("Helvetica", font_size)
+                foundation_predictor = FoundationPredictor()
+                detection_predictor = DetectionPredictor()
+                if self.acceleration:
+                    self.model_status['acceleration'] = self._accelerate(foundation_predictor, detection_predictor)
+
+                # Detection runs inside recognition calls; the proxy times it separately
+                self._detection_predictor = TimedPredictor(detection_predictor, 'detection')
+                self._recognition_predictor = RecognitionPredictor(foundation_predictor)
+            except Exception as e:
+                self.model_status.update(state='failed', error=str(e))
+                raise
 
-                # IMPROVED: Calculate horizontal scaling more accurately
+            self.model_status.update(state='loaded', load_seconds=round(time.perf_counter() - start, 3))
+            logger.info(f"✅ Models loaded successfully ({self.model_status['load_seconds']:.1f}s)")
+
+    def _configure_torch_threads(self):
+        if not (self.torch_threads or self.torch_interop_threads):
+            return
+
+        import torch
+        if self.torch_threads:
+            torch.set_num_threads(self.torch_threads)
+        if self.torch_interop_threads:
+            try:
+                torch.set_num_interop_threads(self.torch_interop_threads)
+            except RuntimeError as e:
+                # Only allowed before the first inter-op parallel work in this process
+                logger.warning(f"⚠️  Could not set torch inter-op threads: {e}")
+        logger.info(f"🧵 torch threads: {torch.get_num_threads()} intra-op, "
+                    f"{torch.get_num_interop_threads()} inter-op")
+
+    def _accelerate(self, foundation_predictor, detection_predictor) -> list:
+        """Apply the CPU acceleration profile to freshly loaded predictors, returns the steps applied"""
+        import torch
+
+        steps = ACCELERATION_PROFILES[self.acceleration]
+        applied = []
+
+        if 'int8' in steps:
+            model = foundation_predictor.model
+            parameter = next(model.parameters(), None)
+            if parameter is None or parameter.dtype != torch.float32 or parameter.device.type != 'cpu':
+                logger.warning("⚠️  int8 quantization needs a float32 CPU model, skipped")
+            else:
+                qconfig = {
+                    name: torch.ao.quantization.default_dynamic_qconfig
+                    for name, module in model.named_modules()
+                    if isinstance(module, torch.nn.Linear) and not any(skip in name for skip in INT8_SKIP_MODULES)
+                }
+                torch.ao.quantization.quantize_dynamic(model, qconfig, dtype=torch.qint8, inplace=True)
+                applied.append(f"int8:{len(qconfig)}")
+                logger.info(f"⚡ Quantized {len(qconfig)} recognition linear layers to int8")
+
+        if 'compile' in steps:
+            for predictor in (foundation_predictor, detection_predictor):
                 try:
-                    text_width = pdfmetrics.stringWidth(text, "Helvetica", font_size)
-                    if text_width > 0:
-                        # Calculate scaling to fit bbox width
-                        h_scale = (bbox_width / text_width) * 100
-                        # Clamp to reasonable values (50% to 200%)
-                        h_scale = max(50, min(200, h_scale))
-                        text_obj.setHorizScale(h_scale)
+                    # Compiles on first call (warm-up); page sizes vary, so dynamic shapes
+                    predictor.model = torch.compile(predictor.model, dynamic=True)
                 except Exception as e:
-                    logger.debug(f"Could not calculate text width: {e}")
-                    # Use default 100% scaling if calculation fails
-                    text_obj.setHorizScale(100)
+                    logger.warning(f"⚠️  torch.compile failed for {type(predictor).__name__}: {e}")
+                    break
+            else:
+                applied.append('compile')
+
+        if 'inference_mode' in steps:
+            self._inference_mode = torch.inference_mode
+            applied.append('inference_mode')
+
+        logger.info(f"⚡ Acceleration profile '{self.acceleration}': {', '.join(applied) or 'nothing applied'}")
+        return applied
+
+    def _inference(self):
+        """Context for predictor calls: torch.inference_mode when the profile asks for it"""
+        return self._inference_mode() if self._inference_mode is not None else nullcontext()
+
+    @property
+    def recognition_predictor(self):
+        if self._recognition_predictor is None:
+            self.load_models()
+        return self._recognition_predictor
+
+    @property
+    def detection_predictor(self):
+        if self._detection_predictor is None:
+            self.load_models()
+        return self._detection_predictor
+
+    @property
+    def models_loaded(self) -> bool:
+        return self._recognition_predictor is not None
+
+    def warm_up(self):
+        """Run one OCR call on a synthetic page so the first real request pays no lazy setup
+
+        Goes through the OCR processes when they are running (one page per
+        process) and bypasses the cache and shared batching.
+        """
+        image = Image.new('RGB', WARMUP_PAGE_SIZE, 'white')
+        draw = ImageDraw.Draw(image)
+        for index, line in enumerate(WARMUP_LINES):
+            draw.text((60, 80 + index * 40), line, fill='black')
+
+        self.model_status['state'] = 'warming_up'
+        start = time.perf_counter()
+        processes = self.ocr_pool.processes if self.ocr_pool else 1
+        self._run_ocr('recognize_images', [image] * processes)
+        self.model_status['warmup_seconds'] = round(time.perf_counter() - start, 3)
+        logger.info(f"🔥 Warm-up OCR took {self.model_status['warmup_seconds']:.2f}s")
+
+    def start_ocr_processes(self, processes: int, threads_per_process: int = None):
+        """Move OCR into ``processes`` forked workers
+
+        Call right after load_models, before any OCR runs and before
+        start_shared_batching, so the workers share the loaded weights.
+        """
+        if processes > 0:
+            self.ocr_pool = OCRProcessPool(self, processes, threads_per_process)
+
+    def start_shared_batching(self, max_batch_size: int, max_wait: float):
+        """Route OCR through one BatchingOCRService shared by all conversions"""
+        self.ocr_service = BatchingOCRService(self._run_ocr, max_batch_size, max_wait)
+
+    def extract_text_with_coordinates(self, image, use_cache: bool = True) -> dict:
+        """Extract text and exact coordinates using Surya OCR
+
+        ``image`` is a file path or an already decoded PIL image.
+        """
+        if isinstance(image, Image.Image):
+            logger.info(f"🔍 Extracting text from in-memory image {image.size[0]}x{image.size[1]}")
+        else:
+            logger.info(f"🔍 Extracting text from: {Path(image).name}")
 
-                # Add the text
-                text_obj.textLine(text)
-                pdf_canvas.drawText(text_obj)
-                pdf_canvas.restoreState()
+        image = load_rgb_image(image)
 
-                text_count += 1
+        cache_key = None
+        if use_cache and self.ocr_cache is not None:
+            cache_key = self.ocr_cache.make_key(image.tobytes(), image.size[0], image.size[1], 0, self.acceleration)
 
-            except Exception as e:
-                logger.debug(f"Could not add text '{text[:30]}...': {e}")
-                skipped_count += 1
+        result = self.extract_text_from_images([image], cache_keys=[cache_key])[0]
+
+        logger.info(f"   ✅ Extracted {result['total_elements']} text elements")
+        return result
+
+    def extract_text_from_images(self, images: list, cache_keys: list = None) -> list:
+        """Extract text from several page images with a single batched Surya call
+
+        ``cache_keys`` (one per image, None to skip) are looked up in the OCR
+        cache first; only the misses are sent to the predictors.
+        """
+        if not images:
+            return []
+
+        results = [None] * len(images)
+        cache = self.ocr_cache if cache_keys else None
+        if cache is not None:
+            for index, key in enumerate(cache_keys):
+                if key:
+                    results[index] = cache.get(key)
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if cache is not None and len(missing) < len(images):
+            logger.info(f"   🗄️  OCR cache: {len(images) - len(missing)}/{len(images)} pages served from cache")
+        if not missing:
+            return results
+
+        recognized = self._dispatch_ocr('recognize_images', [images[index] for index in missing])
+
+        for index, result in zip(missing, recognized):
+            results[index] = result
+            if cache is not None and cache_keys[index]:
+                cache.put(cache_keys[index], result)
+
+        return results
+
+    def _dispatch_ocr(self, method: str, items: list) -> list:
+        """Run an OCR ``method`` (recognize_images, detect_lines, recognize_lines)
+        through shared batching when it is on, like every predictor call"""
+        if self.ocr_service is not None:
+            return self.ocr_service.recognize(items, method)
+        return self._run_ocr(method, items)
+
+    def _run_ocr(self, method: str, items: list) -> list:
+        """Run one batch of an OCR ``method``, in the worker processes when they are running"""
+        if self.ocr_pool is not None:
+            return self.ocr_pool.map(method, items)
+        return getattr(self, method)(items)
+
+    def recognize_images(self, images: list) -> list:
+        """Run detection + recognition on ``images`` in this process"""
+        with metrics.collect() as inner:
+            start = time.perf_counter()
+            with self._inference():
+                predictions = self.recognition_predictor(images, det_predictor=self.detection_predictor)
+            elapsed = time.perf_counter() - start
+        metrics.observe('recognition', elapsed - inner.get('detection', 0.0))
+
+        # Surya returns one prediction per input image, in input order
+        results = []
+        for index, image in enumerate(images):
+            page_pred = predictions[index] if predictions and index < len(predictions) else None
+            results.append(self._build_ocr_result(image.size, page_pred))
+
+        return results
+
+    def extract_text_two_resolution(self, items: list) -> list:
+        """Detect lines on low resolution renders, recognize them from full resolution crops
+
+        Each item carries the low resolution image (``image``), the full page
+        size (``image_size``), the ratio between both (``low_scale``) and the
+        source of full resolution pixels (``line_source``: a PIL image or a
+        fitz DisplayList rendered at ``zoom``). Boxes are returned in full
+        resolution pixels, like extract_text_from_images. Detection and crop
+        recognition go through shared batching and the OCR processes too.
+        """
+        cache = self.ocr_cache
+        results = [None] * len(items)
+        if cache is not None:
+            for index, item in enumerate(items):
+                if item.get('cache_key'):
+                    results[index] = cache.get(item['cache_key'])
+
+        missing = [index for index, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+
+        detections = self._dispatch_ocr('detect_lines', [items[index]['image'] for index in missing])
+
+        crops = []
+        owners = []
+        for index, line_boxes in zip(missing, detections):
+            item = items[index]
+            scale = item['low_scale']
+
+            for box in line_boxes:
+                bbox = [coord * scale for coord in box]
+                if bbox[2] - bbox[0] < 2 or bbox[3] - bbox[1] < 2:
+                    continue
+                crops.append(self._crop_line(item, bbox))
+                owners.append((index, bbox))
+
+        logger.info(f"   🔭 Recognizing {len(crops)} line crops from {len(missing)} pages")
+        elements = {index: [] for index in missing}
+        for (index, bbox), line in zip(owners, self._dispatch_ocr('recognize_lines', crops)):
+            if line is None:
                 continue
+            elements[index].append(dict(line, bbox=bbox))
+
+        for index in missing:
+            results[index] = {
+                'image_size': tuple(items[index]['image_size']),
+                'text_elements': elements[index],
+                'total_elements': len(elements[index]),
+            }
+            if cache is not None and items[index].get('cache_key'):
+                cache.put(items[index]['cache_key'], results[index])
+
+        return results
+
+    def extract_text_cascade(self, items: list, confidence_threshold: float) -> list:
+        """OCR low resolution renders, then re-read only the weak lines at full resolution
+
+        The first pass goes through extract_text_from_images (cache, shared
+        batching and OCR processes apply). Lines whose confidence is below
+        ``confidence_threshold`` are recognized again from full resolution
+        crops and replaced when the second reading is more confident. Items
+        are laid out as for extract_text_two_resolution.
+        """
+        first_pass = self.extract_text_from_images(
+            [item['image'] for item in items],
+            cache_keys=[item.get('cache_key') for item in items],
+        )
 
-        logger.info(f"   ✅ Added {text_count} text elements to PDF layer (skipped {skipped_count})")
+        results = []
+        crops = []
+        weak_lines = []  # (element, result it belongs to)
+        for item, ocr_data in zip(items, first_pass):
+            scale = item['low_scale']
+            result = {
+                'image_size': tuple(item['image_size']),
+                'text_elements': [],
+                'total_elements': ocr_data['total_elements'],
+                'escalated_lines': 0,
+            }
+            results.append(result)
+
+            for element in ocr_data['text_elements']:
+                element = dict(element, bbox=[coord * scale for coord in element['bbox']])
+                result['text_elements'].append(element)
+
+                confidence = element.get('confidence')
+                if confidence is not None and confidence < confidence_threshold:
+                    crops.append(self._crop_line(item, element['bbox']))
+                    weak_lines.append((element, result))
+
+        if not crops:
+            return results
+
+        improved = 0
+        for (element, result), line in zip(weak_lines, self._dispatch_ocr('recognize_lines', crops)):
+            result['escalated_lines'] += 1
+            confidence = line.get('confidence') if line is not None else None
+            if confidence is not None and confidence > element['confidence']:
+                element['text'] = line['text']
+                element['confidence'] = confidence
+                improved += 1
+
+        logger.info(f"   ⬆️  Re-read {len(crops)} weak lines at full resolution, {improved} improved")
+        return results
+
+    def detect_lines(self, images: list) -> list:
+        """Run line detection on ``images`` in this process, returns each image's line boxes"""
+        with self._inference():
+            detections = self.detection_predictor(images)
+        return [[list(box.bbox) for box in getattr(detection, 'bboxes', None) or []] for detection in detections]
+
+    def recognize_lines(self, crops: list) -> list:
+        """Recognize single-line crops in this process, returns {'text', 'confidence'} (or None) per crop"""
+        if not crops:
+            return []
+
+        with metrics.timed('recognition'), self._inference():
+            predictions = self.recognition_predictor(
+                crops, bboxes=[[[0, 0, crop.width, crop.height]] for crop in crops])
+
+        lines = []
+        for prediction in predictions:
+            text_lines = getattr(prediction, 'text_lines', None)
+            if text_lines and text_lines[0].text.strip():
+                lines.append({'text': text_lines[0].text.strip(),
+                              'confidence': getattr(text_lines[0], 'confidence', 1.0)})
+            else:
+                lines.append(None)
+        return lines
+
+    @staticmethod
+    def _crop_line(item: dict, bbox: list) -> Image.Image:
+        """Full resolution pixels of one line (plus padding) for a low resolution item
+
+        Cut from the full page image when there is one, otherwise rendered
+        from the page's display list through a clip rect.
+        """
+        width, height = item['image_size']
+        x1, y1, x2, y2 = bbox
+        pad = (y2 - y1) * LINE_CROP_PADDING
+        box = (
+            max(0, int(x1 - pad)), max(0, int(y1 - pad)),
+            min(width, int(x2 + pad + 1)), min(height, int(y2 + pad + 1)),
+        )
+
+        source = item['line_source']
+        if isinstance(source, Image.Image):
+            return source.crop(box)
+
+        zoom = item['zoom']
+        with FITZ_LOCK:
+            pix = source.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=fitz.Rect(box) / zoom, alpha=False)
+            return pixmap_to_image(pix)
+
+    def extract_text_tiled(self, item: dict, batch_size: int = 1) -> dict:
+        """OCR an oversized page as overlapping tiles rendered from its display list
+
+        At most ``batch_size`` tiles are decoded at a time, so peak memory
+        follows the tile size rather than the page size. Line boxes are moved
+        back to page pixels and the tile seams merged by merge_tile_lines.
+        When the item asks for a background, each tile's core is JPEG-encoded
+        into ``item['background_tiles']`` as ``(core, jpeg)`` pairs.
+        """
+        width, height = item['image_size']
+        zoom = item['zoom']
+        matrix = fitz.Matrix(zoom, zoom)
+        dpi = round(zoom * 72)
+        tiles = page_tiles(width, height)
+        logger.info(f"🧩 Page {item['page_num'] + 1}: {width}x{height} px in {len(tiles)} tiles")
+
+        tile_results = []
+        background_tiles = []
+        for start in range(0, len(tiles), max(1, batch_size)):
+            chunk = tiles[start:start + max(1, batch_size)]
+            images = []
+            cache_keys = []
+            for box, core in chunk:
+                with FITZ_LOCK, metrics.timed('render'):
+                    pix = item['line_source'].get_pixmap(matrix=matrix, clip=fitz.Rect(box) / zoom, alpha=False)
+                cache_key = None
+                if item.get('use_cache') and self.ocr_cache is not None:
+                    cache_key = self.ocr_cache.make_key(pix.samples_mv, pix.width, pix.height,
+                                                        f"{dpi}@{box[0]},{box[1]}", self.acceleration)
+                image = pixmap_to_image(pix)
+                pix = None
+                if item.get('encode_background'):
+                    core_box = (core[0] - box[0], core[1] - box[1], core[2] - box[0], core[3] - box[1])
+                    background_tiles.append((core, encode_jpeg(image.crop(core_box))))
+                images.append(image)
+                cache_keys.append(cache_key)
+
+            for (box, core), ocr_data in zip(chunk, self.extract_text_from_images(images, cache_keys=cache_keys)):
+                x0, y0 = box[0], box[1]
+                elements = [
+                    dict(element, bbox=[element['bbox'][0] + x0, element['bbox'][1] + y0,
+                                        element['bbox'][2] + x0, element['bbox'][3] + y0])
+                    for element in ocr_data['text_elements']
+                ]
+                tile_results.append({'box': box, 'core': core, 'elements': elements})
+            images = None
+
+        if item.get('encode_background'):
+            item['background_tiles'] = background_tiles
+
+        text_elements = merge_tile_lines(tile_results, (width, height))
+        return {
+            'image_size': (width, height),
+            'text_elements': text_elements,
+            'total_elements': len(text_elements)
+        }
+
+    @staticmethod
+    def _build_ocr_result(image_size: tuple, page_pred) -> dict:
+        """Convert a Surya page prediction into our OCR result dict"""
+        text_elements = []
+
+        if page_pred is not None and hasattr(page_pred, 'text_lines'):
+            for line in page_pred.text_lines:
+                if hasattr(line, 'bbox') and line.bbox:
+                    text_elements.append({
+                        'text': line.text.strip(),
+                        'bbox': line.bbox,
+                        'confidence': getattr(line, 'confidence', 1.0)
+                    })
 
-        pdf_canvas.showPage()
-        pdf_canvas.save()
+        return {
+            'image_size': tuple(image_size),
+            'text_elements': text_elements,
+            'total_elements': len(text_elements)
+        }
+
+    def resolve_batch_size(self, batch_size, page_pixels: int) -> int:
+        """Pick how many rendered pages go into one OCR call
+
+        An explicit positive batch size wins. Otherwise the batch is sized so
+        that the decoded pages of one batch fit in a share of available RAM.
+        """
+        if batch_size:
+            return max(1, int(batch_size))
+
+        available = available_memory_bytes()
+        if available <= 0 or page_pixels <= 0:
+            return DEFAULT_OCR_BATCH_SIZE
+
+        # Each page lives as pixmap + decoded RGB image + OCR working copies
+        bytes_per_page = page_pixels * 3 * 3
+        budget = available * AUTO_BATCH_MEMORY_FRACTION
+        batch_size = max(1, min(MAX_AUTO_BATCH_SIZE, int(budget // bytes_per_page)))
+
+        # Every OCR process should get at least one page of each batch
+        if self.ocr_pool is not None:
+            batch_size = max(batch_size, self.ocr_pool.processes)
+        return batch_size
+
+    def create_searchable_pdf_page(self, image, ocr_data: dict, output_buffer: io.BytesIO,
+                                   jpeg_data: bytes = None, passthrough: dict = None) -> io.BytesIO:
+        """Create a single PDF page with invisible text overlay - OPTIMIZED FOR SIZE
+
+        ``image`` is a file path or a decoded PIL image. Pass ``jpeg_data`` when
+        the page has already been JPEG-encoded, or ``passthrough`` (see
+        passthrough_image) to embed the original file's encoded image, so it
+        is embedded as-is.
+        """
+        image = load_rgb_image(image)
+
+        # Compress image to JPEG in memory to reduce size (only once per page)
+        if jpeg_data is None and passthrough is None:
+            jpeg_data = encode_jpeg(image)
+
+        with FITZ_LOCK:
+            page_pdf = fitz.open()
+            self.add_searchable_image_page(page_pdf, image.size, jpeg_data, ocr_data, passthrough=passthrough)
+            with metrics.timed('save'):
+                page_pdf.save(output_buffer, garbage=3, deflate=True)
+            page_pdf.close()
 
         output_buffer.seek(0)
         return output_buffer
 
-    def convert_image_to_searchable_pdf(self, image_path: str, output_path: str) -> str:
+    def add_searchable_image_page(self, output_pdf, image_size: tuple, jpeg_data: bytes, ocr_data: dict,
+                                  background_tiles: list = None, passthrough: dict = None):
+        """Append a page showing the JPEG image with the OCR text layer on top
+
+        The page is built directly in ``output_pdf`` (no intermediate PDF); the
+        image and the invisible text share a single content stream. Tiled pages
+        pass ``background_tiles`` (pixel box, JPEG) pairs instead of
+        ``jpeg_data``, image files can pass a ``passthrough`` stream instead.
+        Callers running concurrently must hold FITZ_LOCK.
+        """
+        img_width, img_height = image_size
+
+        logger.info(f"   📐 Image size: {img_width}x{img_height}")
+
+        # Page has the exact image dimensions, image is the background layer
+        with metrics.timed('merge'):
+            page = output_pdf.new_page(width=img_width, height=img_height)
+            if background_tiles:
+                for box, tile_jpeg in background_tiles:
+                    page.insert_image(fitz.Rect(box), stream=tile_jpeg)
+            elif passthrough:
+                insert_passthrough_image(page, page.rect, passthrough)
+            else:
+                page.insert_image(page.rect, stream=jpeg_data)
+
+        # OCR pixel space (top-left origin) -> PDF space (bottom-left origin)
+        pixel_to_pdf = fitz.Matrix(1, 0, 0, -1, 0, img_height)
+        with metrics.timed('overlay'):
+            self.write_text_layer(page, ocr_data, pixel_to_pdf, merge=True)
+        return page
+
+    def write_text_layer(self, page, ocr_data: dict, pixel_to_pdf, merge: bool = False) -> int:
+        """Write OCR lines as invisible (render mode 3) text onto a fitz page
+
+        ``pixel_to_pdf`` maps OCR pixel coordinates to the page's PDF user
+        space. All lines go into one text object in one content stream (see
+        build_text_layer), which references a single Helvetica font object
+        shared by every page of the document. With ``merge`` the stream is
+        appended to the page's existing single content stream instead of
+        being added as a new one.
+        """
+        text_layer, text_count, skipped_count = build_text_layer(ocr_data['text_elements'])
+
+        if text_layer:
+            insert_text_layer_font(page)
+            m = pixel_to_pdf
+            content = (f"q\n{m.a:.6f} {m.b:.6f} {m.c:.6f} {m.d:.6f} {m.e:.4f} {m.f:.4f} cm\n".encode('latin-1')
+                       + text_layer + b"\nQ\n")
+            append_page_content(page, content, merge=merge)
+
+        logger.info(f"   ✅ Added {text_count} text elements to PDF layer (skipped {skipped_count})")
+        return text_count
+
+    def convert_image_to_searchable_pdf(self, image_path: str, output_path: str, use_cache: bool = True,
+                                        skip_blank: bool = False, report: dict = None) -> str:
         """Convert a single image to searchable PDF"""
         logger.info("📄 Converting image to searchable PDF")
 
-        ocr_data = self.extract_text_with_coordinates(image_path)
+        if report is None:
+            report = {}
+        with metrics.collect(report.setdefault('timings', {})):
+            result = self._convert_image(image_path, output_path, use_cache, skip_blank, report)
+        metrics.page_done()
+        return result
 
-        if ocr_data['total_elements'] == 0:
+    def _convert_image(self, image_path: str, output_path: str, use_cache: bool, skip_blank: bool,
+                       report: dict) -> str:
+        """Steps of convert_image_to_searchable_pdf, timed into ``report['timings']``"""
+        # Decode once and share the image between OCR and page building; the
+        # page embeds the file's own encoded image when PDF can take it as-is
+        with metrics.timed('render'):
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            source = Image.open(io.BytesIO(data))
+            passthrough = passthrough_image(source, data)
+            image = load_rgb_image(source)
+        if passthrough:
+            logger.info(f"🖼️  Embedding the original {source.format} image data ({passthrough['filter'][1:]})")
+
+        blank = False
+        if skip_blank:
+            coverage = ink_coverage(np.asarray(image), image.info.get('dpi', (150, 150))[0])
+            blank = coverage < BLANK_MAX_INK_RATIO
+
+        if blank:
+            logger.info(f"⬜ Image is blank (ink {coverage:.4%}), skipping OCR")
+            ocr_data = {'image_size': image.size, 'text_elements': [], 'total_elements': 0}
+        else:
+            ocr_data = self.extract_text_with_coordinates(image, use_cache=use_cache)
+
+        report.update({'total_pages': 1, 'ocr_pages': 0 if blank else 1, 'blank_pages': int(blank)})
+
+        if ocr_data['total_elements'] == 0 and not blank:
             logger.warning("⚠️  No text detected in image!")
 
         pdf_buffer = io.BytesIO()
-        self.create_searchable_pdf_page(image_path, ocr_data, pdf_buffer)
+        self.create_searchable_pdf_page(image, ocr_data, pdf_buffer, passthrough=passthrough)
 
-        with open(output_path, 'wb') as f:
+        with metrics.timed('save'), open(output_path, 'wb') as f:
             f.write(pdf_buffer.getvalue())
 
         logger.info(f"✅ Conversion complete: {ocr_data['total_elements']} text elements")
         return str(output_path)
 
-    def convert_pdf_to_searchable_pdf(self, input_pdf_path: str, output_pdf_path: str, dpi: int = 300) -> str:
-        """Convert a scanned PDF to searchable PDF - OPTIMIZED FOR SIZE"""
-        logger.info("📚 Converting PDF to searchable PDF")
+    def convert_tiff_to_searchable_pdf(self, input_path: str, output_path: str, batch_size: int = None,
+                                       report: dict = None, use_cache: bool = True, progress=None,
+                                       memory_budget: int = None, skip_blank: bool = False) -> str:
+        """Convert a multi-page TIFF (fax, archive scans) to one searchable PDF
+
+        Frames go through the same render -> OCR -> assemble pipeline as PDF
+        pages (see convert_pdf_to_searchable_pdf for ``batch_size``,
+        ``memory_budget``, ``progress``, ``report`` and ``skip_blank``). Each
+        render worker reads the file through its own handle and decodes only
+        the frame it works on, so however many frames the TIFF has, only the
+        pipeline's bounded number of them is decoded at a time.
+        """
+        logger.info("📠 Converting multi-page TIFF to searchable PDF")
+
+        with Image.open(input_path) as tiff:
+            total_pages = getattr(tiff, 'n_frames', 1)
+            # Size OCR batches from the first frame
+            page_pixels = tiff.size[0] * tiff.size[1]
+
+        if batch_size is None:
+            batch_size = self.batch_size
+        batch_size = self.resolve_batch_size(batch_size, page_pixels)
+
+        if memory_budget is None:
+            memory_budget = self.memory_budget
+        render_workers = queue_size = None
+        if memory_budget:
+            batch_size, queue_size, render_workers = self.bounded_pipeline_sizes(
+                memory_budget, page_pixels, batch_size)
+
+        logger.info(f"📊 Processing {total_pages} frames (OCR batch: {batch_size} pages)")
+
+        if report is None:
+            report = {}
+        report.update({'pages': [], 'total_pages': total_pages,
+                       'triage': {kind: 0 for kind in PAGE_KINDS}, 'ocr_pages': 0, 'escalated_lines': 0,
+                       'blank_pages': 0})
+        report.setdefault('timings', {})
+
+        def page_done(item):
+            self._record_page(report, item)
+            metrics.page_done()
+            if progress is not None:
+                progress(len(report['pages']), total_pages)
+
+        # PIL images are not thread-safe: one handle per render worker
+        worker_files = threading.local()
+        handles = []
+
+        def render_frame(page_num):
+            if not hasattr(worker_files, 'tiff'):
+                worker_files.handle = open(input_path, 'rb')
+                handles.append(worker_files.handle)
+                worker_files.tiff = Image.open(worker_files.handle)
+            return self._render_tiff_frame(worker_files.tiff, worker_files.handle, page_num,
+                                           use_cache=use_cache, skip_blank=skip_blank)
 
-        temp_folder = Path("temp_images")
-        temp_folder.mkdir(exist_ok=True)
+        try:
+            self._write_image_pages(
+                total_pages,
+                render_page=render_frame,
+                output_pdf_path=output_path,
+                page_done=page_done,
+                report=report,
+                batch_size=batch_size,
+                memory_budget=memory_budget,
+                render_workers=render_workers,
+                queue_size=queue_size,
+            )
+        finally:
+            for handle in handles:
+                handle.close()
+
+        logger.info(f"\n✅ TIFF conversion complete: {total_pages} frames processed, "
+                    f"{report['ocr_pages']} OCRed")
+        if skip_blank:
+            logger.info(f"⬜ Blank frames skipped: {report['blank_pages']}")
+        logger.info("⏱️  Stage timings: " + ", ".join(
+            f"{stage}={seconds:.2f}s" for stage, seconds in report['timings'].items()))
+        return str(output_path)
+
+    def convert_pdf_to_searchable_pdf(self, input_pdf_path: str, output_pdf_path: str, dpi: int = 300,
+                                      batch_size: int = None, mode: str = 'rasterize',
+                                      triage: bool = False, report: dict = None,
+                                      use_cache: bool = True, progress=None,
+                                      memory_budget: int = None, detection_dpi: int = None,
+                                      cascade_dpi: int = None, confidence_threshold: float = 0.8,
+                                      skip_blank: bool = False) -> str:
+        """Convert a scanned PDF to searchable PDF - OPTIMIZED FOR SIZE
+
+        Pages are rendered and OCRed in batches of ``batch_size`` so Surya can
+        batch detection and recognition across pages. ``None`` falls back to
+        the converter default (auto-sized from available RAM).
+
+        ``mode`` selects how the output is built:
+            - rasterize: every page is re-embedded as a JPEG at ``dpi``
+            - overlay: the text layer is added on top of the original page
+              objects, which are kept untouched (images, vectors, fonts)
+
+        With ``triage`` each page is first classified from its existing text
+        layer and images (see classify_pdf_page): digital pages are kept as
+        they are without OCR, scanned and mixed pages are OCRed. On mixed
+        pages in overlay mode, OCR lines already covered by real text are
+        dropped. Pass a dict as ``report`` to receive the per-page decisions.
+
+        ``use_cache=False`` bypasses the OCR result cache for this document.
+        ``progress`` is called as ``progress(pages_done, total_pages)`` after
+        each page is written.
+
+        With a ``memory_budget`` (bytes, defaults to the converter's) peak
+        memory no longer grows with page count: batch and queue sizes are
+        derived from the budget so only that many decoded pages are alive,
+        and in rasterize mode finished pages are flushed to the output file
+        in chunks (incremental saves) instead of accumulating in memory.
+
+        With a ``detection_dpi`` below ``dpi``, text lines are detected on a
+        cheap render at that DPI and only the detected line regions are
+        rendered (or, in rasterize mode, cropped) at ``dpi`` for recognition.
+
+        With a ``cascade_dpi`` below ``dpi``, pages are fully OCRed at that
+        DPI first and only lines with a confidence under
+        ``confidence_threshold`` are re-read from ``dpi`` crops.
+
+        With ``skip_blank``, rendered pages with (almost) no ink are not OCRed;
+        they still get their page image in rasterize mode and are counted
+        in ``report['blank_pages']``.
+        """
+        if mode not in CONVERSION_MODES:
+            raise ValueError(f"Unsupported conversion mode: {mode}")
+
+        logger.info(f"📚 Converting PDF to searchable PDF ({mode} mode)")
 
         # Open input PDF with PyMuPDF
         pdf_document = fitz.open(input_pdf_path)
@@ -701,72 +2604,116 @@ class SearchableDocumentConverter:
         # 150 DPI is good for most documents, 300 for high quality
         zoom = dpi / 72.0
         
-        logger.info(f"📊 Processing {total_pages} pages with DPI: {dpi} (zoom: {zoom:.2f}x)")
-
-        # Create a new empty PDF for output using PyMuPDF
-        output_pdf = fitz.open()
-
-        for page_num in range(total_pages):
-            logger.info(f"\n📄 Processing page {page_num + 1}/{total_pages}...")
-            
-            page = pdf_document[page_num]
-            
-            # Render page to image with proper DPI
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat, alpha=False)
-            
-            # Save as JPEG with compression instead of PNG to save space
-            img_path = temp_folder / f"page_{page_num + 1}.jpg"
-            pix.save(str(img_path), output="jpeg", jpg_quality=85)
-            
-            logger.info(f"   ✅ Image created: {pix.width}x{pix.height} pixels")
-
-            # Extract text with OCR
-            ocr_data = self.extract_text_with_coordinates(str(img_path))
-
-            # Create searchable PDF page with invisible text layer
-            page_buffer = io.BytesIO()
-            self.create_searchable_pdf_page(str(img_path), ocr_data, page_buffer)
-
-            # Load the created page and add to output PDF (ONE TIME ONLY)
-            page_buffer.seek(0)
-            temp_pdf = fitz.open("pdf", page_buffer.read())
-            
-            # Insert this single page into output
-            output_pdf.insert_pdf(temp_pdf, from_page=0, to_page=0)
-            
-            # Close temp PDF immediately
-            temp_pdf.close()
-
-            # Clean up temporary image immediately after processing
-            try:
-                os.remove(img_path)
-                logger.info(f"   🗑️  Cleaned up temp image")
-            except Exception as e:
-                logger.warning(f"   ⚠️  Could not delete temp image: {e}")
-
-        # Save with compression and optimization
-        logger.info("📦 Saving and compressing final PDF...")
-        output_pdf.save(
-            output_pdf_path,
-            garbage=4,  # Maximum garbage collection
-            deflate=True,  # Compress streams
-            clean=True,  # Clean up unused objects
-        )
-        output_pdf.close()
-        pdf_document.close()
-
-        # Cleanup temp folder
-        try:
-            temp_folder.rmdir()
-        except:
-            pass
+        # Size OCR batches from the rendered size of the first page
+        first_rect = pdf_document[0].rect if total_pages else fitz.Rect()
+        page_pixels = int(first_rect.width * zoom) * int(first_rect.height * zoom)
+        if self.tile_page_pixels and page_pixels > self.tile_page_pixels:
+            # Oversized pages are decoded one batch of tiles at a time
+            page_pixels = TILE_SIZE * TILE_SIZE
+        if batch_size is None:
+            batch_size = self.batch_size
+        batch_size = self.resolve_batch_size(batch_size, page_pixels)
+
+        if memory_budget is None:
+            memory_budget = self.memory_budget
+        render_workers = queue_size = None
+        if memory_budget:
+            batch_size, queue_size, render_workers = self.bounded_pipeline_sizes(
+                memory_budget, page_pixels, batch_size)
+            logger.info(f"🧮 Memory budget {memory_budget / (1024 * 1024):.0f} MB: OCR batch {batch_size}, "
+                        f"queues {queue_size}, render workers {render_workers}")
+
+        logger.info(f"📊 Processing {total_pages} pages with DPI: {dpi} "
+                    f"(zoom: {zoom:.2f}x, OCR batch: {batch_size} pages)")
+
+        mat = fitz.Matrix(zoom, zoom)
+
+        if detection_dpi and cascade_dpi:
+            raise ValueError("detection_dpi and cascade_dpi cannot be combined")
+
+        # Optional low resolution first render (two-resolution or cascade OCR)
+        low_mat = None
+        ocr_strategy = None
+        if detection_dpi and detection_dpi < dpi:
+            low_mat = fitz.Matrix(detection_dpi / 72.0, detection_dpi / 72.0)
+            ocr_strategy = 'two_resolution'
+            logger.info(f"🔭 Two-resolution OCR: detection at {detection_dpi} DPI, recognition at {dpi} DPI")
+        elif cascade_dpi and cascade_dpi < dpi:
+            low_mat = fitz.Matrix(cascade_dpi / 72.0, cascade_dpi / 72.0)
+            ocr_strategy = 'cascade'
+            logger.info(f"🪜 Cascade OCR: first pass at {cascade_dpi} DPI, lines under "
+                        f"{confidence_threshold:.0%} confidence re-read at {dpi} DPI")
+
+        if report is None:
+            report = {}
+        report.update({'pages': [], 'total_pages': total_pages,
+                       'triage': {kind: 0 for kind in PAGE_KINDS}, 'ocr_pages': 0, 'escalated_lines': 0,
+                       'blank_pages': 0})
+        # May already hold the upload time
+        report.setdefault('timings', {})
+
+        def page_done(item):
+            self._record_page(report, item)
+            metrics.page_done()
+            if progress is not None:
+                progress(len(report['pages']), total_pages)
+
+        if mode == 'overlay':
+            # Text goes straight onto the input document's own pages
+            def overlay_page(item):
+                self._overlay_pdf_page(pdf_document, item, zoom, total_pages)
+                page_done(item)
+
+            self._run_page_pipeline(
+                total_pages,
+                render_page=lambda page_num: self._render_pdf_page(
+                    pdf_document, page_num, mat, encode_background=False, triage=triage, use_cache=use_cache,
+                    low_mat=low_mat, ocr_strategy=ocr_strategy, skip_blank=skip_blank),
+                assemble_page=overlay_page,
+                batch_size=batch_size,
+                confidence_threshold=confidence_threshold,
+                render_workers=render_workers,
+                queue_size=queue_size,
+            )
+
+            logger.info("📦 Saving PDF with original page content...")
+            with FITZ_LOCK, metrics.collect(report['timings']), metrics.timed('save'):
+                self._save_overlay_pdf(pdf_document, input_pdf_path, output_pdf_path)
+                pdf_document.close()
+        else:
+            # Render, OCR and assembly run as overlapping pipeline stages
+            self._write_image_pages(
+                total_pages,
+                render_page=lambda page_num: self._render_pdf_page(
+                    pdf_document, page_num, mat, triage=triage, use_cache=use_cache,
+                    low_mat=low_mat, ocr_strategy=ocr_strategy, skip_blank=skip_blank),
+                output_pdf_path=output_pdf_path,
+                page_done=page_done,
+                report=report,
+                batch_size=batch_size,
+                memory_budget=memory_budget,
+                confidence_threshold=confidence_threshold,
+                render_workers=render_workers,
+                queue_size=queue_size,
+                source_pdf=pdf_document,
+            )
+            with FITZ_LOCK:
+                pdf_document.close()
 
         # Get file sizes for comparison
         input_size = os.path.getsize(input_pdf_path) / (1024 * 1024)  # MB
         output_size = os.path.getsize(output_pdf_path) / (1024 * 1024)  # MB
         
-        logger.info(f"\n✅ PDF conversion complete: {total_pages} pages processed")
+        logger.info(f"\n✅ PDF conversion complete: {total_pages} pages processed, "
+                    f"{report['ocr_pages']} OCRed")
+        if skip_blank:
+            logger.info(f"⬜ Blank pages skipped: {report['blank_pages']}")
+        if ocr_strategy == 'cascade':
+            logger.info(f"🪜 Cascade: {report['escalated_lines']} lines re-read at {dpi} DPI")
+        if triage:
+            logger.info("🧭 Page triage: " + ", ".join(f"{kind}={count}" for kind, count in report['triage'].items()))
+        logger.info("⏱️  Stage timings: " + ", ".join(
+            f"{stage}={seconds:.2f}s" for stage, seconds in report['timings'].items()))
         logger.info(f"📁 Input file:  {input_size:.2f} MB")
         logger.info(f"📁 Output file: {output_size:.2f} MB")
         logger.info(f"📊 Size ratio:  {(output_size/input_size)*100:.1f}%")
@@ -781,7 +2728,500 @@ class SearchableDocumentConverter:
         
         return str(output_pdf_path)
 
-    def convert_to_searchable(self, input_path: str, output_path: str, dpi: int = 300) -> str:
+    def _render_pdf_page(self, pdf_document, page_num: int, mat, encode_background: bool = True,
+                         triage: bool = False, use_cache: bool = True, low_mat=None,
+                         ocr_strategy: str = None, skip_blank: bool = False) -> dict:
+        """Render stage: rasterize one PDF page straight into memory
+
+        The pixmap samples are handed to PIL without a disk round trip; the
+        same decoded image feeds OCR and, unless ``encode_background`` is off,
+        is JPEG-encoded exactly once here, outside the fitz lock, for the page
+        background. With ``triage``, pages that already have a usable text
+        layer are not rendered at all.
+
+        With ``low_mat`` the OCR image is a low resolution render for the
+        given ``ocr_strategy`` ('two_resolution' or 'cascade'); line crops at
+        ``mat`` are later taken from the full background image, or rendered
+        from the page's display list when no background is needed.
+
+        With ``skip_blank`` the rendered pixels are checked for ink; blank
+        pages come back with an empty OCR result and ``blank`` set.
+
+        Pages rendering to more than ``tile_page_pixels`` are not rendered
+        here: the item carries the page's display list and is OCRed in tiles.
+        """
+        full_image = None
+        display_list = None
+
+        with FITZ_LOCK:
+            page = pdf_document[page_num]
+            page_rect = page.rect
+
+            page_triage = None
+            if triage:
+                page_triage = classify_pdf_page(page)
+                logger.info(f"🧭 Page {page_num + 1}: {page_triage['kind']} "
+                            f"({page_triage['text_chars']} chars, "
+                            f"image coverage {page_triage['image_coverage']:.0%})")
+
+                if page_triage['kind'] == 'digital':
+                    return {'page_num': page_num, 'triage': page_triage, 'skip_ocr': True}
+
+                # Existing text regions in pixel space, used to avoid duplicating them
+                page_triage['text_rects'] = [
+                    tuple(fitz.Rect(rect) * page.rotation_matrix * mat) for rect in page_triage['text_rects']
+                ]
+
+            full_rect = (page.rect * mat).irect
+            if self.tile_page_pixels and full_rect.width * full_rect.height > self.tile_page_pixels:
+                return {
+                    'page_num': page_num,
+                    'triage': page_triage,
+                    'tiled': True,
+                    'image_size': (full_rect.width, full_rect.height),
+                    'line_source': page.get_displaylist(),
+                    'zoom': mat.a,
+                    'use_cache': use_cache,
+                    'encode_background': encode_background,
+                    'jpeg_data': None,
+                }
+
+            with metrics.timed('render'):
+                if low_mat is None:
+                    # Render page to image with proper DPI
+                    pix = page.get_pixmap(matrix=mat, alpha=False)
+                    image = pixmap_to_image(pix)
+                    image_size = image.size
+                    cache_dpi = round(mat.a * 72)
+                else:
+                    pix = page.get_pixmap(matrix=low_mat, alpha=False)
+                    image = pixmap_to_image(pix)
+                    if encode_background:
+                        full_image = pixmap_to_image(page.get_pixmap(matrix=mat, alpha=False))
+                        image_size = full_image.size
+                    else:
+                        display_list = page.get_displaylist()
+                        image_size = (full_rect.width, full_rect.height)
+                    if ocr_strategy == 'cascade':
+                        # First pass results are plain low resolution OCR
+                        cache_dpi = round(low_mat.a * 72)
+                    else:
+                        cache_dpi = f"{round(low_mat.a * 72)}>{round(mat.a * 72)}"
+
+        logger.info(f"📄 Rendered page {page_num + 1}: {image.size[0]}x{image.size[1]} pixels")
+
+        if skip_blank:
+            coverage = ink_coverage(pixmap_array(pix), pix.width * 72 / page_rect.width)
+            if coverage < BLANK_MAX_INK_RATIO:
+                logger.info(f"⬜ Page {page_num + 1} is blank (ink {coverage:.4%}), skipping OCR")
+                return {
+                    'page_num': page_num,
+                    'triage': page_triage,
+                    'blank': True,
+                    'image_size': image_size,
+                    'ocr_data': {'image_size': image_size, 'text_elements': [], 'total_elements': 0},
+                    'jpeg_data': encode_jpeg(image if full_image is None else full_image) if encode_background else None,
+                }
+
+        # Cache key hashes the pixmap's samples in place, no copy needed
+        cache_key = None
+        if use_cache and self.ocr_cache is not None:
+            cache_key = self.ocr_cache.make_key(pix.samples_mv, pix.width, pix.height, cache_dpi, self.acceleration)
+        pix = None
+
+        item = {
+            'page_num': page_num,
+            'triage': page_triage,
+            'cache_key': cache_key,
+            'image': image,
+            'image_size': image_size,
+            'jpeg_data': encode_jpeg(image if full_image is None else full_image) if encode_background else None,
+        }
+        if low_mat is not None:
+            item['ocr_strategy'] = ocr_strategy
+            item['low_scale'] = mat.a / low_mat.a
+            item['line_source'] = display_list if full_image is None else full_image
+            item['zoom'] = mat.a
+        return item
+
+    def _render_tiff_frame(self, tiff, handle, page_num: int, use_cache: bool = True,
+                           skip_blank: bool = False) -> dict:
+        """Render stage for multi-page TIFFs: decode one frame of ``tiff`` (opened on ``handle``)
+
+        Only the requested frame is decoded. Frames PDF can embed as they are
+        (see passthrough_image) keep their encoded data, others are
+        JPEG-encoded here like rendered PDF pages.
+        """
+        with metrics.timed('render'):
+            tiff.seek(page_num)
+            passthrough = _tiff_passthrough(tiff, handle)
+            # Always a copy: the next seek reuses the frame buffer
+            image = tiff.convert('RGB')
+        dpi = tiff.info.get('dpi', (150, 150))[0]
+
+        logger.info(f"📄 Decoded frame {page_num + 1}: {image.size[0]}x{image.size[1]} pixels")
+
+        def background():
+            return None if passthrough else encode_jpeg(image)
+
+        if skip_blank:
+            coverage = ink_coverage(np.asarray(image), dpi)
+            if coverage < BLANK_MAX_INK_RATIO:
+                logger.info(f"⬜ Frame {page_num + 1} is blank (ink {coverage:.4%}), skipping OCR")
+                return {
+                    'page_num': page_num,
+                    'triage': None,
+                    'blank': True,
+                    'image_size': image.size,
+                    'ocr_data': {'image_size': image.size, 'text_elements': [], 'total_elements': 0},
+                    'jpeg_data': background(),
+                    'passthrough': passthrough,
+                }
+
+        cache_key = None
+        if use_cache and self.ocr_cache is not None:
+            cache_key = self.ocr_cache.make_key(image.tobytes(), image.size[0], image.size[1], 0, self.acceleration)
+
+        return {
+            'page_num': page_num,
+            'triage': None,
+            'cache_key': cache_key,
+            'image': image,
+            'image_size': image.size,
+            'jpeg_data': background(),
+            'passthrough': passthrough,
+        }
+
+    def _assemble_pdf_page(self, output_pdf, item: dict, total_pages: int, source_pdf=None):
+        """Assembly stage: write the searchable page straight into the output"""
+        page_num = item['page_num']
+
+        if item.get('skip_ocr'):
+            # Page already has a usable text layer: keep the original page
+            logger.info(f"📄 Copying page {page_num + 1}/{total_pages} unchanged (no OCR needed)")
+            with FITZ_LOCK, metrics.timed('merge'):
+                output_pdf.insert_pdf(source_pdf, from_page=page_num, to_page=page_num)
+            return
+
+        ocr_data = item['ocr_data']
+
+        logger.info(f"📄 Assembling page {page_num + 1}/{total_pages} "
+                    f"({ocr_data['total_elements']} text elements)")
+
+        # Create searchable PDF page with invisible text layer
+        with FITZ_LOCK:
+            self.add_searchable_image_page(output_pdf, item['image_size'], item['jpeg_data'], ocr_data,
+                                           background_tiles=item.get('background_tiles'),
+                                           passthrough=item.get('passthrough'))
+
+    def _overlay_pdf_page(self, pdf_document, item: dict, zoom: float, total_pages: int):
+        """Assembly stage for overlay mode: add the text layer to the original page"""
+        page_num = item['page_num']
+
+        if item.get('skip_ocr'):
+            logger.info(f"📄 Keeping page {page_num + 1}/{total_pages} unchanged (no OCR needed)")
+            return
+
+        ocr_data = item['ocr_data']
+
+        # Mixed pages: do not duplicate text the page already carries
+        text_rects = (item.get('triage') or {}).get('text_rects')
+        if text_rects:
+            ocr_data = drop_covered_elements(ocr_data, text_rects)
+
+        logger.info(f"📄 Overlaying page {page_num + 1}/{total_pages} "
+                    f"({ocr_data['total_elements']} text elements)")
+
+        if ocr_data['total_elements'] == 0:
+            return
+
+        with FITZ_LOCK, metrics.timed('overlay'):
+            page = pdf_document[page_num]
+
+            # Isolate the original content's graphics state from our layer
+            if not page.is_wrapped:
+                page.wrap_contents()
+
+            self.write_text_layer(page, ocr_data, page_pixel_matrix(page, zoom))
+
+    @staticmethod
+    def _record_page(report: dict, item: dict):
+        """Add one assembled page to the conversion report"""
+        page_triage = item.get('triage')
+        ocr_data = item.get('ocr_data')
+
+        entry = {
+            'page': item['page_num'] + 1,
+            'triage': page_triage['kind'] if page_triage else None,
+            'blank': item.get('blank', False),
+            'ocr': not (item.get('skip_ocr') or item.get('blank')),
+            'text_elements': ocr_data['total_elements'] if ocr_data else 0,
+        }
+        if ocr_data and 'escalated_lines' in ocr_data:
+            entry['escalated_lines'] = ocr_data['escalated_lines']
+            report['escalated_lines'] += ocr_data['escalated_lines']
+        timings = item.get('timings', {})
+        entry['timings'] = {stage: round(seconds, 4) for stage, seconds in timings.items()}
+        for stage, seconds in timings.items():
+            report['timings'][stage] = report['timings'].get(stage, 0.0) + seconds
+        report['pages'].append(entry)
+        if entry['triage']:
+            report['triage'][entry['triage']] += 1
+        if entry['ocr']:
+            report['ocr_pages'] += 1
+        if entry['blank']:
+            report['blank_pages'] += 1
+
+    @staticmethod
+    def bounded_pipeline_sizes(memory_budget: int, page_pixels: int, batch_size: int) -> tuple:
+        """Fit OCR batch, queue size and render workers into ``memory_budget`` bytes
+
+        Decoded pages are alive in the render workers, the render queue and
+        the OCR batch; together they may use the share of the budget not
+        reserved for buffered output pages.
+        """
+        bytes_per_page = max(1, page_pixels * 3 * 3)
+        pages = max(1, int(memory_budget * (1 - OUTPUT_FLUSH_FRACTION) // bytes_per_page))
+        if pages < 3:
+            logger.warning(f"⚠️  Memory budget fits only {pages} rendered page(s), running one page at a time")
+
+        batch_size = max(1, min(batch_size, pages // 2))
+        render_workers = max(1, min(2, (pages - batch_size) // 2))
+        queue_size = max(1, pages - batch_size - render_workers)
+        return batch_size, queue_size, render_workers
+
+    def _write_image_pages(self, page_count: int, render_page, output_pdf_path: str, page_done,
+                           report: dict, batch_size: int, memory_budget: int = None,
+                           confidence_threshold: float = 0.8, render_workers: int = None,
+                           queue_size: int = None, source_pdf=None):
+        """Run the page pipeline into a new PDF of image pages and save it to ``output_pdf_path``
+
+        Pages are assembled in order and ``page_done(item)`` is called after
+        each. With a ``memory_budget`` assembled pages are flushed to disk in
+        chunks. ``source_pdf`` provides the pages triage keeps unchanged.
+        """
+        # Create a new empty PDF for output using PyMuPDF
+        output = {'pdf': fitz.open(), 'flushed': False, 'unflushed_bytes': 0}
+        flush_bytes = memory_budget * OUTPUT_FLUSH_FRACTION if memory_budget else None
+
+        def assemble_page(item):
+            self._assemble_pdf_page(output['pdf'], item, page_count, source_pdf)
+            page_done(item)
+
+            if flush_bytes is not None:
+                if item.get('passthrough'):
+                    output['unflushed_bytes'] += passthrough_size(item['passthrough'])
+                else:
+                    output['unflushed_bytes'] += len(item.get('jpeg_data') or b'')
+                if output['unflushed_bytes'] >= flush_bytes:
+                    self._flush_output_pdf(output, output_pdf_path)
+
+        self._run_page_pipeline(
+            page_count,
+            render_page=render_page,
+            assemble_page=assemble_page,
+            batch_size=batch_size,
+            confidence_threshold=confidence_threshold,
+            render_workers=render_workers,
+            queue_size=queue_size,
+        )
+
+        # Save with compression and optimization
+        logger.info("📦 Saving and compressing final PDF...")
+        with FITZ_LOCK, metrics.collect(report['timings']), metrics.timed('save'):
+            if output['flushed']:
+                # Earlier chunks are already on disk, append the rest
+                output['pdf'].saveIncr()
+            else:
+                # No clean=True: our content streams are generated already clean,
+                # re-parsing every page at save time would only cost CPU
+                output['pdf'].save(
+                    output_pdf_path,
+                    garbage=4,  # Maximum garbage collection
+                    deflate=True,  # Compress streams
+                )
+            output['pdf'].close()
+
+    @staticmethod
+    def _flush_output_pdf(output: dict, output_pdf_path: str):
+        """Write the pages assembled so far to disk and drop them from memory
+
+        The first flush saves the file, later ones append incrementally. The
+        document is reopened afterwards so MuPDF only loads objects on demand;
+        the text layer font xref moves over to the reopened document.
+        """
+        with FITZ_LOCK, metrics.timed('save'):
+            fonts = dict(text_layer_fonts(output['pdf']))
+            if output['flushed']:
+                output['pdf'].saveIncr()
+            else:
+                output['pdf'].save(output_pdf_path, garbage=4, deflate=True)
+            page_count = len(output['pdf'])
+            output['pdf'].close()
+            output['pdf'] = fitz.open(output_pdf_path)
+            # Incremental saves keep object numbers; garbage collection renumbers
+            # them, so after the first save the font is looked up once
+            text_layer_fonts(output['pdf']).update(
+                fonts if output['flushed'] else find_text_layer_fonts(output['pdf']))
+
+        output['flushed'] = True
+        output['unflushed_bytes'] = 0
+        logger.info(f"💾 Flushed {page_count} pages to {output_pdf_path}")
+
+    @staticmethod
+    def _save_overlay_pdf(pdf_document, input_pdf_path: str, output_pdf_path: str):
+        """Write an overlaid document, incrementally when updating the input in place"""
+        if Path(output_pdf_path).resolve() == Path(input_pdf_path).resolve() and pdf_document.can_save_incrementally():
+            # Only the new text streams and touched page objects are appended
+            pdf_document.saveIncr()
+            return
+
+        # Original streams (CCITT, JBIG2, JPEG, ...) are copied as-is; only
+        # unreferenced objects are dropped and our new streams are compressed
+        pdf_document.save(output_pdf_path, garbage=3, deflate=True)
+
+    def _run_page_pipeline(self, page_count: int, render_page, assemble_page, batch_size: int,
+                           render_workers: int = None, queue_size: int = None,
+                           confidence_threshold: float = 0.8):
+        """Run render -> OCR -> assemble as concurrent stages linked by bounded queues
+
+        ``render_workers`` threads call ``render_page(page_num)`` and feed one
+        OCR thread, which batches up to ``batch_size`` pages per predictor call.
+        ``assemble_page(item)`` runs on the calling thread strictly in page
+        order. Each queue holds at most ``queue_size`` pages, so the number of
+        decoded pages alive at once stays bounded regardless of document length.
+        Pages rendered for cascade OCR re-read lines under ``confidence_threshold``.
+        """
+        render_workers = max(1, min(render_workers or self.render_workers, page_count or 1))
+        queue_size = queue_size or max(2, 2 * batch_size)
+
+        render_queue = queue.Queue(maxsize=queue_size)
+        assemble_queue = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        errors = []
+        tracked_queues = metrics.track_queues({'render': render_queue, 'assemble': assemble_queue})
+
+        def fail(exc):
+            errors.append(exc)
+            stop.set()
+
+        def render_worker(worker_index: int):
+            try:
+                # Workers take interleaved pages so they progress in rough page order
+                for page_num in range(worker_index, page_count, render_workers):
+                    with metrics.collect() as timings:
+                        item = render_page(page_num)
+                    item['timings'] = timings
+                    if not _queue_put(render_queue, item, stop):
+                        return
+            except Exception as e:
+                logger.error(f"Render stage failed: {e}")
+                fail(e)
+            finally:
+                _queue_put(render_queue, _PIPELINE_DONE, stop)
+
+        def ocr_worker():
+            finished_workers = 0
+            try:
+                while finished_workers < render_workers:
+                    batch = []
+                    while len(batch) < batch_size and finished_workers < render_workers:
+                        item = _queue_get(render_queue, stop)
+                        if item is None:
+                            return
+                        if item is _PIPELINE_DONE:
+                            finished_workers += 1
+                            continue
+                        if item.get('skip_ocr') or item.get('blank'):
+                            # Nothing to recognize, forward straight to assembly
+                            if not _queue_put(assemble_queue, item, stop):
+                                return
+                            continue
+                        if item.get('tiled'):
+                            # Oversized page: its tiles make up a batch of their own
+                            with metrics.collect(item['timings']):
+                                item['ocr_data'] = self.extract_text_tiled(item, batch_size)
+                            item.pop('line_source', None)
+                            if not _queue_put(assemble_queue, item, stop):
+                                return
+                            continue
+                        batch.append(item)
+
+                    if not batch:
+                        continue
+
+                    pages = ', '.join(str(item['page_num'] + 1) for item in batch)
+                    logger.info(f"🔍 Extracting text from pages {pages}")
+                    ocr_strategy = batch[0].get('ocr_strategy')
+                    with metrics.collect() as batch_timings:
+                        if ocr_strategy == 'two_resolution':
+                            ocr_results = self.extract_text_two_resolution(batch)
+                        elif ocr_strategy == 'cascade':
+                            ocr_results = self.extract_text_cascade(batch, confidence_threshold)
+                        else:
+                            ocr_results = self.extract_text_from_images(
+                                [item['image'] for item in batch],
+                                cache_keys=[item.get('cache_key') for item in batch],
+                            )
+
+                    for item, ocr_data in zip(batch, ocr_results):
+                        item['ocr_data'] = ocr_data
+                        # Pages of a batch share its OCR time equally
+                        for stage, seconds in batch_timings.items():
+                            item['timings'][stage] = item['timings'].get(stage, 0.0) + seconds / len(batch)
+                        # Decoded pixels are no longer needed once OCR is done
+                        item.pop('image', None)
+                        item.pop('line_source', None)
+                        if not _queue_put(assemble_queue, item, stop):
+                            return
+            except Exception as e:
+                logger.error(f"OCR stage failed: {e}")
+                fail(e)
+            finally:
+                _queue_put(assemble_queue, _PIPELINE_DONE, stop)
+
+        threads = [
+            threading.Thread(target=render_worker, args=(index,), name=f"render-{index}", daemon=True)
+            for index in range(render_workers)
+        ]
+        threads.append(threading.Thread(target=ocr_worker, name="ocr", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        # Assembler: pages can arrive out of order from several render workers
+        pending = {}
+        next_page = 0
+        try:
+            while next_page < page_count:
+                item = _queue_get(assemble_queue, stop)
+                if item is None or item is _PIPELINE_DONE:
+                    break
+                pending[item['page_num']] = item
+                while next_page in pending:
+                    item = pending.pop(next_page)
+                    with metrics.collect(item['timings']):
+                        assemble_page(item)
+                    next_page += 1
+        except Exception as e:
+            fail(e)
+        finally:
+            if next_page < page_count:
+                stop.set()
+            for thread in threads:
+                thread.join()
+            metrics.untrack_queues(tracked_queues)
+
+        if errors:
+            raise errors[0]
+        if next_page < page_count:
+            raise RuntimeError(f"Page pipeline stopped after {next_page}/{page_count} pages")
+
+    def convert_to_searchable(self, input_path: str, output_path: str, dpi: int = 300,
+                              batch_size: int = None, mode: str = 'rasterize',
+                              triage: bool = False, report: dict = None, use_cache: bool = True,
+                              progress=None, memory_budget: int = None, detection_dpi: int = None,
+                              cascade_dpi: int = None, confidence_threshold: float = 0.8,
+                              skip_blank: bool = False) -> str:
         """Universal converter - auto-detects input type"""
         input_file = Path(input_path)
 
@@ -790,18 +3230,404 @@ class SearchableDocumentConverter:
 
         file_ext = input_file.suffix.lower()
 
-        if file_ext in self.image_formats:
-            return self.convert_image_to_searchable_pdf(input_path, output_path)
+        if file_ext in self.tiff_formats and tiff_frame_count(input_path) > 1:
+            return self.convert_tiff_to_searchable_pdf(input_path, output_path, batch_size=batch_size,
+                                                       report=report, use_cache=use_cache, progress=progress,
+                                                       memory_budget=memory_budget, skip_blank=skip_blank)
+        elif file_ext in self.image_formats:
+            result = self.convert_image_to_searchable_pdf(input_path, output_path, use_cache=use_cache,
+                                                          skip_blank=skip_blank, report=report)
+            if progress is not None:
+                progress(1, 1)
+            return result
         elif file_ext in self.pdf_format:
-            return self.convert_pdf_to_searchable_pdf(input_path, output_path, dpi)
+            return self.convert_pdf_to_searchable_pdf(input_path, output_path, dpi, batch_size=batch_size,
+                                                      mode=mode, triage=triage, report=report,
+                                                      use_cache=use_cache, progress=progress,
+                                                      memory_budget=memory_budget, detection_dpi=detection_dpi,
+                                                      cascade_dpi=cascade_dpi,
+                                                      confidence_threshold=confidence_threshold,
+                                                      skip_blank=skip_blank)
         else:
             raise ValueError(f"Unsupported file format: {file_ext}")
 
 
-# Initialize converter globally
-logger.info("🚀 Initializing OCR models...")
-converter = SearchableDocumentConverter()
-logger.info("✅ OCR models ready!")
+class MemoryJobStore:
+    """Job records kept in process memory (lost on restart)"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job: dict):
+        with self._lock:
+            self._jobs[job['id']] = dict(job)
+
+    def get(self, job_id: str):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def list(self) -> list:
+        with self._lock:
+            return [dict(job) for job in self._jobs.values()]
+
+
+class FileJobStore:
+    """Job records kept as JSON files in a local folder (survive restarts)"""
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    @staticmethod
+    def _read(path: Path):
+        try:
+            with open(path, 'r', encoding='utf-8') as job_file:
+                return json.load(job_file)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, job: dict):
+        path = self._path(job['id'])
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as job_file:
+            json.dump(job, job_file)
+        os.replace(temp_path, path)
+
+    def create(self, job: dict):
+        with self._lock:
+            self._write(job)
+
+    def get(self, job_id: str):
+        return self._read(self._path(job_id))
+
+    def update(self, job_id: str, **fields):
+        with self._lock:
+            job = self._read(self._path(job_id))
+            if job is not None:
+                job.update(fields)
+                self._write(job)
+
+    def delete(self, job_id: str):
+        with self._lock:
+            try:
+                self._path(job_id).unlink()
+            except FileNotFoundError:
+                pass
+
+    def list(self) -> list:
+        jobs = (self._read(path) for path in self.directory.glob('*.json'))
+        return [job for job in jobs if job]
+
+
+class ConversionJobManager:
+    """
+    Runs conversions in background worker threads
+    Submissions wait in a bounded in-process queue and ``workers`` conversions
+    run at once, so OCR capacity stays fixed however many clients submit.
+    Job records live in a pluggable store (MemoryJobStore / FileJobStore).
+    With a ``ready`` event, queued jobs only start once it is set.
+    The worker threads run from start() on, so they are not around when the
+    OCR processes fork.
+    """
+
+    def __init__(self, converter: SearchableDocumentConverter, store, output_folder: str,
+                 workers: int = 1, max_queued: int = 100, result_ttl: int = 3600,
+                 ready: threading.Event = None):
+        self.converter = converter
+        self.ready = ready
+        self.store = store
+        self.output_folder = output_folder
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.Queue(maxsize=max_queued)
+
+        self._started = False
+
+        self._fail_interrupted_jobs()
+
+    def start(self):
+        """Start the worker threads (once)"""
+        if self._started:
+            return
+        self._started = True
+        for worker_index in range(self.workers):
+            threading.Thread(target=self._worker, name=f"job-worker-{worker_index}", daemon=True).start()
+
+    def _fail_interrupted_jobs(self):
+        """Jobs a previous process left queued or running cannot be resumed"""
+        for job in self.store.list():
+            if job['state'] in ('queued', 'running'):
+                self.store.update(job['id'], state='failed', error='Interrupted by server restart',
+                                  finished_at=time.time())
+                self._remove_file(job.get('input_path'))
+
+    def submit(self, job_id: str, input_path: str, filename: str, options: dict, timings: dict = None) -> dict:
+        """Queue a conversion of ``input_path``; raises queue.Full when saturated
+
+        ``timings`` holds stage timings already spent on the job (the upload).
+        """
+        self.expire_jobs()
+
+        job = {
+            'id': job_id,
+            'state': 'queued',
+            'filename': filename,
+            'input_path': input_path,
+            'output_path': os.path.abspath(os.path.join(self.output_folder, f"{job_id}.pdf")),
+            'options': options,
+            'created_at': time.time(),
+            'started_at': None,
+            'finished_at': None,
+            'pages_done': 0,
+            'total_pages': None,
+            'triage': None,
+            'blank_pages': None,
+            'timings': dict(timings or {}),
+            'error': None,
+        }
+        self.store.create(job)
+
+        try:
+            self._queue.put_nowait(job_id)
+        except queue.Full:
+            self.store.delete(job_id)
+            raise
+
+        logger.info(f"📥 Queued job {job_id}: {filename} ({self._queue.qsize()} waiting)")
+        return job
+
+    def get(self, job_id: str):
+        if not job_id.isalnum():
+            return None
+        return self.store.get(job_id)
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            if self.ready is not None:
+                # Queued jobs start once the OCR stack is initialized
+                self.ready.wait()
+            try:
+                self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job worker error: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id: str):
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        logger.info(f"⚙️  Starting job {job_id}: {job['filename']}")
+        self.store.update(job_id, state='running', started_at=time.time())
+
+        def progress(pages_done, total_pages):
+            self.store.update(job_id, pages_done=pages_done, total_pages=total_pages)
+
+        report = {'timings': dict(job.get('timings') or {})}
+        try:
+            self.converter.convert_to_searchable(job['input_path'], job['output_path'],
+                                                 report=report, progress=progress, **job['options'])
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} failed: {e}")
+            self.store.update(job_id, state='failed', error=str(e), finished_at=time.time())
+        else:
+            logger.info(f"✅ Job {job_id} done")
+            self.store.update(job_id, state='done', triage=report.get('triage'),
+                              blank_pages=report.get('blank_pages'),
+                              timings={stage: round(seconds, 4) for stage, seconds in report['timings'].items()},
+                              finished_at=time.time())
+        finally:
+            self._remove_file(job['input_path'])
+
+    def expire_jobs(self):
+        """Forget finished jobs older than ``result_ttl`` and delete their PDFs"""
+        cutoff = time.time() - self.result_ttl
+        for job in self.store.list():
+            if job['state'] in ('done', 'failed') and job['finished_at'] and job['finished_at'] < cutoff:
+                self._remove_file(job.get('output_path'))
+                self.store.delete(job['id'])
+
+    @staticmethod
+    def _remove_file(path):
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not delete job file: {e}")
+
+    @staticmethod
+    def describe(job: dict) -> dict:
+        """Public view of a job record"""
+        return {
+            'job_id': job['id'],
+            'state': job['state'],
+            'filename': job['filename'],
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at'],
+            'progress': {
+                'pages_done': job['pages_done'],
+                'total_pages': job['total_pages'],
+            },
+            'triage': job['triage'],
+            'blank_pages': job.get('blank_pages'),
+            'timings': job.get('timings'),
+            'error': job['error'],
+        }
+
+    def stats(self) -> dict:
+        return {
+            'workers': self.workers,
+            'queued': self._queue.qsize(),
+            'queue_size': self._queue.maxsize,
+        }
+
+
+# Initialize converter globally (models are loaded by start_model_loading)
+ocr_cache = None
+if app.config['OCR_CACHE_FOLDER']:
+    ocr_cache = OCRResultCache(app.config['OCR_CACHE_FOLDER'], app.config['OCR_CACHE_MAX_BYTES'])
+
+converter = SearchableDocumentConverter(
+    batch_size=app.config['OCR_BATCH_SIZE'],
+    render_workers=app.config['RENDER_WORKERS'],
+    ocr_cache=ocr_cache,
+    memory_budget=app.config['MEMORY_BUDGET_MB'] * 1024 * 1024 if app.config['MEMORY_BUDGET_MB'] else None,
+    tile_page_pixels=app.config['TILE_PAGE_PIXELS'],
+    acceleration=app.config['OCR_ACCELERATION'],
+    torch_threads=app.config['TORCH_THREADS'],
+    torch_interop_threads=app.config['TORCH_INTEROP_THREADS'],
+)
+
+# Set once initialize_ocr has finished (successfully or not, see model_status)
+ocr_initialized = threading.Event()
+_model_loading_lock = threading.Lock()
+_model_loading_started = False
+
+
+def initialize_ocr():
+    """Bring up the OCR stack in order: models, OCR processes, shared batching, warm-up"""
+    logger.info("🚀 Initializing OCR models...")
+    try:
+        if app.config['OCR_PROCESSES']:
+            # The parent only dispatches to the OCR processes; a single torch
+            # thread keeps it from starting OpenMP workers before the fork
+            converter.torch_threads = 1
+        converter.load_models()
+        # Fork right after loading so the processes share the weights
+        converter.start_ocr_processes(app.config['OCR_PROCESSES'], app.config['OCR_THREADS_PER_PROCESS'])
+        if app.config['OCR_SHARED_BATCHING']:
+            converter.start_shared_batching(app.config['OCR_MAX_BATCH_SIZE'], app.config['OCR_MAX_WAIT_MS'] / 1000)
+        if app.config['MODEL_WARMUP']:
+            converter.warm_up()
+    except Exception as e:
+        logger.error(f"❌ OCR initialization failed: {e}")
+        converter.model_status.update(state='failed', error=str(e))
+    else:
+        converter.model_status['state'] = 'ready'
+        logger.info("✅ OCR models ready!")
+    finally:
+        ocr_initialized.set()
+        job_manager.start()
+
+
+def start_model_loading(background: bool = None):
+    """Start initialize_ocr once: in a thread (MODEL_LOADING='background') or inline
+
+    OCR processes always load inline: they must fork before other threads
+    run. With OCR_PROCESSES set, call this in the serving process before it
+    starts any threads; ``python app.py`` does, and under gunicorn a
+    ``post_fork(server, worker)`` hook in gunicorn.conf.py can import app and
+    call it. Requests never start OCR processes (see ensure_model_loading).
+    """
+    global _model_loading_started
+
+    with _model_loading_lock:
+        if _model_loading_started:
+            return
+        _model_loading_started = True
+
+    if background is None:
+        background = app.config['MODEL_LOADING'] == 'background' and not app.config['OCR_PROCESSES']
+    if background:
+        threading.Thread(target=initialize_ocr, name='model-loader', daemon=True).start()
+    else:
+        initialize_ocr()
+
+
+def refuse_model_loading(error: str):
+    """Fail model loading for good, so waiting requests get their 503 right away"""
+    global _model_loading_started
+
+    with _model_loading_lock:
+        if _model_loading_started:
+            return
+        _model_loading_started = True
+
+    logger.error(f"❌ {error}")
+    converter.model_status.update(state='failed', error=error)
+    ocr_initialized.set()
+
+
+@app.before_request
+def create_folders():
+    # Created when serving starts rather than on import, so the batch CLI
+    # and benchmark can import app without leaving folders behind
+    Path(app.config['UPLOAD_FOLDER']).mkdir(exist_ok=True)
+    Path(app.config['OUTPUT_FOLDER']).mkdir(exist_ok=True)
+
+
+@app.before_request
+def ensure_model_loading():
+    # The first request (typically a readiness probe) starts loading the
+    # models in the background. OCR processes would fork from a request
+    # thread of a server that is already threaded, so those are refused
+    if not app.config['OCR_PROCESSES']:
+        start_model_loading(background=True)
+    elif not _model_loading_started:
+        refuse_model_loading("OCR_PROCESSES is set but start_model_loading() was not called at startup")
+
+
+if app.config['JOB_STORE'] == 'file':
+    job_store = FileJobStore(app.config['JOB_FOLDER'])
+else:
+    job_store = MemoryJobStore()
+
+job_manager = ConversionJobManager(
+    converter,
+    job_store,
+    output_folder=app.config['OUTPUT_FOLDER'],
+    workers=app.config['JOB_WORKERS'],
+    max_queued=app.config['JOB_QUEUE_SIZE'],
+    result_ttl=app.config['JOB_RESULT_TTL'],
+    ready=ocr_initialized,
+)
+
+
+def ocr_unavailable():
+    """503 response while the OCR models are loading (or failed to load)"""
+    status = converter.model_status
+    response = jsonify({'error': f"OCR models are not ready ({status['state']})", 'model_status': status})
+    response.status_code = 503
+    response.headers['Retry-After'] = '10'
+    return response
 
 
 def allowed_file(filename):
@@ -809,24 +3635,185 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-def verify_pdf_searchable(pdf_path: str) -> dict:
-    """Verify if a PDF is searchable using PyMuPDF"""
+def form_flag(name: str, default: bool) -> bool:
+    """Read a boolean form field ('1', 'true', 'yes', 'on' are true)"""
+    value = request.values.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def upload_source() -> tuple:
+    """Find the uploaded document: a multipart 'file' field or a raw request body
+
+    Returns ``(file, filename)`` where ``file`` is None for a raw body (name
+    from ?filename=); raises ValueError when nothing usable was uploaded.
+    """
+    if 'file' in request.files:
+        file = request.files['file']
+        filename = file.filename
+    elif request.mimetype in RAW_UPLOAD_TYPES:
+        file = None
+        filename = request.args.get('filename') or f"upload.{RAW_UPLOAD_TYPES[request.mimetype]}"
+    else:
+        raise ValueError('No file uploaded')
+
+    if not filename or not allowed_file(filename):
+        raise ValueError('Invalid file type')
+
+    return file, secure_filename(filename)
+
+
+def save_upload(file, input_path: str):
+    """Put an uploaded document at ``input_path`` without buffering it in memory"""
+    if file is None:
+        # Raw body: copy the request stream to disk chunk by chunk
+        partial_path = f"{input_path}.part"
+        try:
+            with open(partial_path, 'wb') as target:
+                shutil.copyfileobj(request.stream, target, UPLOAD_CHUNK_SIZE)
+            os.replace(partial_path, input_path)
+        finally:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        return
+
+    spool_path = getattr(file.stream, 'name', None)
+    if isinstance(spool_path, str) and os.path.basename(spool_path).startswith(UPLOAD_SPOOL_PREFIX):
+        # Already on disk in UPLOAD_FOLDER (see UploadRequest): just rename it
+        file.stream.flush()
+        os.replace(spool_path, input_path)
+    else:
+        file.save(input_path, UPLOAD_CHUNK_SIZE)
+
+
+def parse_conversion_options() -> dict:
+    """Read conversion settings from the form (raises ValueError when invalid)"""
+    # Get DPI setting (lower = smaller file size)
+    dpi = int(request.values.get('dpi', 200))  # Changed default to 200 for better size/quality balance
+
+    # Validate DPI range
+    dpi = max(72, min(600, dpi))  # Clamp between 72 and 600
+
+    # Optional OCR batch size (pages per predictor call)
+    batch_size = request.values.get('batch_size')
+    batch_size = max(1, min(MAX_AUTO_BATCH_SIZE, int(batch_size))) if batch_size else None
+
+    mode = request.values.get('mode', app.config['CONVERSION_MODE'])
+    if mode not in CONVERSION_MODES:
+        raise ValueError(f"Invalid mode, expected one of: {', '.join(CONVERSION_MODES)}")
+
+    # Optional two-resolution OCR: line detection at a lower DPI
+    detection_dpi = request.values.get('detection_dpi') or app.config['DETECTION_DPI']
+    detection_dpi = max(36, min(dpi, int(detection_dpi))) if detection_dpi else None
+
+    # Optional cascade OCR: low DPI first pass, weak lines re-read at full DPI
+    cascade_dpi = request.values.get('cascade_dpi') or app.config['CASCADE_DPI']
+    cascade_dpi = max(36, min(dpi, int(cascade_dpi))) if cascade_dpi else None
+    if detection_dpi and cascade_dpi:
+        raise ValueError("Use either detection_dpi or cascade_dpi, not both")
+
+    confidence_threshold = float(request.values.get('confidence_threshold', app.config['CASCADE_CONFIDENCE']))
+
+    return {
+        'dpi': dpi,
+        'batch_size': batch_size,
+        'mode': mode,
+        'triage': form_flag('triage', app.config['PAGE_TRIAGE']),
+        'use_cache': form_flag('cache', True),
+        'skip_blank': form_flag('skip_blank', app.config['SKIP_BLANK_PAGES']),
+        'detection_dpi': detection_dpi,
+        'cascade_dpi': cascade_dpi,
+        'confidence_threshold': max(0.0, min(1.0, confidence_threshold)),
+    }
+
+
+def remove_output_file(output_path: str):
+    """Delete a converted PDF that is no longer needed on disk"""
     try:
-        pdf_doc = fitz.open(pdf_path)
-        total_text = ""
-        
-        for page in pdf_doc:
-            total_text += page.get_text()
-        
-        pdf_doc.close()
+        os.remove(output_path)
+    except OSError as e:
+        logger.warning(f"Could not delete output file: {e}")
+
+
+# A PDF is searchable with more than this many characters of text; the
+# verification preview shows its first VERIFY_PREVIEW_CHARS characters
+VERIFY_MIN_CHARS = 10
+VERIFY_PREVIEW_CHARS = 300
+
+
+def sample_page_numbers(total_pages: int, sample_pages: int = None) -> list:
+    """All page numbers, or ``sample_pages`` of them spread evenly (first and last included)"""
+    if not sample_pages or sample_pages >= total_pages:
+        return list(range(total_pages))
+    if sample_pages == 1:
+        return [0]
+    step = (total_pages - 1) / (sample_pages - 1)
+    return sorted({round(index * step) for index in range(sample_pages)})
+
 
-        char_count = len(total_text.strip())
+def verify_pdf_searchable(pdf_path: str, full_scan: bool = False, sample_pages: int = None) -> dict:
+    """Verify if a PDF is searchable using PyMuPDF
 
+    Pages are analyzed one at a time (see classify_pdf_page) and reading
+    stops as soon as the verdict and the preview are settled, so a
+    searchable document usually costs one page. ``characters_scanned``
+    counts the pages read; ``total_characters`` is the document's total, or
+    None when reading stopped early or was sampled (``complete`` is False).
+    With ``full_scan`` every page is read and reported. ``sample_pages``
+    limits huge documents to that many evenly spread pages.
+
+    Each analyzed page reports its characters, the share of the page covered
+    by text and by images, and the share of the image area covered by text
+    (near 0 on scans that were never OCRed).
+    """
+    try:
+        with FITZ_LOCK:
+            pdf_doc = fitz.open(pdf_path)
+            total_pages = len(pdf_doc)
+
+        page_numbers = sample_page_numbers(total_pages, sample_pages)
+        char_count = 0
+        preview = ""
+        pages = []
+        try:
+            for page_num in page_numbers:
+                # Locked per page so conversions are not held up by a long scan
+                with FITZ_LOCK:
+                    page = pdf_doc[page_num]
+                    analysis = classify_pdf_page(page)
+                if analysis['text_chars'] and len(preview) < VERIFY_PREVIEW_CHARS:
+                    preview += analysis['text']
+
+                char_count += analysis['text_chars']
+                pages.append({
+                    'page': page_num + 1,
+                    'characters': analysis['text_chars'],
+                    'text_coverage': round(analysis['text_coverage'], 4),
+                    'image_coverage': round(analysis['image_coverage'], 4),
+                    'image_text_coverage': round(analysis['image_text_coverage'], 4),
+                })
+
+                if not full_scan and char_count > VERIFY_MIN_CHARS and len(preview) >= VERIFY_PREVIEW_CHARS:
+                    break
+        finally:
+            with FITZ_LOCK:
+                pdf_doc.close()
+
+        is_searchable = char_count > VERIFY_MIN_CHARS
+        # Counts only cover the pages read; the document total is known once all were
+        complete = len(pages) == total_pages
         return {
-            'is_searchable': char_count > 10,
-            'total_pages': len(pdf_doc),
-            'total_characters': char_count,
-            'preview': total_text[:300].strip() if char_count > 10 else ""
+            'is_searchable': is_searchable,
+            'total_pages': total_pages,
+            'total_characters': char_count if complete else None,
+            'characters_scanned': char_count,
+            'preview': preview[:VERIFY_PREVIEW_CHARS].strip() if is_searchable else "",
+            'pages_analyzed': len(pages),
+            'complete': complete,
+            'sampled': len(page_numbers) < total_pages,
+            'pages_with_text': sum(1 for entry in pages if entry['characters']),
+            'pages': pages,
         }
     except Exception as e:
         return {
@@ -841,52 +3828,85 @@ def api_convert():
     Convert uploaded file to searchable PDF
     
     Parameters:
-        - file: The file to convert (PDF, PNG, JPG, TIFF)
+        - file: The file to convert (PDF, PNG, JPG, TIFF). The document may
+          also be sent as the raw request body with its Content-Type
+          (application/pdf, image/*) and ?filename=...; other parameters
+          then go in the query string.
         - dpi: DPI for conversion (optional, default: 200, recommended: 150-300)
         - quality: JPEG quality for compression (optional, default: 85, range: 50-95)
+        - batch_size: Pages per OCR call (optional, default: auto from available RAM)
+        - mode: 'rasterize' re-embeds pages as JPEG, 'overlay' keeps the original
+          PDF page content and only adds the text layer (optional, PDF only)
+        - triage: Skip OCR on pages with a usable text layer (optional, PDF only,
+          default: off, see PAGE_TRIAGE). Page counts per decision are returned
+          in X-Page-Triage.
+        - skip_blank: Skip OCR on blank pages, which keep their image (optional,
+          default: off, see SKIP_BLANK_PAGES). The number of blank pages is
+          returned in X-Blank-Pages.
+        - cache: Use the OCR result cache (optional, default: on, '0' to bypass)
+        - detection_dpi: Detect text lines at this lower DPI and recognize only
+          the line regions at full DPI (optional, PDF only, e.g. 100)
+        - cascade_dpi: OCR at this lower DPI first and re-read lines below
+          confidence_threshold (optional, default: 0.8) at full DPI
+          (optional, PDF only, e.g. 150)
     """
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file uploaded'}), 400
-    
-    file = request.files['file']
-    
-    if file.filename == '' or not allowed_file(file.filename):
-        return jsonify({'error': 'Invalid file type'}), 400
-    
+    try:
+        file, filename = upload_source()
+        options = parse_conversion_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not ocr_initialized.wait(app.config['MODEL_READY_TIMEOUT']) or converter.model_status['state'] != 'ready':
+        return ocr_unavailable()
+
+    # Unique names so concurrent uploads of the same file don't collide
+    request_id = uuid.uuid4().hex
     input_path = None
     output_path = None
     
     try:
-        filename = secure_filename(file.filename)
-        input_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(input_path)
-        
-        # Get DPI setting (lower = smaller file size)
-        dpi = int(request.form.get('dpi', 200))  # Changed default to 200 for better size/quality balance
-        
-        # Validate DPI range
-        dpi = max(72, min(600, dpi))  # Clamp between 72 and 600
+        input_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{request_id}_{filename}")
+        report = {}
+        with metrics.collect(report.setdefault('timings', {})), metrics.timed('upload_save'):
+            save_upload(file, input_path)
         
         output_filename = f"{Path(filename).stem}_searchable.pdf"
-        output_path = os.path.join(app.config['OUTPUT_FOLDER'], output_filename)
+        output_path = os.path.abspath(os.path.join(app.config['OUTPUT_FOLDER'], f"{request_id}_{output_filename}"))
         
-        logger.info(f"Converting: {filename} with DPI: {dpi}")
-        converter.convert_to_searchable(input_path, output_path, dpi=dpi)
+        logger.info(f"Converting: {filename} with DPI: {options['dpi']}")
+
+        converter.convert_to_searchable(input_path, output_path, report=report, **options)
         
         # Log file sizes
         input_size = os.path.getsize(input_path) / (1024 * 1024)
         output_size = os.path.getsize(output_path) / (1024 * 1024)
         logger.info(f"✅ Conversion successful - Input: {input_size:.2f}MB, Output: {output_size:.2f}MB")
         
-        return send_file(
-            output_path,
+        # Stream from an open handle; the file itself can go right away
+        # (the data stays readable until the handle is closed)
+        output_file = open(output_path, 'rb')
+        remove_output_file(output_path)
+
+        response = send_file(
+            output_file,
             mimetype='application/pdf',
             as_attachment=True,
             download_name=output_filename
         )
+        response.content_length = os.fstat(output_file.fileno()).st_size
+        if report.get('triage') and options['triage']:
+            response.headers['X-Page-Triage'] = ", ".join(
+                f"{kind}={count}" for kind, count in report['triage'].items())
+        if options['skip_blank'] and 'blank_pages' in report:
+            response.headers['X-Blank-Pages'] = str(report['blank_pages'])
+        response.headers['X-Stage-Timings'] = ", ".join(
+            f"{stage}={seconds:.3f}" for stage, seconds in report['timings'].items())
+        return response
         
     except Exception as e:
         logger.error(f"Conversion error: {e}")
+        if output_path and os.path.exists(output_path):
+            remove_output_file(output_path)
         return jsonify({'error': str(e)}), 500
     
     finally:
@@ -898,6 +3918,74 @@ def api_convert():
                 logger.warning(f"Could not delete input file: {e}")
 
 
+@app.route('/api/jobs', methods=['POST'])
+def api_submit_job():
+    """
+    Queue a conversion and return immediately
+
+    Takes the same parameters as /api/convert. Responds 202 with the job;
+    poll GET /api/jobs/<job_id> and download GET /api/jobs/<job_id>/result.
+    """
+    try:
+        file, filename = upload_source()
+        options = parse_conversion_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Jobs may queue while the models load, not when loading failed
+    if converter.model_status['state'] == 'failed':
+        return ocr_unavailable()
+
+    job_id = uuid.uuid4().hex
+    input_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{job_id}_{filename}")
+
+    try:
+        with metrics.collect() as timings, metrics.timed('upload_save'):
+            save_upload(file, input_path)
+        job = job_manager.submit(job_id, input_path, filename, options, timings=timings)
+    except queue.Full:
+        os.remove(input_path)
+        return jsonify({'error': 'Too many queued jobs, retry later'}), 503
+    except Exception as e:
+        logger.error(f"Job submission error: {e}")
+        if os.path.exists(input_path):
+            os.remove(input_path)
+        return jsonify({'error': str(e)}), 500
+
+    response = jsonify(ConversionJobManager.describe(job))
+    response.status_code = 202
+    response.headers['Location'] = f"/api/jobs/{job_id}"
+    return response
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def api_job_status(job_id):
+    """Report a job's state and page progress"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+
+    return jsonify(ConversionJobManager.describe(job))
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def api_job_result(job_id):
+    """Download the searchable PDF of a finished job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+
+    if job['state'] != 'done':
+        return jsonify(ConversionJobManager.describe(job)), 409
+
+    return send_file(
+        job['output_path'],
+        mimetype='application/pdf',
+        as_attachment=True,
+        download_name=f"{Path(job['filename']).stem}_searchable.pdf"
+    )
+
+
 @app.route('/api/verify', methods=['POST'])
 def api_verify():
     """Verify if an uploaded PDF is searchable"""
@@ -909,12 +3997,20 @@ def api_verify():
     if file.filename == '' or not file.filename.lower().endswith('.pdf'):
         return jsonify({'error': 'Invalid PDF file'}), 400
     
+    try:
+        # Optional full scan (exact counts, every page) and page sampling
+        full_scan = form_flag('full_scan', False)
+        sample_pages = request.values.get('sample_pages') or app.config['VERIFY_SAMPLE_PAGES']
+        sample_pages = max(1, int(sample_pages)) if sample_pages else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
     try:
         filename = secure_filename(file.filename)
         temp_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(temp_path)
+        save_upload(file, temp_path)
         
-        verification = verify_pdf_searchable(temp_path)
+        verification = verify_pdf_searchable(temp_path, full_scan=full_scan, sample_pages=sample_pages)
         
         os.remove(temp_path)
         
@@ -925,12 +4021,49 @@ def api_verify():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage timing histograms, throughput, queue depths and memory in Prometheus text format"""
+    cache_stats = converter.ocr_cache.stats() if converter.ocr_cache else None
+    body = metrics.render({
+        'job_queue_depth': ("Jobs waiting for a conversion worker", job_manager.stats()['queued']),
+        'ocr_batch_queue_depth': ("Pages waiting for a shared OCR batch",
+                                  converter.ocr_service.stats()['waiting'] if converter.ocr_service else 0),
+        'ocr_cache_hit_ratio': ("OCR result cache hits per lookup",
+                                round(cache_stats['hit_ratio'], 4) if cache_stats else 0),
+        'ocr_models_ready': ("1 once the OCR models are loaded and warmed up",
+                             int(converter.model_status['state'] == 'ready')),
+    })
+    return app.response_class(body, mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/health/live', methods=['GET'])
+def health_live():
+    """Liveness: the process is up and serving requests (models may still be loading)"""
+    return jsonify({'status': 'alive'})
+
+
+@app.route('/health/ready', methods=['GET'])
+def health_ready():
+    """Readiness: 200 once the models are loaded and warmed up, 503 before or after a failed load"""
+    status = converter.model_status
+    ready = status['state'] == 'ready'
+    response = jsonify({'ready': ready, **status})
+    response.status_code = 200 if ready else 503
+    return response
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
     return jsonify({
-        'status': 'healthy',
-        'ocr_models_loaded': True,
+        'status': 'healthy' if converter.model_status['state'] == 'ready' else converter.model_status['state'],
+        'ocr_models_loaded': converter.models_loaded,
+        'model_status': converter.model_status,
+        'ocr_processes': converter.ocr_pool.processes if converter.ocr_pool else 0,
+        'ocr_batching': converter.ocr_service.stats() if converter.ocr_service else None,
+        'ocr_cache': converter.ocr_cache.stats() if converter.ocr_cache else None,
+        'jobs': job_manager.stats(),
         'supported_formats': list(ALLOWED_EXTENSIONS),
         'max_file_size_mb': app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024)
     })
@@ -942,12 +4075,21 @@ if __name__ == '__main__':
     print("="*70)
     print(f"📍 Server: http://localhost:5008")
     print(f"📍 Convert: POST http://localhost:5008/api/convert")
+    print(f"📍 Jobs:    POST http://localhost:5008/api/jobs")
     print(f"📍 Verify:  POST http://localhost:5008/api/verify")
-    print(f"📍 Health:  GET  http://localhost:5008/health")
+    print(f"📍 Health:  GET  http://localhost:5008/health (/health/live, /health/ready)")
+    print(f"📍 Metrics: GET  http://localhost:5008/metrics")
     print("="*70)
     print(f"📝 Max file size: {app.config['MAX_CONTENT_LENGTH'] / (1024 * 1024):.0f} MB")
     print(f"📁 Formats: {', '.join(ALLOWED_EXTENSIONS)}")
     print("="*70)
     print("\nPress CTRL+C to stop the server\n")
+
+    # The debug reloader runs this block in a file watcher process too; only
+    # the serving process (WERKZEUG_RUN_MAIN, or this one without the
+    # reloader) loads the models, before app.run starts any threads
+    use_reloader = True
+    if not use_reloader or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_model_loading()
     
-    app.run(host='0.0.0.0', port=5008, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5008, debug=True, use_reloader=use_reloader)
\ No newline at end of file
@@ -0,0 +1,370 @@
+"""
+Offline bulk conversion to searchable PDF
+
+Walks directories (or reads a manifest) and converts every PDF and image
+with SearchableDocumentConverter.convert_to_searchable in a pool of worker
+processes, without the HTTP server:
+
+    python batch_convert.py scans/ --output-dir searchable/ --workers 4
+    python batch_convert.py --manifest backlog.txt --output-dir searchable/ --resume
+
+The models are loaded once in the parent and the workers are forked right
+after, so they share the weights (see OCRProcessPool). Each worker converts
+whole documents straight from their source path into the output folder,
+mirroring the input folder layout as ``<name>_searchable.pdf``.
+
+Outputs that already exist are skipped (``--overwrite`` redoes them) and
+outputs are written under a temporary name first, so an interrupted run
+never leaves a truncated PDF behind. Every document gets one JSON line in
+the results manifest (``--results``): status (done, skipped, failed),
+pages, timings, sizes and the error of failures. ``--resume`` appends to it
+and skips the documents it already records as done or skipped; inputs are
+recorded as absolute paths, so it matches them however they were typed.
+Two inputs mapped to the same output (``a/scan.pdf`` and ``b/scan.pdf``
+given as files) are not both written: the later one is recorded as failed.
+
+A manifest lists one input per line, either a path or a JSON object with
+``input`` and optionally ``output``; relative paths are taken from the
+manifest's folder.
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import logging
+import argparse
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ALL_COMPLETED, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+# Suffix added to converted file names, as the HTTP endpoints name their results
+OUTPUT_SUFFIX = '_searchable'
+# Temporary suffix of outputs being written
+PARTIAL_SUFFIX = '.part'
+# Documents submitted per worker ahead of the ones running, so the pool
+# never idles while input listing (lazy, for huge backlogs) stays bounded
+DOCUMENTS_IN_FLIGHT_PER_WORKER = 2
+# Statuses --resume does not redo
+RESUMED_STATUSES = ('done', 'skipped')
+
+# Set in the parent before forking; workers inherit it with the loaded models
+_APP = None
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def output_path_for(relative: Path, output_dir: Path) -> Path:
+    return output_dir / relative.parent / f"{relative.stem}{OUTPUT_SUFFIX}.pdf"
+
+
+def walk_directory(folder: Path, suffixes: set, output_dir: Path):
+    """Yield (input, output) for every convertible file under ``folder``, in a stable order"""
+    for root, dirs, files in os.walk(folder):
+        dirs.sort()
+        # Never pick up our own results when the output folder is inside the input
+        dirs[:] = [name for name in dirs if (Path(root) / name).resolve() != output_dir.resolve()]
+        for name in sorted(files):
+            path = Path(root) / name
+            if path.suffix.lower() in suffixes:
+                yield path, output_path_for(path.relative_to(folder), output_dir)
+
+
+def read_manifest(manifest: Path, output_dir: Path):
+    """Yield (input, output) for every line of a manifest (paths or JSON objects)"""
+    base = manifest.parent
+    with open(manifest) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            entry = json.loads(line) if line.startswith('{') else {'input': line}
+            path = Path(entry['input'])
+            if not path.is_absolute():
+                path = base / path
+            if entry.get('output'):
+                output = Path(entry['output'])
+                yield path, output if output.is_absolute() else output_dir / output
+            else:
+                try:
+                    relative = path.resolve().relative_to(base.resolve())
+                except ValueError:
+                    relative = Path(path.name)
+                yield path, output_path_for(relative, output_dir)
+
+
+def read_results(results_path: Path) -> set:
+    """Inputs a previous run's results manifest records as finished"""
+    finished = set()
+    if not results_path.exists():
+        return finished
+    with open(results_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Last line of a run killed while writing it
+                continue
+            if record.get('status') in RESUMED_STATUSES:
+                finished.add(str(Path(record['input']).resolve()))
+    return finished
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+def _init_worker(threads: int):
+    """Give each forked worker its own share of the CPU cores
+
+    Ctrl-C is left to the parent, which lets started documents finish.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _APP._init_ocr_process(threads)
+
+
+def convert_document(input_path: str, output_path: str, options: dict) -> dict:
+    """Convert one document in a worker process, returning its results manifest record"""
+    record = {'input': input_path, 'output': output_path, 'pid': os.getpid()}
+    output = Path(output_path)
+    partial = output.with_name(output.name + PARTIAL_SUFFIX)
+    report = {}
+
+    start = time.perf_counter()
+    try:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        _APP.converter.convert_to_searchable(input_path, str(partial), report=report, **options)
+        os.replace(partial, output)
+    except Exception as e:
+        record.update(status='failed', error=f"{type(e).__name__}: {e}")
+    else:
+        record.update(status='done', output_bytes=output.stat().st_size)
+    finally:
+        # Also on interruption: only complete outputs carry the final name
+        partial.unlink(missing_ok=True)
+    seconds = time.perf_counter() - start
+
+    record.update({
+        'pages': report.get('total_pages'),
+        'ocr_pages': report.get('ocr_pages'),
+        'blank_pages': report.get('blank_pages'),
+        'triage': report.get('triage'),
+        'seconds': round(seconds, 4),
+        'timings': {stage: round(value, 4) for stage, value in report.get('timings', {}).items()},
+    })
+    try:
+        record['input_bytes'] = os.path.getsize(input_path)
+    except OSError:
+        pass
+    return record
+
+
+# ---------------------------------------------------------------------------
+# Run
+# ---------------------------------------------------------------------------
+
+def conversion_options(args) -> dict:
+    return {
+        'dpi': args.dpi,
+        'mode': args.mode,
+        'batch_size': args.batch_size,
+        'triage': args.triage,
+        'skip_blank': args.skip_blank,
+        'use_cache': args.cache,
+        'detection_dpi': args.detection_dpi,
+        'cascade_dpi': args.cascade_dpi,
+        'confidence_threshold': args.confidence_threshold,
+    }
+
+
+def main(argv=None) -> int:
+    global _APP
+    import app as app_module
+    _APP = app_module
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('inputs', nargs='*', help='folders (searched recursively) or files to convert')
+    parser.add_argument('--manifest', help='file listing the inputs, one path or JSON object per line')
+    parser.add_argument('--output-dir', required=True, help='folder receiving the searchable PDFs')
+    parser.add_argument('--results', help='results manifest (JSON lines), default <output-dir>/results.jsonl')
+    parser.add_argument('--resume', action='store_true',
+                        help='append to the results manifest and skip what it records as done')
+    parser.add_argument('--overwrite', action='store_true', help='convert again when the output exists')
+    parser.add_argument('--workers', type=int, default=max(1, (os.cpu_count() or 1) // 4),
+                        help='conversion processes')
+    parser.add_argument('--threads-per-worker', type=int, default=None,
+                        help='torch threads per process (default: CPU cores / workers)')
+    parser.add_argument('--dpi', type=int, default=200)
+    parser.add_argument('--mode', default='rasterize', choices=app_module.CONVERSION_MODES, help='PDF mode')
+    parser.add_argument('--batch-size', type=int, default=None, help='OCR batch size (default: auto)')
+    parser.add_argument('--triage', action='store_true',
+                        help='skip OCR on PDF pages that already have a usable text layer')
+    parser.add_argument('--skip-blank', action='store_true', help='skip OCR on blank pages')
+    parser.add_argument('--cache', action='store_true', help='use the on-disk OCR result cache')
+    parser.add_argument('--detection-dpi', type=int, default=None)
+    parser.add_argument('--cascade-dpi', type=int, default=None)
+    parser.add_argument('--confidence-threshold', type=float, default=0.8)
+    parser.add_argument('--memory-budget-mb', type=int, default=None, help='page memory budget per worker')
+    parser.add_argument('--acceleration', default=None, help='CPU acceleration profile, e.g. cpu-int8')
+    parser.add_argument('--verbose', action='store_true', help='log every page')
+    args = parser.parse_args(argv)
+
+    if not args.inputs and not args.manifest:
+        parser.error("give input folders/files or --manifest")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    converter = app_module.converter
+    if args.acceleration and args.acceleration not in app_module.ACCELERATION_PROFILES:
+        parser.error(f"unknown acceleration profile: {args.acceleration}")
+    converter.acceleration = args.acceleration
+    converter.memory_budget = args.memory_budget_mb * 1024 * 1024 if args.memory_budget_mb else None
+    if not args.cache:
+        converter.ocr_cache = None
+    options = conversion_options(args)
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    results_path = Path(args.results) if args.results else output_dir / 'results.jsonl'
+    finished = read_results(results_path) if args.resume else set()
+    suffixes = converter.image_formats | converter.pdf_format
+
+    def documents():
+        for source in args.inputs:
+            path = Path(source)
+            if path.is_dir():
+                yield from walk_directory(path, suffixes, output_dir)
+            else:
+                yield path, output_path_for(Path(path.name), output_dir)
+        if args.manifest:
+            yield from read_manifest(Path(args.manifest), output_dir)
+
+    # Load once, then fork: workers map the weights copy-on-write. The parent
+    # runs no OCR; one torch thread keeps OpenMP workers out of the fork
+    load_start = time.perf_counter()
+    converter.torch_threads = 1
+    converter.load_models()
+    print(f"🚀 Models loaded in {time.perf_counter() - load_start:.1f}s", file=sys.stderr)
+
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // args.workers)
+
+    def start_pool():
+        return ProcessPoolExecutor(
+            max_workers=args.workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=_init_worker,
+            initargs=(threads,),
+        )
+
+    pool = {'executor': start_pool()}
+
+    def restart_pool():
+        pool['executor'].shutdown(wait=False, cancel_futures=True)
+        pool['executor'] = start_pool()
+        print("♻️  A worker process died, restarted the pool", file=sys.stderr)
+
+    print(f"🧵 {args.workers} workers, {threads} torch threads each", file=sys.stderr)
+
+    totals = {'done': 0, 'skipped': 0, 'failed': 0, 'resumed': 0, 'pages': 0}
+    start = time.perf_counter()
+    # Future -> (input, output) of the documents being converted
+    in_flight = {}
+    max_in_flight = args.workers * DOCUMENTS_IN_FLIGHT_PER_WORKER
+
+    def write(record):
+        results.write(json.dumps(record) + "\n")
+        # Every finished document is on disk before the next, for --resume
+        results.flush()
+        totals[record['status']] += 1
+        totals['pages'] += record.get('pages') or 0
+        if record['status'] == 'failed':
+            print(f"❌ {record['input']}: {record['error']}", file=sys.stderr)
+        elif record['status'] == 'done':
+            print(f"✅ {record['input']}: {record['pages']} pages in {record['seconds']:.1f}s", file=sys.stderr)
+
+    def collect(return_when):
+        done, _ = wait(in_flight, return_when=return_when)
+        # A worker itself died (e.g. killed for memory): the pool is broken and
+        # all its documents fail at once; they are recorded, then the pool is rebuilt
+        broken = any(isinstance(future.exception(), BrokenProcessPool) for future in done)
+        if broken:
+            done, _ = wait(in_flight)
+        for future in done:
+            input_path, output_path = in_flight.pop(future)
+            try:
+                record = future.result()
+            except Exception as e:
+                record = {'input': input_path, 'output': output_path, 'status': 'failed',
+                          'error': f"{type(e).__name__}: {e}"}
+            write(record)
+        if broken:
+            restart_pool()
+
+    def submit(input_path, output_path):
+        executor = pool['executor']
+        try:
+            future = executor.submit(convert_document, input_path, output_path, options)
+        except BrokenProcessPool:
+            # Broke before any of its futures reported it
+            collect(ALL_COMPLETED)
+            if pool['executor'] is executor:
+                restart_pool()
+            future = pool['executor'].submit(convert_document, input_path, output_path, options)
+        in_flight[future] = (input_path, output_path)
+
+    # Resolved output -> input producing it, to catch inputs sharing a name
+    claimed = {}
+
+    interrupted = aborted = False
+    with open(results_path, 'a' if args.resume else 'w') as results:
+        try:
+            for input_path, output_path in documents():
+                input_path = input_path.resolve()
+                other = claimed.setdefault(output_path.resolve(), input_path)
+                if other != input_path:
+                    write({'input': str(input_path), 'output': str(output_path), 'status': 'failed',
+                           'error': f"same output as {other}"})
+                    continue
+                if str(input_path) in finished:
+                    totals['resumed'] += 1
+                    continue
+                if output_path.exists() and not args.overwrite:
+                    write({'input': str(input_path), 'output': str(output_path), 'status': 'skipped'})
+                    continue
+                if len(in_flight) >= max_in_flight:
+                    collect(FIRST_COMPLETED)
+                submit(str(input_path), str(output_path))
+            if in_flight:
+                collect(ALL_COMPLETED)
+        except KeyboardInterrupt:
+            interrupted = True
+            # Documents not handed to a worker yet are dropped, started ones are recorded
+            for future in [future for future in in_flight if future.cancel()]:
+                del in_flight[future]
+            print(f"⏹️  Interrupted, finishing {len(in_flight)} started documents (Ctrl-C again to stop now); "
+                  f"--resume continues where this run stopped", file=sys.stderr)
+            try:
+                if in_flight:
+                    collect(ALL_COMPLETED)
+            except KeyboardInterrupt:
+                aborted = True
+        finally:
+            pool['executor'].shutdown(wait=not aborted, cancel_futures=True)
+
+    seconds = time.perf_counter() - start
+    print(f"📊 {totals['done']} converted, {totals['skipped']} skipped, {totals['failed']} failed, "
+          f"{totals['resumed']} already done; {totals['pages']} pages in {seconds:.1f}s "
+          f"({totals['pages'] / seconds if seconds else 0:.2f} pages/s)", file=sys.stderr)
+    print(f"📝 Results: {results_path}", file=sys.stderr)
+    return 1 if totals['failed'] or interrupted else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,746 @@
+"""
+Offline benchmark for the searchable PDF conversion pipeline
+
+Generates a reproducible synthetic corpus (reportlab text pages, scans of
+them at several DPIs with noise and skew, page images and a large TIFF),
+converts it with SearchableDocumentConverter.convert_to_searchable and,
+optionally, through the HTTP endpoints, and writes the results as JSON:
+pages/sec, per-stage latency percentiles, peak memory and output size ratio.
+
+    python benchmark.py --stub --output results.json
+    python benchmark.py --pages 20 --dpi 300 --http --output results.json
+
+With ``--stub`` the Surya predictors are replaced by a cheap line finder so
+the render, encode, overlay and save stages can be measured without model
+weights, and without Surya or torch installed. Compare two runs with any
+JSON diff tool; every number is under ``cases`` (one entry per document and
+mode) and ``summary``.
+
+``--compare-acceleration none,cpu,cpu-int8`` instead OCRs the scanned pages
+once per CPU acceleration profile and records speed against accuracy (text
+similarity to the generated ground truth) under ``acceleration``.
+
+``--overlay-lines 5000`` only micro-benchmarks the invisible text layer
+builder on that many synthetic OCR lines (no corpus, no models) against the
+former one-text-object-per-line loop, under ``overlay``.
+"""
+
+import io
+import os
+import sys
+import json
+import difflib
+import time
+import random
+import argparse
+import platform
+import resource
+import threading
+import importlib
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from importlib import metadata
+
+import numpy as np
+from PIL import Image
+import fitz  # PyMuPDF
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen import canvas
+
+# Corpus defaults
+CORPUS_SEED = 1234
+CORPUS_PAGES = 10
+CORPUS_SCAN_DPIS = (150, 300)
+CORPUS_TIFF_DPI = 400
+CORPUS_WORDS = (
+    "invoice total amount date reference customer account balance payment due order quantity "
+    "price description service delivery address contract agreement section clause party notice "
+    "report summary analysis result figure table page document record number annual quarter"
+).split()
+
+# Scan simulation: gaussian noise (grey levels), largest skew (degrees) and
+# share of pixels turned into dark specks
+SCAN_NOISE_SIGMA = 12
+SCAN_MAX_SKEW = 1.5
+SCAN_SPECK_RATIO = 0.0002
+
+# Stub detection: a pixel row is part of a text line when at least this share
+# of it is ink
+STUB_ROW_INK_RATIO = 0.002
+
+PERCENTILES = (50, 90, 99)
+
+# Overlay micro-benchmark: page size (pixels at 300 DPI) the synthetic OCR
+# lines are laid out on, and minimum measuring time per variant
+OVERLAY_PAGE_SIZE = (2480, 3508)
+OVERLAY_MIN_SECONDS = 1.0
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpus
+# ---------------------------------------------------------------------------
+
+def write_text_pdf(path: Path, pages: int, rng: random.Random):
+    """Multi-page digital PDF of random business-like text (reportlab)"""
+    width, height = A4
+    pdf = canvas.Canvas(str(path), pagesize=A4)
+
+    for page_num in range(pages):
+        y = height - 72
+        pdf.setFont('Helvetica-Bold', 16)
+        pdf.drawString(72, y, f"{rng.choice(CORPUS_WORDS).title()} {rng.choice(CORPUS_WORDS)} {page_num + 1}")
+        y -= 32
+
+        while y > 90:
+            font_size = rng.choice((9, 10, 11, 12))
+            pdf.setFont('Helvetica', font_size)
+            for _ in range(rng.randint(3, 8)):
+                if y <= 90:
+                    break
+                words = [rng.choice(CORPUS_WORDS) for _ in range(rng.randint(6, 12))]
+                pdf.drawString(72, y, " ".join(words))
+                y -= font_size * 1.4
+            y -= font_size
+
+        pdf.showPage()
+
+    pdf.save()
+
+
+def simulate_scan(image: Image.Image, rng: random.Random, np_rng: np.random.Generator) -> Image.Image:
+    """Add sensor noise, dust specks and a slight skew to a clean page render"""
+    pixels = np.asarray(image.convert('L'), dtype=np.int16)
+    pixels = pixels + np_rng.normal(0, SCAN_NOISE_SIGMA, pixels.shape).astype(np.int16)
+    specks = np_rng.random(pixels.shape) < SCAN_SPECK_RATIO
+    pixels[specks] = 30
+    scan = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8), 'L').convert('RGB')
+    angle = rng.uniform(-SCAN_MAX_SKEW, SCAN_MAX_SKEW)
+    return scan.rotate(angle, resample=Image.BILINEAR, fillcolor=(255, 255, 255))
+
+
+def render_page(page, dpi: int) -> Image.Image:
+    pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72), alpha=False)
+    return Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+
+
+def write_scanned_pdf(source_path: Path, path: Path, dpi: int, rng: random.Random,
+                      np_rng: np.random.Generator):
+    """Image-only PDF made of noisy, skewed JPEG scans of ``source_path``"""
+    source = fitz.open(source_path)
+    scanned = fitz.open()
+    for page in source:
+        scan = simulate_scan(render_page(page, dpi), rng, np_rng)
+        buffer = io.BytesIO()
+        scan.save(buffer, format='JPEG', quality=80)
+        new_page = scanned.new_page(width=page.rect.width, height=page.rect.height)
+        new_page.insert_image(new_page.rect, stream=buffer.getvalue())
+    scanned.save(path, garbage=4, deflate=True)
+    scanned.close()
+    source.close()
+
+
+def build_corpus(folder: Path, pages: int = CORPUS_PAGES, scan_dpis: tuple = CORPUS_SCAN_DPIS,
+                 tiff_dpi: int = CORPUS_TIFF_DPI, seed: int = CORPUS_SEED) -> list:
+    """Generate the benchmark documents in ``folder`` (reused when already there)
+
+    Returns ``(path, kind)`` pairs. The same seed always gives the same files.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    marker = folder / f"corpus-{seed}-{pages}-{'-'.join(map(str, scan_dpis))}-{tiff_dpi}.json"
+    if marker.exists():
+        return [(folder / name, kind) for name, kind in json.loads(marker.read_text())]
+
+    rng = random.Random(seed)
+    np_rng = np.random.default_rng(seed)
+    documents = []
+
+    digital = folder / 'digital.pdf'
+    write_text_pdf(digital, pages, rng)
+    documents.append((digital.name, 'digital_pdf'))
+
+    for dpi in scan_dpis:
+        scanned = folder / f"scan_{dpi}dpi.pdf"
+        write_scanned_pdf(digital, scanned, dpi, rng, np_rng)
+        documents.append((scanned.name, 'scanned_pdf'))
+
+    # Single page images as uploaded from phones and scanners
+    with fitz.open(digital) as source:
+        for dpi in scan_dpis:
+            image_path = folder / f"page_{dpi}dpi.png"
+            scan = simulate_scan(render_page(source[0], dpi), rng, np_rng)
+            scan.save(image_path, dpi=(dpi, dpi))
+            documents.append((image_path.name, 'image'))
+
+    # Large format page (A3 at a high DPI), e.g. drawings and plans
+    large_pdf = folder / 'large.pdf'
+    large_canvas = canvas.Canvas(str(large_pdf), pagesize=(A4[0] * 2 ** 0.5, A4[1] * 2 ** 0.5))
+    large_canvas.setFont('Helvetica', 14)
+    for line in range(60):
+        large_canvas.drawString(72, 72 + line * 18, " ".join(rng.choice(CORPUS_WORDS) for _ in range(14)))
+    large_canvas.save()
+    with fitz.open(large_pdf) as source:
+        tiff_path = folder / f"large_{tiff_dpi}dpi.tiff"
+        simulate_scan(render_page(source[0], tiff_dpi), rng, np_rng).save(
+            tiff_path, compression='tiff_lzw', dpi=(tiff_dpi, tiff_dpi))
+    large_pdf.unlink()
+    documents.append((tiff_path.name, 'large_tiff'))
+
+    marker.write_text(json.dumps(documents))
+    return [(folder / name, kind) for name, kind in documents]
+
+
+# ---------------------------------------------------------------------------
+# Stub predictors (no model weights)
+# ---------------------------------------------------------------------------
+
+def find_text_rows(image: Image.Image) -> list:
+    """Boxes of horizontal ink bands, a crude stand-in for text line detection"""
+    ink = np.asarray(image.convert('L')) < 128
+    width = ink.shape[1]
+    row_ink = ink.sum(axis=1)
+    rows = row_ink >= max(1, width * STUB_ROW_INK_RATIO)
+
+    boxes = []
+    start = None
+    for y, is_text in enumerate(np.append(rows, False)):
+        if is_text and start is None:
+            start = y
+        elif not is_text and start is not None:
+            if y - start >= 3:
+                columns = np.flatnonzero(ink[start:y].any(axis=0))
+                boxes.append([float(columns[0]), float(start), float(columns[-1] + 1), float(y)])
+            start = None
+    return boxes
+
+
+class StubFoundationPredictor:
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class StubDetectionPredictor:
+    def __init__(self, *args, **kwargs):
+        self.model = None
+
+    def __call__(self, images, batch_size=None, include_maps=False):
+        results = []
+        for image in images:
+            boxes = [SimpleNamespace(bbox=box, polygon=None, confidence=0.99) for box in find_text_rows(image)]
+            results.append(SimpleNamespace(bboxes=boxes, image_bbox=[0, 0, image.width, image.height]))
+        return results
+
+
+class StubRecognitionPredictor:
+    def __init__(self, foundation_predictor=None, *args, **kwargs):
+        self.foundation_predictor = foundation_predictor
+
+    def __call__(self, images, det_predictor=None, bboxes=None, **kwargs):
+        if bboxes is None:
+            bboxes = [[box.bbox for box in result.bboxes] for result in det_predictor(images)]
+
+        results = []
+        for image, boxes in zip(images, bboxes):
+            lines = []
+            for box in boxes:
+                # About one character per half line height of box width
+                chars = max(1, int((box[2] - box[0]) / max(1.0, (box[3] - box[1]) * 0.5)))
+                words = (" ".join(CORPUS_WORDS) * (chars // 200 + 1))[:chars]
+                lines.append(SimpleNamespace(text=words, bbox=list(box), polygon=None, confidence=0.95))
+            results.append(SimpleNamespace(text_lines=lines, image_bbox=[0, 0, image.width, image.height]))
+        return results
+
+
+def install_stub_predictors():
+    """Point the Surya predictor classes at the stubs; must run before ``import app``
+
+    Modules app.load_models imports that cannot be imported (Surya or torch
+    missing) are registered as empty stand-ins holding only the stubs.
+    """
+    stubs = {
+        'surya.foundation': ('FoundationPredictor', StubFoundationPredictor),
+        'surya.detection': ('DetectionPredictor', StubDetectionPredictor),
+        'surya.recognition': ('RecognitionPredictor', StubRecognitionPredictor),
+    }
+    try:
+        importlib.import_module('surya')
+    except ImportError:
+        sys.modules['surya'] = ModuleType('surya')
+        sys.modules['surya'].__path__ = []
+
+    for module_name, (class_name, stub) in stubs.items():
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            module = sys.modules[module_name] = ModuleType(module_name)
+            setattr(sys.modules['surya'], module_name.split('.')[1], module)
+        setattr(module, class_name, stub)
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter (Linux >= 4.0); False when unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident memory since the last reset_peak_rss (process lifetime otherwise)"""
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentiles(samples: list) -> dict:
+    if not samples:
+        return {}
+    values = np.asarray(samples, dtype=float)
+    summary = {f"p{p}": round(float(np.percentile(values, p)), 6) for p in PERCENTILES}
+    summary.update({
+        'mean': round(float(values.mean()), 6),
+        'total': round(float(values.sum()), 6),
+        'count': int(values.size),
+    })
+    return summary
+
+
+def stage_samples(report: dict) -> dict:
+    """Per-page stage timings of a conversion report, as lists per stage"""
+    pages = [page.get('timings', {}) for page in report.get('pages', [])] or [report.get('timings', {})]
+    samples = {}
+    for timings in pages:
+        for stage, seconds in timings.items():
+            samples.setdefault(stage, []).append(seconds)
+    # Document level stages (final save) are not part of any page
+    for stage in ('save',):
+        if stage in report.get('timings', {}) and stage not in samples:
+            samples[stage] = [report['timings'][stage]]
+    return samples
+
+
+def run_conversion_case(app_module, document: Path, kind: str, mode: str, options: dict,
+                        output_folder: Path) -> dict:
+    """Convert ``document`` once through SearchableDocumentConverter"""
+    output_path = output_folder / f"{document.stem}_{mode}.pdf"
+    report = {}
+    has_peak_reset = reset_peak_rss()
+
+    start = time.perf_counter()
+    app_module.converter.convert_to_searchable(str(document), str(output_path), mode=mode,
+                                               report=report, use_cache=False, **options)
+    seconds = time.perf_counter() - start
+
+    pages = report.get('total_pages', 1)
+    input_bytes = document.stat().st_size
+    output_bytes = output_path.stat().st_size
+    output_path.unlink()
+
+    return {
+        'name': f"{document.name}/{mode}",
+        'document': document.name,
+        'kind': kind,
+        'mode': mode,
+        'options': options,
+        'pages': pages,
+        'ocr_pages': report.get('ocr_pages'),
+        'seconds': round(seconds, 4),
+        'pages_per_second': round(pages / seconds, 4) if seconds else None,
+        'stage_seconds': {stage: percentiles(samples) for stage, samples in stage_samples(report).items()},
+        'peak_rss_bytes': peak_rss_bytes(),
+        'peak_rss_scope': 'case' if has_peak_reset else 'process',
+        'input_bytes': input_bytes,
+        'output_bytes': output_bytes,
+        'size_ratio': round(output_bytes / input_bytes, 4) if input_bytes else None,
+    }
+
+
+def run_http_case(app_module, document: Path, endpoint: str, form: dict, concurrency: int,
+                  requests_per_client: int) -> dict:
+    """POST ``document`` to ``endpoint`` from ``concurrency`` in-process clients"""
+    latencies = []
+    failures = []
+    output_bytes = []
+    lock = threading.Lock()
+
+    def post(client):
+        with open(document, 'rb') as upload:
+            data = dict(form, file=(upload, document.name))
+            started = time.perf_counter()
+            response = client.post(endpoint, data=data)
+
+            if endpoint == '/api/jobs' and response.status_code == 202:
+                job_url = response.headers['Location']
+                while True:
+                    status = client.get(job_url).get_json()
+                    if status['state'] in ('done', 'failed'):
+                        break
+                    time.sleep(0.02)
+                response = client.get(f"{job_url}/result") if status['state'] == 'done' else None
+
+            ok = response is not None and response.status_code == 200
+            body = response.get_data() if ok else b''
+            elapsed = time.perf_counter() - started
+
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+                output_bytes.append(len(body))
+            else:
+                failures.append(response.status_code if response is not None else 'job failed')
+
+    def client_loop():
+        client = app_module.app.test_client()
+        for _ in range(requests_per_client):
+            post(client)
+
+    reset_peak_rss()
+    threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+
+    with fitz.open(document) as opened:
+        pages_per_request = len(opened) if opened.is_pdf else 1
+    pages = pages_per_request * len(latencies)
+
+    return {
+        'name': f"{document.name}{endpoint}",
+        'document': document.name,
+        'endpoint': endpoint,
+        'concurrency': concurrency,
+        'requests': concurrency * requests_per_client,
+        'failures': failures,
+        'seconds': round(seconds, 4),
+        'pages_per_second': round(pages / seconds, 4) if seconds else None,
+        'latency_seconds': percentiles(latencies),
+        'peak_rss_bytes': peak_rss_bytes(),
+        'size_ratio': round(float(np.mean(output_bytes)) / document.stat().st_size, 4) if output_bytes else None,
+    }
+
+
+def normalized_text(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+
+def page_text(ocr_data: dict) -> str:
+    """OCR lines of one page in reading order (top to bottom, left to right)"""
+    elements = sorted(ocr_data['text_elements'], key=lambda element: (round(element['bbox'][1] / 10), element['bbox'][0]))
+    return " ".join(element['text'] for element in elements)
+
+
+def compare_acceleration(app_module, documents: list, profiles: list, batch_size: int,
+                         torch_threads: int = None) -> list:
+    """OCR the scanned corpus pages once per acceleration profile: speed and accuracy
+
+    Accuracy is the similarity (difflib ratio, 1.0 = identical) of the OCR
+    text to the generated ground truth text, and to the first profile's text.
+    Each profile gets a freshly loaded converter, released before the next.
+    """
+    digital = next(document for document, kind in documents if kind == 'digital_pdf')
+    scanned = next(document for document, kind in documents if kind == 'scanned_pdf')
+    dpi = int(scanned.stem.split('_')[1].rstrip('dpi'))
+
+    with fitz.open(digital) as source:
+        truth = [normalized_text(page.get_text()) for page in source]
+    with fitz.open(scanned) as source:
+        images = [render_page(page, dpi) for page in source]
+
+    results = []
+    baseline_texts = None
+    for profile in profiles:
+        converter = app_module.SearchableDocumentConverter(
+            acceleration=None if profile == 'none' else profile, torch_threads=torch_threads)
+        converter.load_models()
+        converter.warm_up()
+
+        texts = []
+        timings = {}
+        start = time.perf_counter()
+        with app_module.metrics.collect(timings):
+            for batch_start in range(0, len(images), batch_size):
+                for ocr_data in converter.recognize_images(images[batch_start:batch_start + batch_size]):
+                    texts.append(normalized_text(page_text(ocr_data)))
+        seconds = time.perf_counter() - start
+
+        if baseline_texts is None:
+            baseline_texts = texts
+        similarity = [difflib.SequenceMatcher(None, expected, text, autojunk=False).ratio()
+                      for expected, text in zip(truth, texts)]
+        agreement = [difflib.SequenceMatcher(None, expected, text, autojunk=False).ratio()
+                     for expected, text in zip(baseline_texts, texts)]
+
+        result = {
+            'profile': profile,
+            'applied': converter.model_status['acceleration'],
+            'load_seconds': converter.model_status['load_seconds'],
+            'warmup_seconds': converter.model_status['warmup_seconds'],
+            'pages': len(images),
+            'seconds': round(seconds, 4),
+            'pages_per_second': round(len(images) / seconds, 4) if seconds else None,
+            'detection_seconds': round(timings.get('detection', 0.0), 4),
+            'recognition_seconds': round(timings.get('recognition', 0.0), 4),
+            'text_similarity': round(float(np.mean(similarity)), 4),
+            'agreement_with_first': round(float(np.mean(agreement)), 4),
+        }
+        if results:
+            first = results[0]
+            if first['pages_per_second'] and result['pages_per_second']:
+                result['speedup'] = round(result['pages_per_second'] / first['pages_per_second'], 3)
+            if first['recognition_seconds'] and result['recognition_seconds']:
+                result['recognition_speedup'] = round(first['recognition_seconds'] / result['recognition_seconds'], 3)
+        results.append(result)
+        print(f"⚡ {profile}: {result['pages_per_second']:.2f} pages/s, "
+              f"text similarity {result['text_similarity']:.3f}", file=sys.stderr)
+
+        del converter
+
+    return results
+
+
+def synthetic_text_elements(lines: int, rng: random.Random) -> list:
+    """OCR-like lines (text and pixel bbox) filling the overlay benchmark page, row by row"""
+    width, height = OVERLAY_PAGE_SIZE
+    row_height = max(height // max(lines, 1), 4)
+    elements = []
+    for index in range(lines):
+        words = " ".join(rng.choice(CORPUS_WORDS) for _ in range(rng.randint(2, 10)))
+        x = rng.uniform(50, width / 3)
+        y = (index * row_height) % (height - row_height)
+        elements.append({'text': words, 'bbox': [x, y, x + rng.uniform(len(words) * 10, len(words) * 25),
+                                                 y + row_height * rng.uniform(0.6, 0.9)],
+                         'confidence': 0.9})
+    return elements
+
+
+def reference_text_layer(text_elements: list) -> tuple:
+    """The former text layer builder: one text object and one width lookup per line"""
+    operators = []
+    text_count = 0
+    skipped_count = 0
+    for element in text_elements:
+        text = element['text']
+        bbox = element['bbox']
+        if not text or not text.strip() or len(bbox) != 4:
+            skipped_count += 1
+            continue
+        x1, y1, x2, y2 = bbox
+        bbox_width = x2 - x1
+        bbox_height = y2 - y1
+        if bbox_width < 2 or bbox_height < 2:
+            skipped_count += 1
+            continue
+        font_size = max(6, min(bbox_height * 0.75, 72))
+        text_width = fitz.get_text_length(text, fontname='helv', fontsize=font_size)
+        h_scale = max(50, min(bbox_width / text_width * 100, 200)) if text_width > 0 else 100
+        operators.append(f"BT 3 Tr /helv {font_size:.2f} Tf {h_scale:.2f} Tz 1 0 0 -1 {x1:.2f} {y2:.2f} Tm "
+                         f"<{text.encode('cp1252', errors='replace').hex()}> Tj ET")
+        text_count += 1
+    return "\n".join(operators).encode('latin-1'), text_count, skipped_count
+
+
+def lines_per_second(function, lines: int) -> float:
+    """Run ``function`` until OVERLAY_MIN_SECONDS have passed, return OCR lines per second"""
+    function()  # Warm caches (glyph widths, fonts)
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        function()
+        runs += 1
+        seconds = time.perf_counter() - start
+        if seconds >= OVERLAY_MIN_SECONDS:
+            return runs * lines / seconds
+
+
+def overlay_benchmark(app_module, lines: int, seed: int) -> dict:
+    """Lines per second of the text layer builder, alone and written into a page"""
+    text_elements = synthetic_text_elements(lines, random.Random(seed))
+    ocr_data = {'text_elements': text_elements}
+    width, height = OVERLAY_PAGE_SIZE
+    pixel_to_pdf = fitz.Matrix(72 / 300, 0, 0, -72 / 300, 0, height * 72 / 300)
+
+    def write_page():
+        with fitz.open() as document:
+            page = document.new_page(width=width * 72 / 300, height=height * 72 / 300)
+            app_module.converter.write_text_layer(page, ocr_data, pixel_to_pdf)
+            return document.tobytes()
+
+    built = app_module.build_text_layer(text_elements)
+    reference = reference_text_layer(text_elements)
+    result = {
+        'lines': lines,
+        'written': built[1],
+        'build_lines_per_second': round(lines_per_second(lambda: app_module.build_text_layer(text_elements), lines)),
+        'reference_lines_per_second': round(lines_per_second(lambda: reference_text_layer(text_elements), lines)),
+        'write_page_lines_per_second': round(lines_per_second(write_page, lines)),
+        'content_bytes': len(built[0] or b""),
+        'reference_content_bytes': len(reference[0]),
+    }
+    result['speedup'] = round(result['build_lines_per_second'] / result['reference_lines_per_second'], 2)
+    print(f"✍️  Text layer: {result['build_lines_per_second']} lines/s "
+          f"({result['speedup']}x the per-line builder)", file=sys.stderr)
+    return result
+
+
+def package_versions() -> dict:
+    versions = {}
+    for package in ('surya-ocr', 'torch', 'PyMuPDF', 'Pillow', 'numpy', 'opencv-python-headless', 'Flask'):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def write_results(results: dict, output: str = None):
+    text = json.dumps(results, indent=2)
+    if output:
+        Path(output).write_text(text + "\n")
+        print(f"✅ Results written to {output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--corpus', default='benchmark_corpus', help='corpus folder (generated when missing)')
+    parser.add_argument('--pages', type=int, default=CORPUS_PAGES, help='pages per multi-page PDF')
+    parser.add_argument('--scan-dpis', default=','.join(map(str, CORPUS_SCAN_DPIS)),
+                        help='DPIs the scanned PDFs and images are generated at')
+    parser.add_argument('--tiff-dpi', type=int, default=CORPUS_TIFF_DPI, help='DPI of the large TIFF')
+    parser.add_argument('--seed', type=int, default=CORPUS_SEED)
+    parser.add_argument('--dpi', type=int, default=200, help='conversion DPI')
+    parser.add_argument('--modes', default='rasterize,overlay', help='PDF conversion modes to run')
+    parser.add_argument('--batch-size', type=int, default=None, help='OCR batch size (default: auto)')
+    parser.add_argument('--options', default='{}',
+                        help='extra convert_to_searchable keyword arguments as JSON, '
+                             'e.g. \'{"detection_dpi": 100}\'')
+    parser.add_argument('--stub', action='store_true', help='use stub predictors instead of Surya models (Surya need not be installed)')
+    parser.add_argument('--http', action='store_true', help='also benchmark /api/convert and /api/jobs')
+    parser.add_argument('--http-concurrency', type=int, default=4)
+    parser.add_argument('--http-requests', type=int, default=2, help='requests per HTTP client')
+    parser.add_argument('--acceleration', default=None, help='CPU acceleration profile for the conversions')
+    parser.add_argument('--torch-threads', type=int, default=None, help='torch intra-op threads')
+    parser.add_argument('--compare-acceleration', default=None,
+                        help='only compare OCR speed and accuracy of these profiles, e.g. none,cpu,cpu-int8')
+    parser.add_argument('--overlay-lines', type=int, default=None,
+                        help='only micro-benchmark the text layer builder on this many OCR lines')
+    parser.add_argument('--output', help='write the JSON results here instead of stdout')
+    args = parser.parse_args(argv)
+
+    if args.overlay_lines:
+        import app as app_module
+        results = {
+            'meta': {
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'versions': package_versions(),
+            },
+            'overlay': overlay_benchmark(app_module, args.overlay_lines, args.seed),
+        }
+        write_results(results, args.output)
+        return results
+
+    scan_dpis = tuple(int(dpi) for dpi in args.scan_dpis.split(',') if dpi)
+    modes = [mode for mode in args.modes.split(',') if mode]
+    options = dict(json.loads(args.options), dpi=args.dpi, batch_size=args.batch_size)
+
+    corpus_start = time.perf_counter()
+    documents = build_corpus(Path(args.corpus), args.pages, scan_dpis, args.tiff_dpi, args.seed)
+    corpus_seconds = time.perf_counter() - corpus_start
+    print(f"📚 Corpus: {len(documents)} documents in {args.corpus} ({corpus_seconds:.1f}s)", file=sys.stderr)
+
+    if args.stub:
+        if args.acceleration or args.compare_acceleration:
+            raise SystemExit("Acceleration profiles need the real Surya models, drop --stub")
+        install_stub_predictors()
+    import app as app_module
+
+    acceleration = []
+    if args.compare_acceleration:
+        profiles = [profile for profile in args.compare_acceleration.split(',') if profile]
+        unknown = [profile for profile in profiles if profile != 'none' and profile not in app_module.ACCELERATION_PROFILES]
+        if unknown:
+            raise SystemExit(f"Unknown acceleration profiles: {', '.join(unknown)}")
+        acceleration = compare_acceleration(app_module, documents, profiles,
+                                            args.batch_size or app_module.DEFAULT_OCR_BATCH_SIZE, args.torch_threads)
+    else:
+        if args.acceleration and args.acceleration not in app_module.ACCELERATION_PROFILES:
+            raise SystemExit(f"Unknown acceleration profile: {args.acceleration}")
+        app_module.converter.acceleration = args.acceleration
+        app_module.converter.torch_threads = args.torch_threads
+        app_module.start_model_loading(background=False)
+        if app_module.converter.model_status['state'] != 'ready':
+            raise SystemExit(f"OCR initialization failed: {app_module.converter.model_status['error']}")
+
+    output_folder = Path(args.corpus) / 'out'
+    output_folder.mkdir(exist_ok=True)
+
+    cases = []
+    for document, kind in ([] if args.compare_acceleration else documents):
+        for mode in (modes if document.suffix == '.pdf' else ['rasterize']):
+            case = run_conversion_case(app_module, document, kind, mode, options, output_folder)
+            print(f"⏱️  {case['name']}: {case['pages']} pages in {case['seconds']:.2f}s "
+                  f"({case['pages_per_second']:.2f} pages/s)", file=sys.stderr)
+            cases.append(case)
+
+    http_cases = []
+    if args.http and not args.compare_acceleration:
+        form = {key: str(value) for key, value in options.items() if value is not None}
+        form['cache'] = '0'
+        http_documents = [document for document, kind in documents if kind in ('scanned_pdf', 'image')]
+        for document in http_documents:
+            for endpoint in ('/api/convert', '/api/jobs'):
+                case = run_http_case(app_module, document, endpoint, form,
+                                     args.http_concurrency, args.http_requests)
+                print(f"🌐 {case['name']}: {case['requests']} requests in {case['seconds']:.2f}s", file=sys.stderr)
+                http_cases.append(case)
+
+    total_pages = sum(case['pages'] for case in cases)
+    total_seconds = sum(case['seconds'] for case in cases)
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'stub_predictors': args.stub,
+            'versions': package_versions(),
+            'corpus': {'folder': args.corpus, 'pages': args.pages, 'scan_dpis': scan_dpis,
+                       'tiff_dpi': args.tiff_dpi, 'seed': args.seed},
+            'options': options,
+            'acceleration': app_module.converter.model_status['acceleration'],
+            'model_load_seconds': app_module.converter.model_status['load_seconds'],
+            'model_warmup_seconds': app_module.converter.model_status['warmup_seconds'],
+        },
+        'cases': cases,
+        'http': http_cases,
+        'acceleration': acceleration,
+        'summary': {
+            'pages': total_pages,
+            'seconds': round(total_seconds, 4),
+            'pages_per_second': round(total_pages / total_seconds, 4) if total_seconds else None,
+            'peak_rss_bytes': max((case['peak_rss_bytes'] for case in cases + http_cases), default=None),
+        },
+    }
+
+    write_results(results, args.output)
+    return results
+
+
+if __name__ == '__main__':
+    main()
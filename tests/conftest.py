@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """The app module, imported without models (Surya loads lazily)
+
+    Its folders are created on first use, relative to the working
+    directory, so they are pointed at a scratch folder.
+    """
+    import app
+
+    scratch = tmp_path_factory.mktemp('app')
+    app.app.config['UPLOAD_FOLDER'] = str(scratch / 'uploads')
+    app.app.config['OUTPUT_FOLDER'] = str(scratch / 'outputs')
+    app.job_manager.output_folder = app.app.config['OUTPUT_FOLDER']
+    if app.ocr_cache is not None:
+        app.ocr_cache.directory = scratch / 'ocr_cache'
+    return app
+
+
+@pytest.fixture(scope='session')
+def converter(app_module):
+    """The app's converter running benchmark's stub predictors (no Surya, no weights)"""
+    import benchmark
+
+    benchmark.install_stub_predictors()
+    app_module.converter.load_models()
+    return app_module.converter
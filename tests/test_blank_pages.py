@@ -0,0 +1,41 @@
+import random
+
+import fitz
+import pytest
+
+DPIS = (72, 100, 150, 200, 300, 400)
+
+
+@pytest.fixture(scope='module')
+def document():
+    """A page with only dust (specks of 1/240 inch) and one with a short line of text"""
+    document = fitz.open()
+    dusty = document.new_page()
+    rng = random.Random(0)
+    for _ in range(300):
+        x, y = rng.uniform(60, 550), rng.uniform(60, 780)
+        dusty.draw_rect(fitz.Rect(x, y, x + 0.3, y + 0.3), color=None, fill=(0, 0, 0))
+    text = document.new_page()
+    text.insert_text((72, 400), "Page 2", fontsize=8)
+    return document
+
+
+def coverage(app_module, page, dpi, speck_dpi=None):
+    pix = page.get_pixmap(dpi=dpi)
+    return app_module.ink_coverage(app_module.pixmap_array(pix), speck_dpi or dpi)
+
+
+@pytest.mark.parametrize('dpi', DPIS)
+def test_dust_is_blank_at_every_dpi(app_module, document, dpi):
+    assert coverage(app_module, document[0], dpi) < app_module.BLANK_MAX_INK_RATIO
+
+
+@pytest.mark.parametrize('dpi', DPIS)
+def test_short_text_is_not_blank_at_any_dpi(app_module, document, dpi):
+    assert coverage(app_module, document[1], dpi) >= app_module.BLANK_MAX_INK_RATIO
+
+
+@pytest.mark.parametrize('dpi', (150, 200, 300))
+def test_dust_only_passes_because_of_the_speck_filter(app_module, document, dpi):
+    # Without removing specks the same page would count as inked
+    assert coverage(app_module, document[0], dpi, speck_dpi=1) >= app_module.BLANK_MAX_INK_RATIO
@@ -0,0 +1,28 @@
+import pytest
+
+
+def parse(app_module, query=''):
+    with app_module.app.test_request_context(f'/api/convert?{query}', method='POST'):
+        return app_module.parse_conversion_options()
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', False),
+    ('triage=1', True),
+    ('triage=off', False),
+])
+def test_page_triage_is_opt_in(app_module, query, expected):
+    assert parse(app_module, query)['triage'] is expected
+
+
+def test_page_triage_default_follows_config(app_module, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'PAGE_TRIAGE', True)
+    assert parse(app_module)['triage'] is True
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('', False),
+    ('skip_blank=1', True),
+])
+def test_blank_page_skipping_is_opt_in(app_module, query, expected):
+    assert parse(app_module, query)['skip_blank'] is expected
@@ -0,0 +1,165 @@
+import io
+import queue
+import threading
+import time
+from pathlib import Path
+
+import fitz
+import pytest
+from PIL import Image, ImageDraw
+
+OPTIONS = {'use_cache': False}
+
+
+def scan(path):
+    image = Image.new('L', (400, 200), 255)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((40, 60, 360, 80), fill=0)
+    draw.rectangle((40, 120, 300, 140), fill=0)
+    image.save(path)
+    return str(path)
+
+
+@pytest.fixture(params=['memory', 'file'])
+def make_store(request, app_module, tmp_path):
+    def make():
+        if request.param == 'file':
+            return app_module.FileJobStore(str(tmp_path / 'jobs'))
+        return app_module.MemoryJobStore()
+    return make
+
+
+@pytest.fixture
+def make_manager(app_module, converter, tmp_path):
+    (tmp_path / 'outputs').mkdir()
+
+    def make(store, **kwargs):
+        return app_module.ConversionJobManager(converter, store, str(tmp_path / 'outputs'), **kwargs)
+    return make
+
+
+def wait_until(condition, timeout=30):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def wait_for(manager, job_id, states):
+    wait_until(lambda: manager.get(job_id)['state'] in states)
+    return manager.get(job_id)
+
+
+def removed(path):
+    # The worker deletes the input right after recording the outcome
+    wait_until(lambda: not path.exists())
+    return True
+
+
+def test_job_goes_from_queued_to_done(make_store, make_manager, tmp_path):
+    ready = threading.Event()
+    manager = make_manager(make_store(), ready=ready)
+    manager.start()
+    input_path = scan(tmp_path / 'scan.png')
+
+    job = manager.submit('job1', input_path, 'scan.png', OPTIONS)
+    assert job['state'] == 'queued'
+    # Workers hold queued jobs until the OCR stack is ready
+    time.sleep(0.05)
+    assert manager.get('job1')['state'] == 'queued'
+
+    ready.set()
+    job = wait_for(manager, 'job1', ('done', 'failed'))
+
+    assert job['state'] == 'done', job['error']
+    assert job['started_at'] <= job['finished_at']
+    assert job['pages_done'] == job['total_pages'] == 1
+    assert len(fitz.open(job['output_path'])) == 1
+    assert removed(tmp_path / 'scan.png')
+
+
+def test_failed_conversion_is_recorded(make_store, make_manager, tmp_path):
+    manager = make_manager(make_store())
+    manager.start()
+    broken = tmp_path / 'broken.pdf'
+    broken.write_bytes(b"not a pdf")
+
+    manager.submit('job1', str(broken), 'broken.pdf', OPTIONS)
+    job = wait_for(manager, 'job1', ('done', 'failed'))
+
+    assert job['state'] == 'failed'
+    assert job['error']
+    assert job['finished_at']
+    assert removed(broken)
+
+
+def test_full_queue_rejects_without_a_record(make_store, make_manager, tmp_path):
+    manager = make_manager(make_store(), max_queued=1)
+    manager.submit('job1', scan(tmp_path / 'a.png'), 'a.png', OPTIONS)
+
+    with pytest.raises(queue.Full):
+        manager.submit('job2', scan(tmp_path / 'b.png'), 'b.png', OPTIONS)
+
+    assert manager.get('job1')['state'] == 'queued'
+    assert manager.get('job2') is None
+
+
+def test_finished_jobs_expire_with_their_pdf(make_store, make_manager, tmp_path):
+    manager = make_manager(make_store(), result_ttl=0)
+    manager.start()
+    manager.submit('job1', scan(tmp_path / 'scan.png'), 'scan.png', OPTIONS)
+    output = Path(wait_for(manager, 'job1', ('done',))['output_path'])
+    assert output.exists()
+
+    time.sleep(0.01)
+    manager.expire_jobs()
+
+    assert manager.get('job1') is None
+    assert not output.exists()
+
+
+def test_unsafe_job_ids_are_unknown(app_module, make_manager):
+    manager = make_manager(app_module.MemoryJobStore())
+
+    assert manager.get('../job1') is None
+
+
+def test_file_store_keeps_jobs_across_restarts(app_module, make_manager, tmp_path):
+    folder = str(tmp_path / 'jobs')
+    manager = make_manager(app_module.FileJobStore(folder))
+    manager.start()
+    manager.submit('done1', scan(tmp_path / 'a.png'), 'a.png', OPTIONS)
+    wait_for(manager, 'done1', ('done',))
+    # Not started: stays queued, like a job the process died holding
+    stopped = make_manager(app_module.FileJobStore(folder))
+    input_path = scan(tmp_path / 'b.png')
+    stopped.submit('queued1', input_path, 'b.png', OPTIONS)
+
+    restarted = make_manager(app_module.FileJobStore(folder))
+
+    assert restarted.get('done1')['state'] == 'done'
+    interrupted = restarted.get('queued1')
+    assert interrupted['state'] == 'failed'
+    assert interrupted['error'] == 'Interrupted by server restart'
+    assert not (tmp_path / 'b.png').exists()
+
+
+def test_jobs_api(app_module, converter, tmp_path):
+    client = app_module.app.test_client()
+    with open(scan(tmp_path / 'scan.png'), 'rb') as f:
+        data = f.read()
+
+    response = client.post('/api/jobs', data={'file': (io.BytesIO(data), 'scan.png')},
+                           content_type='multipart/form-data')
+
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    assert response.headers['Location'] == f"/api/jobs/{job_id}"
+    wait_for(app_module.job_manager, job_id, ('done', 'failed'))
+
+    status = client.get(f"/api/jobs/{job_id}").get_json()
+    assert status['state'] == 'done', status['error']
+    result = client.get(f"/api/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.headers['Content-Disposition'].endswith('scan_searchable.pdf')
+    assert client.get('/api/jobs/0123abcd').status_code == 404
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+
+def ocr_result(text):
+    return {'image_size': (100, 50), 'text_elements': [{'text': text, 'bbox': [0, 0, 10, 10], 'confidence': 1.0}],
+            'total_elements': 1}
+
+
+def entry_size(result):
+    return len(json.dumps(result, ensure_ascii=False, default=float).encode('utf-8'))
+
+
+@pytest.fixture
+def make_cache(app_module, tmp_path):
+    def make(max_bytes):
+        return app_module.OCRResultCache(str(tmp_path / 'cache'), max_bytes, model_version='test')
+    return make
+
+
+def test_round_trip(make_cache):
+    cache = make_cache(1024 * 1024)
+    cache.put('ab12', ocr_result('hello'))
+
+    assert cache.get('ab12') == ocr_result('hello')
+    assert cache.get('cd34') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted(make_cache):
+    size = entry_size(ocr_result('one'))
+    cache = make_cache(3 * size)
+    for key, text in (('aa01', 'one'), ('bb02', 'two'), ('cc03', 'six')):
+        cache.put(key, ocr_result(text))
+
+    # Reading 'aa01' makes 'bb02' the least recently used entry
+    assert cache.get('aa01') is not None
+    cache.put('dd04', ocr_result('ten'))
+
+    assert cache.get('bb02') is None
+    assert all(cache.get(key) is not None for key in ('aa01', 'cc03', 'dd04'))
+    assert cache.stats()['entries'] == 3
+    assert cache.stats()['bytes'] == 3 * size
+    assert not (cache.directory / 'bb' / 'bb02.json').exists()
+
+
+def test_index_is_rebuilt_from_disk(make_cache):
+    cache = make_cache(1024 * 1024)
+    cache.put('aa01', ocr_result('one'))
+    cache.put('bb02', ocr_result('two'))
+
+    reopened = make_cache(1024 * 1024)
+
+    assert reopened.stats()['entries'] == 2
+    assert reopened.stats()['bytes'] == cache.stats()['bytes']
+    assert reopened.get('bb02') == ocr_result('two')
+
+
+
+def test_keys_follow_pixels_and_render_settings(make_cache):
+    cache = make_cache(1024)
+    key = cache.make_key(b'pixels', 10, 10, 300)
+
+    assert key == cache.make_key(b'pixels', 10, 10, 300)
+    assert len({key, cache.make_key(b'pixelz', 10, 10, 300), cache.make_key(b'pixels', 10, 10, 200),
+                cache.make_key(b'pixels', 20, 5, 300)}) == 4
+
+
+def test_keys_follow_numeric_acceleration_steps(make_cache):
+    cache = make_cache(1024)
+    key = cache.make_key(b'pixels', 10, 10, 300)
+
+    # inference_mode alone does not change the numbers, int8 and compile do
+    assert cache.make_key(b'pixels', 10, 10, 300, 'cpu') == key
+    assert len({key, cache.make_key(b'pixels', 10, 10, 300, 'cpu-int8'),
+                cache.make_key(b'pixels', 10, 10, 300, 'cpu-compile')}) == 3
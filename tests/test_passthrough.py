@@ -0,0 +1,84 @@
+import io
+
+import fitz
+import numpy as np
+import pytest
+from PIL import Image, ImageDraw
+
+
+def page_image(mode):
+    image = Image.new(mode, (240, 120), 'white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 20, 120, 60), fill='black')
+    draw.text((30, 80), "Passthrough", fill='black')
+    return image
+
+
+def encoded(image, **save_options):
+    buffer = io.BytesIO()
+    image.save(buffer, **save_options)
+    return buffer.getvalue()
+
+
+def detect(app_module, data):
+    with Image.open(io.BytesIO(data)) as image:
+        return app_module.passthrough_image(image, data)
+
+
+@pytest.mark.parametrize('mode, save_options, expected_filter', [
+    ('RGB', {'format': 'JPEG'}, '/DCTDecode'),
+    ('L', {'format': 'JPEG'}, '/DCTDecode'),
+    ('L', {'format': 'PNG'}, '/FlateDecode'),
+    ('RGB', {'format': 'PNG'}, '/FlateDecode'),
+    ('P', {'format': 'PNG'}, '/FlateDecode'),
+    ('1', {'format': 'TIFF', 'compression': 'group4'}, '/CCITTFaxDecode'),
+])
+def test_passthrough_encodings(app_module, mode, save_options, expected_filter):
+    data = encoded(page_image(mode), **save_options)
+
+    passthrough = detect(app_module, data)
+
+    assert passthrough['filter'] == expected_filter
+    assert passthrough['size'] == (240, 120)
+    assert sum(band['rows'] for band in passthrough['bands']) == 120
+
+
+@pytest.mark.parametrize('mode, save_options', [
+    ('RGBA', {'format': 'PNG'}),
+    ('L', {'format': 'PNG', 'transparency': 255}),
+    ('1', {'format': 'TIFF', 'compression': 'tiff_lzw'}),
+    ('RGB', {'format': 'BMP'}),
+])
+def test_encodings_pdf_cannot_take_as_is(app_module, mode, save_options):
+    assert detect(app_module, encoded(page_image(mode), **save_options)) is None
+
+
+def test_palette_png_keeps_its_palette(app_module):
+    passthrough = detect(app_module, encoded(page_image('P'), format='PNG'))
+
+    assert passthrough['color_space'].startswith('[/Indexed /DeviceRGB ')
+
+
+def test_group4_strips_become_bands(app_module):
+    data = encoded(page_image('1'), format='TIFF', compression='group4', tiffinfo={278: 50})
+
+    passthrough = detect(app_module, data)
+
+    assert [(band['top'], band['rows']) for band in passthrough['bands']] == [(0, 50), (50, 50), (100, 20)]
+
+
+@pytest.mark.parametrize('mode, save_options', [
+    ('L', {'format': 'PNG'}),
+    ('1', {'format': 'TIFF', 'compression': 'group4', 'tiffinfo': {278: 50}}),
+])
+def test_embedded_stream_renders_the_original_pixels(app_module, mode, save_options):
+    image = page_image(mode)
+    passthrough = detect(app_module, encoded(image, **save_options))
+
+    document = fitz.open()
+    page = document.new_page(width=image.width, height=image.height)
+    app_module.insert_passthrough_image(page, page.rect, passthrough)
+    pix = page.get_pixmap(colorspace=fitz.csGRAY, alpha=False)
+    rendered = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width).astype(int)
+
+    assert np.abs(rendered - np.asarray(image.convert('L'), dtype=int)).mean() < 1
@@ -0,0 +1,80 @@
+import random
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+PAGES = 40
+
+
+def delays(seed):
+    rng = random.Random(seed)
+    render_delays = [rng.uniform(0, 0.005) for _ in range(PAGES)]
+    # A slow early page: other workers' pages overtake it
+    render_delays[1] = 0.05
+    return render_delays
+
+
+@pytest.fixture
+def fake_ocr(converter, monkeypatch):
+    """OCR that takes random time per batch and tags each result with its page"""
+    rng = random.Random(1)
+    batches = []
+
+    def extract_text_from_images(images, cache_keys=None):
+        batches.append([image.width for image in images])
+        time.sleep(rng.uniform(0, 0.01))
+        return [{'page': image.width, 'text_elements': [], 'total_elements': 0} for image in images]
+
+    monkeypatch.setattr(converter, 'extract_text_from_images', extract_text_from_images)
+    return batches
+
+
+def render(render_delays, skipped=()):
+    def render_page(page_num):
+        time.sleep(render_delays[page_num])
+        if page_num in skipped:
+            return {'page_num': page_num, 'skip_ocr': True}
+        # The page number travels in the image width
+        return {'page_num': page_num, 'image': Image.new('RGB', (page_num + 1, 1))}
+    return render_page
+
+
+@pytest.mark.parametrize('render_workers, batch_size', [(1, 1), (4, 3), (8, 5)])
+def test_pages_are_assembled_in_order_with_their_own_ocr(converter, fake_ocr, render_workers, batch_size):
+    skipped = set(range(0, PAGES, 7))
+    assembled = []
+
+    converter._run_page_pipeline(
+        PAGES, render(delays(render_workers), skipped), assembled.append,
+        batch_size=batch_size, render_workers=render_workers)
+
+    assert [item['page_num'] for item in assembled] == list(range(PAGES))
+    for item in assembled:
+        if item['page_num'] in skipped:
+            assert 'ocr_data' not in item
+        else:
+            assert item['ocr_data']['page'] == item['page_num'] + 1
+            assert 'image' not in item
+    ocr_order = [width - 1 for batch in fake_ocr for width in batch]
+    assert sorted(ocr_order) == sorted(set(range(PAGES)) - skipped)
+    if render_workers > 1:
+        # Pages after the slow one reached OCR first
+        assert ocr_order.index(1) > ocr_order.index(2)
+
+
+def test_render_error_stops_the_pipeline(converter, fake_ocr):
+    assembled = []
+
+    def render_page(page_num):
+        if page_num == 5:
+            raise ValueError("bad page")
+        return render([0] * PAGES)(page_num)
+
+    with pytest.raises(ValueError, match="bad page"):
+        converter._run_page_pipeline(PAGES, render_page, assembled.append, batch_size=2, render_workers=2)
+
+    assert [item['page_num'] for item in assembled] == list(range(len(assembled)))
+    assert len(assembled) <= 5
+    assert not [thread for thread in threading.enumerate() if thread.name in ('ocr', 'render-0', 'render-1')]
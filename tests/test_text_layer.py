@@ -0,0 +1,73 @@
+import fitz
+import pytest
+
+
+def write_layer(app_module, elements, size=(1000, 400)):
+    document = fitz.open()
+    page = document.new_page(width=size[0], height=size[1])
+    # OCR pixel space (top-left origin) -> PDF space, as for image pages
+    pixel_to_pdf = fitz.Matrix(1, 0, 0, -1, 0, size[1])
+    written = app_module.converter.write_text_layer(page, {'text_elements': elements}, pixel_to_pdf)
+    return document, page, written
+
+
+def test_glyph_width_table_matches_font_metrics(app_module):
+    table = app_module.glyph_width_table('helv')
+    font = fitz.Font('helv')
+
+    assert table.shape == (256,)
+    for char in "AWiw 0.,é€":
+        assert table[char.encode('cp1252')[0]] == pytest.approx(font.text_length(char, fontsize=1))
+    assert app_module.glyph_width_table('helv') is table
+
+
+def test_build_text_layer_skips_unusable_lines(app_module):
+    elements = [
+        {'text': 'Invoice', 'bbox': [10, 10, 200, 40]},
+        {'text': '   ', 'bbox': [10, 50, 200, 80]},
+        {'text': 'Three coordinates', 'bbox': [10, 50, 200]},
+        {'text': 'Too small', 'bbox': [10, 90, 11, 120]},
+        {'text': 'Inverted', 'bbox': [200, 130, 10, 160]},
+    ]
+
+    operators, written, skipped = app_module.build_text_layer(elements)
+
+    assert (written, skipped) == (1, 4)
+    assert operators.count(b'BT') == 1 and operators.count(b'ET') == 1
+    assert b'3 Tr' in operators
+    assert operators.count(b'Tj') == 1
+
+
+def test_build_text_layer_only_repeats_changed_font_and_scale(app_module):
+    elements = [{'text': 'Same line', 'bbox': [10, top, 110, top + 20]} for top in (10, 40, 70)]
+
+    operators, written, _skipped = app_module.build_text_layer(elements)
+
+    assert written == 3
+    assert operators.count(b' Tf') == 1
+    assert operators.count(b' Tz') == 1
+    assert operators.count(b' Tm ') == 3
+
+
+def test_build_text_layer_without_usable_lines(app_module):
+    assert app_module.build_text_layer([]) == (None, 0, 0)
+    assert app_module.build_text_layer([{'text': 'x', 'bbox': [0, 0, 1, 1]}]) == (None, 0, 1)
+
+
+@pytest.mark.parametrize('text', ['Total amount due', 'Größe 12,50 €'])
+def test_text_layer_spans_its_box(app_module, text):
+    # Wide enough for a horizontal scale within the 50-200% clamp
+    bbox = [100, 200, 400, 240]
+    _document, page, written = write_layer(app_module, [{'text': text, 'bbox': bbox}])
+
+    assert written == 1
+    assert page.get_text().strip() == text
+    words = page.get_text('words')
+    x0 = min(word[0] for word in words)
+    x1 = max(word[2] for word in words)
+    assert x0 == pytest.approx(bbox[0], abs=0.5)
+    assert x1 == pytest.approx(bbox[2], abs=0.5)
+    # Baseline on the bottom of the box: the glyphs sit inside it
+    for word in words:
+        assert bbox[1] - 5 <= word[1] < word[3] <= bbox[3] + 10
+
@@ -0,0 +1,56 @@
+import fitz
+
+LINE = {'text_elements': [{'text': 'Invoice total', 'bbox': [10, 10, 200, 40]}]}
+
+
+def write_layer(app_module, page):
+    app_module.converter.write_text_layer(page, LINE, fitz.Matrix(1, 0, 0, -1, 0, page.rect.height))
+
+
+def layer_fonts(app_module, document):
+    return {font[0] for page in document for font in page.get_fonts() if font[4] == app_module.TEXT_LAYER_FONT}
+
+
+def test_font_object_is_shared_across_flushes(app_module, tmp_path):
+    output = {'pdf': fitz.open(), 'flushed': False, 'unflushed_bytes': 0}
+    for _flush in range(3):
+        for _page in range(2):
+            write_layer(app_module, output['pdf'].new_page(width=400, height=300))
+        app_module.converter._flush_output_pdf(output, str(tmp_path / 'flushed.pdf'))
+
+    document = fitz.open(tmp_path / 'flushed.pdf')
+    assert len(document) == 6
+    assert len(layer_fonts(app_module, document)) == 1
+    assert all(page.get_text().strip() == 'Invoice total' for page in document)
+
+
+def test_shared_resources_are_not_touched(app_module):
+    document = fitz.open()
+    for _page in range(3):
+        document.new_page(width=400, height=300)
+    # Pages 1 and 2 use page 0's resources object, as many generated PDFs do
+    shared = document.xref_get_key(document[0].xref, 'Resources')[1]
+    for page in document.pages(1):
+        document.xref_set_key(page.xref, 'Resources', shared)
+
+    write_layer(app_module, document[1])
+
+    assert [bool(page.get_fonts()) for page in document] == [False, True, False]
+    assert document[1].get_text().strip() == 'Invoice total'
+
+
+def test_inherited_resources_are_copied_to_the_page(app_module):
+    document = fitz.open()
+    for _page in range(2):
+        document.new_page(width=400, height=300)
+    pages_xref = int(document.xref_get_key(document[0].xref, 'Parent')[1].split()[0])
+    document.xref_set_key(pages_xref, 'Resources', '<< /ProcSet [/PDF /Text] >>')
+    for page in document:
+        document.xref_set_key(page.xref, 'Resources', 'null')
+
+    write_layer(app_module, document[0])
+
+    assert document.xref_get_key(pages_xref, 'Resources/Font') == ('null', 'null')
+    assert document[1].get_fonts() == []
+    assert document.xref_get_key(document[0].xref, 'Resources/ProcSet')[0] == 'array'
+    assert document[0].get_text().strip() == 'Invoice total'
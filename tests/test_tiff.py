@@ -0,0 +1,64 @@
+import fitz
+import pytest
+from PIL import Image, ImageDraw
+
+FRAME_SIZES = [(600, 400), (400, 600), (800, 300)]
+
+
+def frame(size, number):
+    image = Image.new('1', size, 1)
+    draw = ImageDraw.Draw(image)
+    for line in range(3):
+        draw.rectangle((40, 60 + line * 80, size[0] - 40, 80 + line * 80), fill=0)
+    draw.text((40, 20), f"Frame {number}", fill=0)
+    return image
+
+
+@pytest.fixture
+def multipage_tiff(tmp_path):
+    def make(compression, rows_per_strip=None):
+        path = tmp_path / f'{compression}.tif'
+        frames = [frame(size, number) for number, size in enumerate(FRAME_SIZES, 1)]
+        options = {'tiffinfo': {278: rows_per_strip}} if rows_per_strip else {}
+        frames[0].save(path, save_all=True, append_images=frames[1:], compression=compression, **options)
+        return str(path)
+    return make
+
+
+def test_frame_count(app_module, multipage_tiff):
+    assert app_module.tiff_frame_count(multipage_tiff('group4')) == len(FRAME_SIZES)
+
+
+def test_every_frame_becomes_a_searchable_page(converter, multipage_tiff, tmp_path):
+    output = tmp_path / 'out.pdf'
+    report = {}
+
+    converter.convert_to_searchable(multipage_tiff('group4'), str(output), use_cache=False, report=report)
+
+    document = fitz.open(output)
+    assert report['total_pages'] == report['ocr_pages'] == len(document) == len(FRAME_SIZES)
+    for page, (width, height) in zip(document, FRAME_SIZES):
+        assert page.rect.width / page.rect.height == pytest.approx(width / height, rel=0.01)
+        assert page.get_text().strip()
+
+
+def test_group4_frames_keep_their_encoded_strips(converter, multipage_tiff, tmp_path):
+    output = tmp_path / 'out.pdf'
+
+    converter.convert_to_searchable(multipage_tiff('group4', rows_per_strip=100), str(output), use_cache=False)
+
+    document = fitz.open(output)
+    for page, (_width, height) in zip(document, FRAME_SIZES):
+        images = page.get_images(full=True)
+        assert {image[8] for image in images} == {'CCITTFaxDecode'}
+        assert len(images) == -(-height // 100)
+
+
+def test_other_frames_are_reencoded(converter, multipage_tiff, tmp_path):
+    output = tmp_path / 'out.pdf'
+
+    converter.convert_to_searchable(multipage_tiff('tiff_lzw'), str(output), use_cache=False)
+
+    document = fitz.open(output)
+    assert len(document) == len(FRAME_SIZES)
+    assert all({image[8] for image in page.get_images(full=True)} == {'DCTDecode'} for page in document)
@@ -0,0 +1,58 @@
+import itertools
+
+import pytest
+
+
+def test_small_page_is_one_tile(app_module):
+    assert app_module.page_tiles(800, 600) == [((0, 0, 800, 600), (0, 0, 800, 600))]
+
+
+@pytest.mark.parametrize('width, height', [(10000, 9000), (4097, 300), (12345, 4096)])
+def test_tile_cores_partition_the_page(app_module, width, height):
+    tile_size, overlap = 4096, 384
+    tiles = app_module.page_tiles(width, height, tile_size, overlap)
+
+    assert sum((cx1 - cx0) * (cy1 - cy0) for _box, (cx0, cy0, cx1, cy1) in tiles) == width * height
+    for (x0, y0, x1, y1), (cx0, cy0, cx1, cy1) in tiles:
+        assert 0 <= x0 <= cx0 < cx1 <= x1 <= width
+        assert 0 <= y0 <= cy0 < cy1 <= y1 <= height
+        assert x1 - x0 <= tile_size and y1 - y0 <= tile_size
+
+    for (_box, a), (_other, b) in itertools.combinations(tiles, 2):
+        assert min(a[2], b[2]) <= max(a[0], b[0]) or min(a[3], b[3]) <= max(a[1], b[1])
+
+    xs = sorted({(box[0], box[2]) for box, _core in tiles})
+    for (_start, end), (next_start, _next_end) in zip(xs, xs[1:]):
+        assert end - next_start >= overlap
+
+
+def two_tiles(app_module):
+    tiles = app_module.page_tiles(1000, 200, tile_size=600, overlap=200)
+    assert [box for box, _core in tiles] == [(0, 0, 600, 200), (400, 0, 1000, 200)]
+    return tiles
+
+
+def test_merge_keeps_a_line_seen_by_two_tiles_once(app_module):
+    line = {'text': 'in the overlap', 'bbox': [420, 100, 580, 120], 'confidence': 0.9}
+    tiles = [{'box': box, 'core': core, 'elements': [dict(line)]} for box, core in two_tiles(app_module)]
+
+    assert app_module.merge_tile_lines(tiles, (1000, 200)) == [line]
+
+
+def test_merge_stitches_a_line_cut_by_the_seam(app_module):
+    (left_box, left_core), (right_box, right_core) = two_tiles(app_module)
+    tiles = [
+        {'box': left_box, 'core': left_core,
+         'elements': [{'text': 'alpha beta gamma', 'bbox': [100, 50, 598, 70], 'confidence': 0.9}]},
+        {'box': right_box, 'core': right_core,
+         'elements': [{'text': 'gamma delta', 'bbox': [402, 50, 900, 70], 'confidence': 0.8},
+                      {'text': 'whole', 'bbox': [700, 150, 800, 170], 'confidence': 0.95}]},
+    ]
+
+    merged = app_module.merge_tile_lines(tiles, (1000, 200))
+
+    assert sorted((element['text'], element['bbox']) for element in merged) == [
+        ('alpha beta gamma delta', [100, 50, 900, 70]),
+        ('whole', [700, 150, 800, 170]),
+    ]
+    assert min(element['confidence'] for element in merged) == 0.8
@@ -0,0 +1,48 @@
+import fitz
+import pytest
+
+LINE = "Searchable text layer line with enough characters for the preview."
+
+
+@pytest.fixture
+def text_pdf(tmp_path):
+    path = tmp_path / 'text.pdf'
+    document = fitz.open()
+    for page_num in range(6):
+        page = document.new_page()
+        for line in range(8):
+            page.insert_text((72, 72 + line * 20), f"{LINE} {page_num}.{line}")
+    document.new_page()  # No text at all
+    document.save(path)
+    return str(path)
+
+
+def test_early_stop_reports_only_the_characters_read(app_module, text_pdf):
+    result = app_module.verify_pdf_searchable(text_pdf)
+
+    assert result['is_searchable']
+    assert result['complete'] is False
+    assert result['total_characters'] is None
+    assert result['characters_scanned'] == sum(page['characters'] for page in result['pages'])
+    assert result['pages_analyzed'] < result['total_pages'] == 7
+    assert result['preview'].startswith(LINE)
+
+
+def test_full_scan_counts_the_whole_document(app_module, text_pdf):
+    result = app_module.verify_pdf_searchable(text_pdf, full_scan=True)
+    expected = sum(app_module.classify_pdf_page(page)['text_chars'] for page in fitz.open(text_pdf))
+
+    assert result['complete'] is True
+    assert result['pages_analyzed'] == 7
+    assert result['total_characters'] == result['characters_scanned'] == expected
+    assert result['pages'][-1]['characters'] == 0
+    assert result['pages_with_text'] == 6
+
+
+def test_classify_returns_the_extracted_text(app_module, text_pdf):
+    document = fitz.open(text_pdf)
+    analysis = app_module.classify_pdf_page(document[0])
+
+    assert analysis['kind'] == 'digital'
+    assert f"{LINE} 0.7" in analysis['text']
+    assert app_module.classify_pdf_page(document[6])['text'] == ""